@@ -0,0 +1,183 @@
+'''
+    Offline benchmarks of Connect against the fake Thor node.
+
+    python3 -m benchmarks.bench                   # run, compare with baseline.json
+    python3 -m benchmarks.bench --update-baseline # run, save as the new baseline
+    python3 -m benchmarks.bench --latency 0.005   # add 5ms node latency
+
+    Exit code is 1 if any scenario regressed beyond the tolerance.
+
+    Timings depend on the machine: baseline.json holds them relative to
+    a calibration workload (pure Python, no I/O) run just before, and they are
+    scaled back with the calibration of the machine comparing.
+'''
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, List
+
+from thor_requests.connect import Connect
+from thor_requests.const import VTHO_ABI, VTHO_ADDRESS
+from thor_requests.contract import Contract
+from thor_requests.wallet import Wallet
+
+from .fake_thor import FakeThor
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+WALLET = Wallet.fromPrivateKey(bytes.fromhex("dce1443bd2ef0c2631adc1c67e5c93f13dc23a41c18b536effbbdcbcdb96fb65"))
+VTHO = Contract({"abi": json.loads(VTHO_ABI)})
+
+
+def percentile(samples: List[float], q: float) -> float:
+    '''Nearest-rank percentile of the samples, q in [0, 1]'''
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def measure(fn: Callable, iterations: int, warmup: int = 3) -> dict:
+    '''Run fn() sequentially, return throughput (ops/s) and p50/p99 latency (s)'''
+    for _ in range(warmup):
+        fn()
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t)
+    seconds = time.perf_counter() - started
+    return {
+        "ops": iterations,
+        "throughput": iterations / seconds,
+        "p50": percentile(samples, 0.5),
+        "p99": percentile(samples, 0.99),
+    }
+
+
+def calibrate(rounds: int = 5, ops: int = 200) -> float:
+    '''
+    Speed of this machine in ops/s of a fixed workload close to what Connect does:
+    JSON encode and decode of a block, hex and hashing. Best of the rounds.
+    '''
+    block = {
+        "number": 1,
+        "id": "0x" + "ab" * 32,
+        "transactions": [{"id": "0x" + "%064x" % i, "clauses": [{"to": "0x" + "cd" * 20, "data": "0x" + "ef" * 68}]} for i in range(50)],
+    }
+    best = 0.0
+    for _ in range(rounds):
+        started = time.perf_counter()
+        for _ in range(ops):
+            decoded = json.loads(json.dumps(block))
+            for tx in decoded["transactions"]:
+                hashlib.sha256(bytes.fromhex(tx["clauses"][0]["data"][2:])).hexdigest()
+        best = max(best, ops / (time.perf_counter() - started))
+    return best
+
+
+def to_ratios(results: Dict[str, dict], speed: float) -> Dict[str, dict]:
+    '''Results relative to the calibration speed: throughput / speed, latency * speed'''
+    return {
+        name: {"ops": r["ops"], "throughput": r["throughput"] / speed, "p50": r["p50"] * speed, "p99": r["p99"] * speed}
+        for name, r in results.items()
+    }
+
+
+def from_ratios(ratios: Dict[str, dict], speed: float) -> Dict[str, dict]:
+    '''Expected results on a machine of the calibration speed, see to_ratios()'''
+    return {
+        name: {"ops": r["ops"], "throughput": r["throughput"] * speed, "p50": r["p50"] / speed, "p99": r["p99"] / speed}
+        for name, r in ratios.items()
+    }
+
+
+def scenarios(node: FakeThor, ticker_node: FakeThor) -> Dict[str, Callable]:
+    c = Connect(node.url)
+    clause = c.clause(VTHO, "balanceOf", [WALLET.getAddress()], VTHO_ADDRESS)
+    ticker = Connect(ticker_node.url).ticker()
+
+    def _transact():
+        c.transact(WALLET, VTHO, "transfer", [WALLET.getAddress(), 1], VTHO_ADDRESS)
+        node.mine()
+
+    return {
+        "get_block": lambda: c.get_block("best"),
+        "get_block_expanded": lambda: c.get_block("best", expanded=True),
+        "call": lambda: c.call(WALLET.getAddress(), VTHO, "balanceOf", [WALLET.getAddress()], VTHO_ADDRESS),
+        "call_multi": lambda: c.call_multi(WALLET.getAddress(), [clause] * 10),
+        "transact": _transact,
+        "ticker": lambda: next(ticker),
+    }
+
+
+def run(iterations: int = 200, latency: float = 0.0, only: List[str] = None) -> Dict[str, dict]:
+    '''Run every (or "only" the named) scenario against fresh fake nodes'''
+    results = {}
+    with FakeThor(latency=latency, txs_per_block=50, clauses_per_tx=2, clause_data_size=68) as node, \
+            FakeThor(latency=latency, mine_on_poll=True) as ticker_node:
+        for name, fn in scenarios(node, ticker_node).items():
+            if only and name not in only:
+                continue
+            results[name] = measure(fn, iterations)
+    return results
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float, slack: float = 0.002) -> List[str]:
+    '''
+    Return a list of regressions: throughput dropped or p99 grew beyond tolerance.
+    "slack" (seconds) is added on top of the p99 limit, sub-millisecond jitter is not a regression.
+    '''
+    failures = []
+    for name, r in results.items():
+        b = baseline.get(name)
+        if not b:
+            continue
+        if r["throughput"] < b["throughput"] * (1 - tolerance):
+            failures.append(f"{name}: throughput {r['throughput']:.1f}/s < baseline {b['throughput']:.1f}/s")
+        if r["p99"] > b["p99"] * (1 + tolerance) + slack:
+            failures.append(f"{name}: p99 {r['p99'] * 1000:.2f}ms > baseline {b['p99'] * 1000:.2f}ms")
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark Connect against a fake Thor node")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.0, help="node latency in seconds")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed regression, 0.5 = 50%%")
+    parser.add_argument("--slack", type=float, default=0.002, help="extra p99 allowance in seconds")
+    parser.add_argument("--only", nargs="*", help="scenario names")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    speed = calibrate()
+    print(f"{'calibration':20s} {speed:10.1f} ops/s")
+    results = run(args.iterations, args.latency, args.only)
+    for name, r in results.items():
+        print(f"{name:20s} {r['throughput']:10.1f} ops/s  p50 {r['p50'] * 1000:8.2f}ms  p99 {r['p99'] * 1000:8.2f}ms")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(to_ratios(results, speed), f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline, run with --update-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        failures = compare(results, from_ratios(json.load(f), speed), args.tolerance, args.slack)
+    for failure in failures:
+        print("REGRESSION", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
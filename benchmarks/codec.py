@@ -0,0 +1,106 @@
+'''
+    JSON decode time and bytes on the wire for expanded blocks.
+
+    python3 -m benchmarks.codec
+    python3 -m benchmarks.codec --txs 10 100 500
+
+    Part 1: decode a payload with each codec (best of N runs), raw vs gzip size.
+    Part 2: Connect.get_block(expanded=True) against the fake node,
+            with each codec, with and without gzip.
+'''
+
+import argparse
+import gzip
+import json
+import sys
+import time
+from typing import Dict, List
+
+from thor_requests.codec import JSONCodec, OrjsonCodec
+from thor_requests.connect import Connect
+from thor_requests.transport import HttpTransport
+
+from .fake_thor import FakeThor
+
+
+def codecs() -> Dict[str, JSONCodec]:
+    result = {"json": JSONCodec()}
+    try:
+        result["orjson"] = OrjsonCodec()
+    except Exception:
+        pass
+    return result
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+class CountingTransport(HttpTransport):
+    '''Sums the response bytes as received'''
+
+    def __init__(self):
+        super().__init__()
+        self.wire_bytes = 0
+
+    def request(self, *args, **kwargs):
+        r = super().request(*args, **kwargs)
+        self.wire_bytes += r.wire_bytes
+        return r
+
+
+def decode(txs: int, repeat: int = 20) -> dict:
+    node = FakeThor(head=10, txs_per_block=txs, clauses_per_tx=2, clause_data_size=68)
+    payload = json.dumps(node.block(5, expanded=True)).encode()
+    result = {"bytes": len(payload), "gzip_bytes": len(gzip.compress(payload, 6))}
+    for name, codec in codecs().items():
+        result[name] = best_of(lambda: codec.loads(payload), repeat)
+    return result
+
+
+def end_to_end(txs: int, iterations: int = 20) -> dict:
+    result = {}
+    with FakeThor(head=10, txs_per_block=txs, clauses_per_tx=2, clause_data_size=68) as node:
+        for name, codec in codecs().items():
+            for compress in (False, True):
+                transport = CountingTransport()
+                c = Connect(node.url, transport=transport, codec=codec, compress=compress)
+                c.get_block(5, expanded=True)  # warm up the connection
+                transport.wire_bytes = 0
+                started = time.perf_counter()
+                for _ in range(iterations):
+                    c.get_block(5, expanded=True)
+                key = name + ("+gzip" if compress else "")
+                result[key] = {
+                    "seconds": (time.perf_counter() - started) / iterations,
+                    "wire_bytes": transport.wire_bytes // iterations,
+                }
+    return result
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="JSON codecs and compression on expanded blocks")
+    parser.add_argument("--txs", type=int, nargs="*", default=[10, 100, 500], help="txs per block")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    print("decode (best of 20)")
+    for txs in args.txs:
+        r = decode(txs)
+        times = "  ".join(f"{name} {r[name] * 1000:7.2f}ms" for name in codecs())
+        print(f"  {txs:4d} txs  {r['bytes']:9d} B  gzip {r['gzip_bytes']:8d} B  {times}")
+
+    print("get_block(expanded=True) against the fake node")
+    for txs in args.txs:
+        for key, r in end_to_end(txs, args.iterations).items():
+            print(f"  {txs:4d} txs  {key:12s} {r['seconds'] * 1000:8.2f}ms  {r['wire_bytes']:9d} B on the wire")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
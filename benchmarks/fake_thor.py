@@ -0,0 +1,513 @@
+'''
+    An in-process stand-in of a Thor node, for benchmarks and offline tests.
+
+    Serves (a subset of) the Thor REST API on a local port:
+
+    GET  /blocks/{revision}?expanded=
+    GET  /accounts/{address}?revision=
+    GET  /accounts/{address}/code?revision=
+    GET  /accounts/{address}/storage/{key}?revision=
+    POST /accounts/*?revision=
+    POST /transactions
+    GET  /transactions/{id}
+    GET  /transactions/{id}/receipt
+    POST /logs/event
+    POST /logs/transfer
+
+    Blocks are generated on demand from their number, so a long chain costs no memory.
+    Latency and payload size (txs per block, clauses per tx, clause data size) are configurable.
+    Responses are gzip compressed when the client accepts it, like a real node.
+'''
+
+import gzip
+import itertools
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from typing import Callable, Union
+from urllib.parse import parse_qs, urlparse
+
+from thor_devkit import transaction
+from thor_devkit.cry import blake2b256
+
+GENESIS_TIMESTAMP = 1530316800
+BLOCK_INTERVAL = 10  # seconds between block timestamps
+ZERO_ADDRESS = "0x" + "00" * 20
+
+
+def _hash_hex(*parts) -> str:
+    h, _ = blake2b256([str(p).encode() for p in parts])
+    return h.hex()
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class FakeThor:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        head: int = 100,
+        txs_per_block: int = 0,
+        clauses_per_tx: int = 1,
+        clause_data_size: int = 0,
+        block_interval: float = None,
+        mine_on_poll: bool = False,
+        chain_tag: int = 0xa4,
+        call_result: str = None,
+        account_fn: Callable = None,
+        emulate_fn: Callable = None,
+        events_per_block: int = 0,
+        compress: bool = True,
+        capacity: int = None,
+        code_fn: Callable = None,
+        storage_fn: Callable = None,
+        transfers_fn: Callable = None,
+        timestamp_fn: Callable = None,
+        event_fn: Callable = None,
+        finality_depth: int = 0,
+    ):
+        '''
+        A fake Thor node.
+
+        Parameters
+        ----------
+        latency : float, optional
+            Seconds to sleep before answering each request, by default 0.0
+        head : int, optional
+            Number of the best block at start, by default 100
+        txs_per_block : int, optional
+            Synthetic txs in each block, by default 0
+        clauses_per_tx : int, optional
+            Clauses in each synthetic tx, by default 1
+        clause_data_size : int, optional
+            Bytes of data in each synthetic clause, by default 0
+        block_interval : float, optional
+            Mine a new block every N (real) seconds, by default None (only by mine())
+        mine_on_poll : bool, optional
+            Mine a new block on every GET /blocks/best, by default False
+        chain_tag : int, optional
+            Last byte of the genesis block id, by default 0xa4
+        call_result : str, optional
+            '0x...' data returned by every emulated clause, by default uint256(1)
+        account_fn : Callable, optional
+            (address, block_number) -> {"balance":, "energy":, "hasCode":}
+        emulate_fn : Callable, optional
+            (emulate_body, block_number) -> list of clause outputs
+        events_per_block : int, optional
+            Synthetic event logs in each block (from 2 alternating addresses), by default 0
+        compress : bool, optional
+            Gzip responses (of 256 bytes or more) if the client accepts it, by default True
+        capacity : int, optional
+            Requests served at the same time, more are answered 429, by default None (no limit)
+        code_fn : Callable, optional
+            (address, block_number) -> '0x...' code, by default '0x' (no code)
+        storage_fn : Callable, optional
+            (address, key, block_number) -> '0x' + 32 bytes value, by default a hash of the three
+        transfers_fn : Callable, optional
+            (block_number) -> [{"sender":, "recipient":, "amount":}] VET transfers of the block, by default none
+        timestamp_fn : Callable, optional
+            (block_number) -> timestamp, by default one block every BLOCK_INTERVAL seconds (no missed slot)
+        event_fn : Callable, optional
+            (block_number, index) -> {"address":, "topics":, "data":} of the synthetic events, by default opaque ones
+        finality_depth : int, optional
+            Blocks between the best block and the "finalized" (and "justified") one, by default 0
+        '''
+        self.latency = latency
+        self.head = head
+        self.txs_per_block = txs_per_block
+        self.clauses_per_tx = clauses_per_tx
+        self.clause_data_size = clause_data_size
+        self.block_interval = block_interval
+        self.mine_on_poll = mine_on_poll
+        self.chain_tag = chain_tag
+        self.call_result = call_result or "0x" + (1).to_bytes(32, "big").hex()
+        self.account_fn = account_fn or (lambda address, number: {"balance": hex(10 ** 18), "energy": hex(10 ** 18), "hasCode": False})
+        self.emulate_fn = emulate_fn
+        self.events_per_block = events_per_block
+        self.compress = compress
+        self.capacity = capacity
+        self.code_fn = code_fn or (lambda address, number: "0x")
+        self.storage_fn = storage_fn or (lambda address, key, number: "0x" + _hash_hex(address, key, number))
+        self.transfers_fn = transfers_fn or (lambda number: [])
+        self.timestamp_fn = timestamp_fn or (lambda number: GENESIS_TIMESTAMP + number * BLOCK_INTERVAL)
+        self.finality_depth = finality_depth
+        self.event_fn = event_fn or (lambda number, index: {
+            "address": self.event_address(index),
+            "topics": ["0x" + _hash_hex("topic", index)],
+            "data": "0x" + index.to_bytes(32, "big").hex(),
+        })
+        self.in_flight = 0
+        self.throttled = 0
+        self.posted = {}  # tx id -> (tx dict, block number or None)
+        self.included = {}  # block number -> [tx id]
+        self.pending = []  # tx ids waiting for the next block
+        self.forks = {}  # block number -> times it was replaced by reorg()
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+        self._stop = threading.Event()
+
+    # ---- chain ----
+
+    def block_id(self, number: int) -> str:
+        if number == 0:
+            return "0x" + "00" * 4 + _hash_hex("block", 0)[:54] + "%02x" % self.chain_tag
+        fork = self.forks.get(number)
+        if fork:
+            return "0x" + number.to_bytes(4, "big").hex() + _hash_hex("block", number, fork)[:56]
+        return "0x" + number.to_bytes(4, "big").hex() + _hash_hex("block", number)[:56]
+
+    def synthetic_tx_id(self, number: int, index: int) -> str:
+        return "0x" + number.to_bytes(4, "big").hex() + index.to_bytes(4, "big").hex() + _hash_hex("tx", number, index)[:48]
+
+    def mine(self, count: int = 1) -> int:
+        '''Add blocks on top of the chain, pending txs go into the first one. Return the new head.'''
+        with self._lock:
+            for _ in range(count):
+                self.head += 1
+                if self.pending:
+                    self.included[self.head] = self.pending
+                    for tx_id in self.pending:
+                        self.posted[tx_id] = (self.posted[tx_id][0], self.head)
+                    self.pending = []
+            return self.head
+
+    def reorg(self, depth: int, length: int = None) -> int:
+        '''
+        Replace the last "depth" blocks by a fork of "length" blocks (by default "depth").
+        Return the new head.
+        '''
+        with self._lock:
+            fork_base = self.head - depth
+            self.head = fork_base + (depth if length is None else length)
+            for number in range(fork_base + 1, max(self.head, fork_base + depth) + 1):
+                self.forks[number] = self.forks.get(number, 0) + 1
+            return self.head
+
+    def resolve(self, revision: str) -> Union[int, None]:
+        '''Revision ("best", "finalized", number or id) to a block number, or None'''
+        if revision in ("best", "", None):
+            return self.head
+        if revision in ("finalized", "justified"):
+            return max(0, self.head - self.finality_depth)
+        if revision.startswith("0x") and len(revision) == 66:
+            number = int(revision[2:10], 16)
+            if number <= self.head and self.block_id(number) == revision.lower():
+                return number
+            return None
+        number = int(revision)
+        return number if number <= self.head else None
+
+    def block(self, number: int, expanded: bool = False) -> dict:
+        tx_ids = [self.synthetic_tx_id(number, i) for i in range(self.txs_per_block if number else 0)]
+        tx_ids += self.included.get(number, [])
+        b = {
+            "number": number,
+            "id": self.block_id(number),
+            "size": 300 + len(tx_ids) * (100 + self.clauses_per_tx * self.clause_data_size),
+            "parentID": self.block_id(number - 1) if number else "0xffffffff" + "00" * 28,
+            "timestamp": self.timestamp_fn(number),
+            "gasLimit": 40000000,
+            "beneficiary": ZERO_ADDRESS,
+            "gasUsed": 21000 * len(tx_ids),
+            "totalScore": number * 2,
+            "txsRoot": "0x" + _hash_hex("txsRoot", number),
+            "txsFeatures": 1,
+            "stateRoot": "0x" + _hash_hex("stateRoot", number),
+            "receiptsRoot": "0x" + _hash_hex("receiptsRoot", number),
+            "com": True,
+            "signer": ZERO_ADDRESS,
+            "isTrunk": True,
+            "isFinalized": number + 12 <= self.head,
+            "transactions": tx_ids,
+        }
+        if expanded:
+            b["transactions"] = [dict(self.tx(x), **self.receipt(x)) for x in tx_ids]
+            for tx in b["transactions"]:
+                tx.pop("meta")
+        return b
+
+    def tx(self, tx_id: str) -> Union[dict, None]:
+        if tx_id in self.posted:
+            tx, number = self.posted[tx_id]
+            if number is None:
+                return None
+            return dict(tx, meta=self._meta(number))
+        number, index = int(tx_id[2:10], 16), int(tx_id[10:18], 16)
+        if number > self.head or index >= self.txs_per_block or self.synthetic_tx_id(number, index) != tx_id:
+            return None
+        return {
+            "id": tx_id,
+            "chainTag": self.chain_tag,
+            "blockRef": self.block_id(max(number - 1, 0))[0:18],
+            "expiration": 32,
+            "clauses": [
+                {"to": "0x" + _hash_hex("to", i)[:40], "value": "0x0", "data": "0x" + "ab" * self.clause_data_size}
+                for i in range(self.clauses_per_tx)
+            ],
+            "gasPriceCoef": 0,
+            "gas": 21000 * self.clauses_per_tx,
+            "origin": "0x" + _hash_hex("origin", number, index)[:40],
+            "delegator": None,
+            "nonce": "0x" + _hash_hex("nonce", number, index)[:16],
+            "dependsOn": None,
+            "size": 100 + self.clauses_per_tx * self.clause_data_size,
+            "meta": self._meta(number),
+        }
+
+    def receipt(self, tx_id: str) -> Union[dict, None]:
+        tx = self.tx(tx_id)
+        if not tx:
+            return None
+        number = tx["meta"]["blockNumber"]
+        outputs = [{"contractAddress": None, "events": [], "transfers": []} for _ in tx["clauses"]]
+        if tx_id == self.synthetic_tx_id(number, 0):
+            outputs[0]["events"] = self.block_events(number)
+            outputs[0]["transfers"] = self.transfers_fn(number)
+        return {
+            "gasUsed": tx["gas"],
+            "gasPayer": tx["origin"],
+            "paid": hex(tx["gas"] * 10 ** 13),
+            "reward": hex(tx["gas"] * 3 * 10 ** 12),
+            "reverted": False,
+            "meta": dict(self._meta(number), txID=tx_id, txOrigin=tx["origin"]),
+            "outputs": outputs,
+        }
+
+    def _meta(self, number: int) -> dict:
+        return {
+            "blockID": self.block_id(number),
+            "blockNumber": number,
+            "blockTimestamp": self.timestamp_fn(number),
+        }
+
+    def event_address(self, index: int) -> str:
+        return "0x" + _hash_hex("event", index % 2)[:40]
+
+    def block_events(self, number: int) -> list:
+        '''Synthetic events of a block, all emitted by the first clause of its first tx'''
+        return [self.event_fn(number, index) for index in range(self.events_per_block)]
+
+    def events(self, body: dict) -> list:
+        '''Synthetic logs matching a /logs/event query (criteria: "address" only)'''
+        frm = max(body["range"]["from"], 1)
+        to = min(body["range"]["to"], self.head)
+        wanted = {c["address"].lower() for c in body.get("criteriaSet") or [] if c.get("address")}
+        numbers = range(frm, to + 1)
+        if body.get("order") == "desc":
+            numbers = reversed(numbers)
+
+        def _all():
+            for number in numbers:
+                for event in self.block_events(number):
+                    if wanted and event["address"].lower() not in wanted:
+                        continue
+                    tx_id = self.synthetic_tx_id(number, 0)
+                    yield dict(event, meta=dict(self._meta(number), txID=tx_id, txOrigin=ZERO_ADDRESS, clauseIndex=0))
+
+        options = body.get("options") or {}
+        offset = options.get("offset", 0)
+        return list(itertools.islice(_all(), offset, offset + options.get("limit", 256)))
+
+    def transfers(self, body: dict) -> list:
+        '''Logs of transfers_fn matching a /logs/transfer query (criteria: "sender" and "recipient")'''
+        frm = max(body["range"]["from"], 1)
+        to = min(body["range"]["to"], self.head)
+        criteria_set = body.get("criteriaSet") or []
+        numbers = range(frm, to + 1)
+        if body.get("order") == "desc":
+            numbers = reversed(numbers)
+
+        def _match(transfer: dict) -> bool:
+            return not criteria_set or any(
+                all(transfer[k].lower() == v.lower() for k, v in criteria.items() if k in ("sender", "recipient"))
+                for criteria in criteria_set
+            )
+
+        def _all():
+            for number in numbers:
+                for transfer in self.transfers_fn(number):
+                    if _match(transfer):
+                        meta = dict(self._meta(number), txID=self.synthetic_tx_id(number, 0), txOrigin=transfer["sender"], clauseIndex=0)
+                        yield dict(transfer, meta=meta)
+
+        options = body.get("options") or {}
+        offset = options.get("offset", 0)
+        return list(itertools.islice(_all(), offset, offset + options.get("limit", 256)))
+
+    def emulate(self, body: dict, number: int) -> list:
+        if self.emulate_fn:
+            return self.emulate_fn(body, number)
+        return [
+            {"data": self.call_result if clause.get("data", "0x") != "0x" else "0x", "events": [], "transfers": [], "gasUsed": 1000, "reverted": False, "vmError": ""}
+            for clause in body["clauses"]
+        ]
+
+    def post(self, raw: str) -> str:
+        tx = transaction.Transaction.decode(bytes.fromhex(raw[2:]), False)
+        tx_id = tx.get_id()
+        body = tx.get_body()
+        tx_dict = {
+            "id": tx_id,
+            "chainTag": body["chainTag"],
+            "blockRef": body["blockRef"],
+            "expiration": body["expiration"],
+            "clauses": [{"to": c["to"], "value": hex(int(c["value"])), "data": c["data"]} for c in body["clauses"]],
+            "gasPriceCoef": body["gasPriceCoef"],
+            "gas": body["gas"],
+            "origin": tx.get_origin(),
+            "delegator": tx.get_delegator() if tx.is_delegated() else None,
+            "nonce": hex(body["nonce"]),
+            "dependsOn": body["dependsOn"],
+            "size": len(raw) // 2 - 1,
+        }
+        with self._lock:
+            if tx_id not in self.posted:
+                self.posted[tx_id] = (tx_dict, None)
+                self.pending.append(tx_id)
+        return tx_id
+
+    # ---- http ----
+
+    def handle(self, verb: str, path: str, body: bytes):
+        '''Route a request, return (status, payload), payload is json-able or bytes'''
+        url = urlparse(path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        parts = [p for p in url.path.split("/") if p]
+        revision = query.get("revision", "best")
+
+        if verb == "GET" and len(parts) == 2 and parts[0] == "blocks":
+            if parts[1] == "best" and self.mine_on_poll:
+                self.mine()
+            number = self.resolve(parts[1])
+            if number is None:
+                return 200, None
+            return 200, self.block(number, query.get("expanded") == "true")
+
+        if verb == "GET" and len(parts) == 2 and parts[0] == "accounts":
+            number = self.resolve(revision)
+            if number is None:
+                return 400, b"revision: not found"
+            return 200, self.account_fn(parts[1].lower(), number)
+
+        if verb == "GET" and len(parts) == 3 and parts[0] == "accounts" and parts[2] == "code":
+            number = self.resolve(revision)
+            if number is None:
+                return 400, b"revision: not found"
+            return 200, {"code": self.code_fn(parts[1].lower(), number)}
+
+        if verb == "GET" and len(parts) == 4 and parts[0] == "accounts" and parts[2] == "storage":
+            number = self.resolve(revision)
+            if number is None:
+                return 400, b"revision: not found"
+            return 200, {"value": self.storage_fn(parts[1].lower(), parts[3].lower(), number)}
+
+        if verb == "POST" and parts == ["accounts", "*"]:
+            number = self.resolve(revision)
+            if number is None:
+                return 400, b"revision: not found"
+            return 200, self.emulate(json.loads(body), number)
+
+        if verb == "POST" and parts == ["transactions"]:
+            try:
+                return 200, {"id": self.post(json.loads(body)["raw"])}
+            except Exception as e:
+                return 400, f"bad tx: {e}".encode()
+
+        if verb == "POST" and parts == ["logs", "event"]:
+            return 200, self.events(json.loads(body))
+
+        if verb == "POST" and parts == ["logs", "transfer"]:
+            return 200, self.transfers(json.loads(body))
+
+        if verb == "GET" and len(parts) == 2 and parts[0] == "transactions":
+            return 200, self.tx(parts[1].lower())
+
+        if verb == "GET" and len(parts) == 3 and parts[0] == "transactions" and parts[2] == "receipt":
+            return 200, self.receipt(parts[1].lower())
+
+        return 404, b"not found"
+
+    def _handler_class(self):
+        node = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True  # headers and body are separate writes
+
+            def _serve(self, verb: str):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                with node._lock:
+                    node.requests += 1
+                    busy = node.capacity is not None and node.in_flight >= node.capacity
+                    if busy:
+                        node.throttled += 1
+                    else:
+                        node.in_flight += 1
+                if busy:
+                    status, payload = 429, b"too many requests"
+                else:
+                    try:
+                        if node.latency:
+                            time.sleep(node.latency)
+                        status, payload = node.handle(verb, self.path, body)
+                    finally:
+                        with node._lock:
+                            node.in_flight -= 1
+                data = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+                gzipped = node.compress and len(data) >= 256 and "gzip" in (self.headers.get("Accept-Encoding") or "")
+                if gzipped:
+                    data = gzip.compress(data, 6)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json" if not isinstance(payload, bytes) else "text/plain")
+                if gzipped:
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> str:
+        '''Start serving in background threads, return the url'''
+        self._server = _Server(("127.0.0.1", 0), self._handler_class())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        if self.block_interval:
+            threading.Thread(target=self._auto_mine, daemon=True).start()
+        return self.url
+
+    def _auto_mine(self):
+        while not self._stop.wait(self.block_interval):
+            self.mine()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def stop(self):
+        self._stop.set()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *args):
+        self.stop()
@@ -0,0 +1,104 @@
+'''
+    Import time of thor_requests modules, measured with "python -X importtime".
+
+    python3 -m benchmarks.importtime                   # run, compare with importtime.json
+    python3 -m benchmarks.importtime --update-baseline # run, save as the new baseline
+
+    Besides the time, a module regresses if it imports a heavy dependency
+    (thor_devkit, requests) that it used to defer.
+    Exit code is 1 if any module regressed.
+'''
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "importtime.json")
+
+MODULES = ("thor_requests.connect", "thor_requests.wallet", "thor_requests.transport")
+HEAVY = ("thor_devkit", "requests", "eth_abi", "eth_keys")
+
+_PROBE = "import sys, json, {module}; print(json.dumps([m for m in {heavy!r} if m in sys.modules]))"
+
+
+def parse_importtime(stderr: str, module: str) -> int:
+    '''Cumulative import time (microseconds) of "module" from -X importtime output'''
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = [p.strip() for p in line[len("import time:"):].split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise Exception(f"{module} not found in importtime output")
+
+
+def measure(module: str, runs: int = 5) -> dict:
+    '''Median cumulative import time (us) over fresh interpreters, and heavy modules loaded'''
+    samples = []
+    heavy = []
+    for _ in range(runs):
+        p = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module, heavy=HEAVY)],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            check=True,
+        )
+        samples.append(parse_importtime(p.stderr, module))
+        heavy = json.loads(p.stdout)
+    return {"us": int(statistics.median(samples)), "heavy": heavy}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float, slack: int = 5000) -> List[str]:
+    '''
+    Return a list of regressions: slower beyond tolerance (+ slack microseconds),
+    or a heavy module is now imported eagerly.
+    '''
+    failures = []
+    for module, r in results.items():
+        b = baseline.get(module)
+        if not b:
+            continue
+        if r["us"] > b["us"] * (1 + tolerance) + slack:
+            failures.append(f"{module}: {r['us'] / 1000:.1f}ms > baseline {b['us'] / 1000:.1f}ms")
+        eager = sorted(set(r["heavy"]) - set(b["heavy"]))
+        if eager:
+            failures.append(f"{module}: now imports {', '.join(eager)}")
+    return failures
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure import time of thor_requests modules")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed regression, 0.5 = 50%%")
+    parser.add_argument("--modules", nargs="*", default=list(MODULES))
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results = {m: measure(m, args.runs) for m in args.modules}
+    for module, r in results.items():
+        print(f"{module:30s} {r['us'] / 1000:8.1f}ms  heavy: {', '.join(r['heavy']) or '-'}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("no baseline, run with --update-baseline first")
+        return 0
+    with open(args.baseline) as f:
+        failures = compare(results, json.load(f), args.tolerance)
+    for failure in failures:
+        print("REGRESSION", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
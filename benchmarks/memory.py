@@ -0,0 +1,124 @@
+'''
+    Memory per block / tx / receipt: raw JSON dicts vs results.* slotted objects.
+
+    python3 -m benchmarks.memory
+    python3 -m benchmarks.memory --count 5000 --txs 50
+
+    Measured with tracemalloc, after json.loads (what Connect returns),
+    so the numbers include the strings each form keeps alive.
+
+    Also: peak memory to walk the txs of one expanded block,
+    json.loads of the whole body vs jsonstream.iter_array (Connect.stream_block).
+'''
+
+import argparse
+import gc
+import json
+import sys
+import tracemalloc
+from typing import Callable, Dict, Iterator, List
+
+from thor_requests.jsonstream import iter_array
+from thor_requests.results import Block, Receipt, Tx
+
+from .fake_thor import FakeThor
+
+
+def allocated(build: Callable[[], list]) -> int:
+    '''Bytes still allocated by the list build() returns'''
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del items
+    return after - before
+
+
+def payloads(count: int, txs: int) -> Dict[str, List[bytes]]:
+    '''JSON bytes as the node sends them'''
+    node = FakeThor(head=count + 1, txs_per_block=txs, clauses_per_tx=2, clause_data_size=68)
+    tx_ids = [node.synthetic_tx_id(n, 0) for n in range(1, count + 1)]
+    return {
+        "block": [json.dumps(node.block(n)).encode() for n in range(1, count + 1)],
+        "expanded_block": [json.dumps(node.block(n, True)).encode() for n in range(1, min(count, 200) + 1)],
+        "tx": [json.dumps(node.tx(x)).encode() for x in tx_ids],
+        "receipt": [json.dumps(node.receipt(x)).encode() for x in tx_ids],
+    }
+
+
+def run(count: int = 2000, txs: int = 20) -> Dict[str, dict]:
+    classes = {"block": Block, "expanded_block": Block, "tx": Tx, "receipt": Receipt}
+    results = {}
+    for name, raws in payloads(count, txs).items():
+        cls = classes[name]
+        as_dict = allocated(lambda: [json.loads(r) for r in raws])
+        as_slots = allocated(lambda: [cls(json.loads(r)) for r in raws])
+        results[name] = {
+            "dict": as_dict // len(raws),
+            "slots": as_slots // len(raws),
+            "ratio": as_slots / as_dict,
+        }
+    return results
+
+
+def expanded_block_chunks(txs: int, chunk_size: int = 65536) -> Iterator[bytes]:
+    '''Body of an expanded block with "txs" txs, generated (and cut in chunks) on the fly'''
+    node = FakeThor(head=10, txs_per_block=txs, clauses_per_tx=2, clause_data_size=68)
+    header = FakeThor(head=10).block(5)  # without the tx ids
+    body = json.dumps(header)[:-2].encode()  # open the "transactions" array
+    pending = bytearray(body)
+    for i in range(txs):
+        tx_id = node.synthetic_tx_id(5, i)
+        tx = dict(node.tx(tx_id), **node.receipt(tx_id))
+        tx.pop("meta")
+        pending += (b"," if i else b"") + json.dumps(tx).encode()
+        while len(pending) >= chunk_size:
+            yield bytes(pending[:chunk_size])
+            del pending[:chunk_size]
+    yield bytes(pending) + b"]}"
+
+
+def peak(fn: Callable[[], None]) -> int:
+    '''Peak bytes allocated while fn() runs'''
+    gc.collect()
+    tracemalloc.start()
+    fn()
+    result = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result
+
+
+def _walk_whole(txs: int):
+    body = b"".join(expanded_block_chunks(txs))
+    for tx in json.loads(body)["transactions"]:
+        pass
+
+
+def _walk_stream(txs: int):
+    for tx in iter_array(expanded_block_chunks(txs), "transactions"):
+        pass
+
+
+def stream_peaks(sizes: List[int]) -> Dict[int, dict]:
+    return {txs: {"whole": peak(lambda: _walk_whole(txs)), "stream": peak(lambda: _walk_stream(txs))} for txs in sizes}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Memory of dict results vs slotted results")
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--txs", type=int, default=20, help="txs per block")
+    args = parser.parse_args(argv)
+
+    for name, r in run(args.count, args.txs).items():
+        print(f"{name:15s} dict {r['dict']:8d} B  slots {r['slots']:8d} B  ({r['ratio'] * 100:.0f}%)")
+
+    print("peak memory to walk an expanded block")
+    for txs, r in stream_peaks([100, 1000, 10000]).items():
+        print(f"{txs:6d} txs  json.loads {r['whole'] / 1e6:8.2f} MB  streamed {r['stream'] / 1e6:8.2f} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+'''
+    Deterministic profiling of Connect: record once, replay under cProfile.
+
+    python3 -m benchmarks.profiling record calls.jsonl.gz                 # against the fake node
+    python3 -m benchmarks.profiling record calls.jsonl.gz --url URL --tx 0x..  # real node, read-only
+    python3 -m benchmarks.profiling replay calls.jsonl.gz --top 30
+
+    The replay has no node latency (unless --latency),
+    so the profile shows only the library's own hot spots (_beautify, ABI, signing...)
+'''
+
+import argparse
+import cProfile
+import pstats
+import sys
+from typing import Callable, List
+
+from thor_requests.connect import Connect
+from thor_requests.const import VTHO_ADDRESS
+from thor_requests.transport import RecordingTransport, ReplayTransport
+
+from .bench import VTHO, WALLET
+from .fake_thor import FakeThor
+
+
+def workload(c: Connect, rounds: int = 50, mine: Callable = None, tx_id: str = None):
+    '''call() many times, then transact() and replay_tx() (if possible)'''
+    for _ in range(rounds):
+        c.call(WALLET.getAddress(), VTHO, "balanceOf", [WALLET.getAddress()], VTHO_ADDRESS)
+    if mine:
+        for _ in range(rounds // 10 or 1):
+            tx_id = c.transact(WALLET, VTHO, "transfer", [WALLET.getAddress(), 1], VTHO_ADDRESS)["id"]
+            mine()
+            c.replay_tx(tx_id)
+    elif tx_id:
+        for _ in range(rounds // 10 or 1):
+            c.replay_tx(tx_id)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Record and replay Connect workloads")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("file")
+    parser.add_argument("--url", help="record against a real node instead of the fake one")
+    parser.add_argument("--tx", help="tx id to replay_tx() on the real node")
+    parser.add_argument("--rounds", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.0, help="synthetic latency per request on replay")
+    parser.add_argument("--sort", default="cumulative")
+    parser.add_argument("--top", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    if args.mode == "record":
+        transport = RecordingTransport(args.file)
+        if args.url:
+            workload(Connect(args.url, transport=transport, emulation_cache=False), args.rounds, tx_id=args.tx)
+        else:
+            with FakeThor() as node:
+                workload(Connect(node.url, transport=transport, emulation_cache=False), args.rounds, mine=node.mine)
+        transport.close()
+        print(f"recorded to {args.file}")
+        return 0
+
+    c = Connect(args.url or "http://replay", transport=ReplayTransport(args.file, latency=args.latency), emulation_cache=False)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    workload(c, args.rounds, mine=(lambda: None) if not args.tx else None, tx_id=args.tx)
+    profiler.disable()
+    pstats.Stats(profiler).sort_stats(args.sort).print_stats(args.top)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -29,5 +29,8 @@ setuptools.setup(
     },
     python_requires=">=3.6",
     install_requires=[x.strip() for x in open("requirements.txt")],
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=["benchmarks", "benchmarks.*"]),
+    entry_points={
+        "console_scripts": ["thor-requests=thor_requests.cli:main"],
+    },
 )
@@ -3,6 +3,7 @@ import pytest
 from thor_requests.wallet import Wallet
 from thor_requests.connect import Connect
 from thor_requests.contract import Contract
+from benchmarks.fake_thor import FakeThor
 
 
 @pytest.fixture
@@ -24,6 +25,20 @@ def solo_connector():
     raise Exception("Cannot connect to a reliable solo node to run tests")
 
 
+@pytest.fixture
+def fake_node():
+    """An in-process fake Thor node, see benchmarks/fake_thor.py"""
+    node = FakeThor()
+    node.start()
+    yield node
+    node.stop()
+
+
+@pytest.fixture
+def fake_connector(fake_node):
+    return Connect(fake_node.url)
+
+
 @pytest.fixture
 def solo_wallet():
     return Wallet.fromMnemonic(
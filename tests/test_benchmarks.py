@@ -0,0 +1,37 @@
+''' Smoke test the benchmark suite and the fake node '''
+from benchmarks import bench
+
+from .fixtures import fake_node, fake_connector, solo_wallet, vtho_contract, vtho_contract_address
+
+
+def test_fake_node(fake_node, fake_connector, solo_wallet, vtho_contract, vtho_contract_address):
+    assert fake_connector.get_chainTag() == fake_node.chain_tag
+    best = fake_connector.get_block()
+    assert fake_connector.get_block(best["number"] - 1)["id"] == best["parentID"]
+
+    res = fake_connector.transact(solo_wallet, vtho_contract, "transfer", [vtho_contract_address, 1], vtho_contract_address)
+    assert fake_connector.get_tx_receipt(res["id"]) is None
+    fake_node.mine()
+    receipt = fake_connector.get_tx_receipt(res["id"])
+    assert receipt["meta"]["blockNumber"] == best["number"] + 1
+    assert fake_connector.get_tx(res["id"])["origin"] == solo_wallet.getAddress()
+
+
+def test_run_and_compare():
+    results = bench.run(iterations=3, only=["get_block", "call", "ticker"])
+    assert set(results) == {"get_block", "call", "ticker"}
+    assert results["call"]["throughput"] > 0
+
+    baseline = {"call": dict(results["call"], throughput=results["call"]["throughput"] * 10)}
+    failures = bench.compare(results, baseline, tolerance=0.5)
+    assert len(failures) == 1 and failures[0].startswith("call: throughput")
+
+
+def test_baseline_relative_to_calibration():
+    speed = bench.calibrate(rounds=1, ops=5)
+    assert speed > 0
+    results = {"call": {"ops": 3, "throughput": 250.0, "p50": 0.004, "p99": 0.005}}
+    # Saved on a machine, compared on one twice as fast: twice the throughput is expected.
+    expected = bench.from_ratios(bench.to_ratios(results, 1000.0), 2000.0)
+    assert expected["call"]["throughput"] == 500.0 and expected["call"]["p99"] == 0.0025
+    assert bench.compare(results, expected, tolerance=0.5, slack=0) == ["call: p99 5.00ms > baseline 2.50ms"]
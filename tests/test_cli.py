@@ -0,0 +1,105 @@
+''' Test the thor-requests command line tool, against the fake node '''
+import io
+import json
+
+import pytest
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.cli import main
+from thor_requests.connect import Connect
+from thor_requests.utils import build_tx_body, calc_blockRef, calc_nonce, calc_tx_signed
+
+from .fixtures import solo_wallet
+
+
+@pytest.fixture
+def node():
+    with FakeThor(head=30, events_per_block=3) as node:
+        yield node
+
+
+def _run(node, argv, stdin=""):
+    out = io.StringIO()
+    code = main(["--node", node.url, "--workers", "4"] + argv, stdin=io.StringIO(stdin), stdout=out)
+    return code, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_balances(node):
+    addresses = ["0x" + "%040x" % i for i in range(20)]
+    code, rows = _run(node, ["balances", "--block", "10"], "\n".join(addresses) + "\n# comment\n\n")
+    assert code == 0
+    assert [r["address"] for r in rows] == addresses  # input order is kept
+    assert rows[0]["vet"] == str(10 ** 18) and rows[0]["vtho"] == str(10 ** 18)
+
+
+def test_balances_error_line(node):
+    code, rows = _run(node, ["balances", "--block", "999"], "0x" + "00" * 20)
+    assert code == 1
+    assert "error" in rows[0]
+
+
+def test_blocks(node):
+    code, rows = _run(node, ["blocks", "25"])
+    assert code == 0
+    assert [b["number"] for b in rows] == [25, 26, 27, 28, 29, 30]
+
+
+def test_blocks_past_the_head(node):
+    code, rows = _run(node, ["blocks", "28", "33"])
+    assert code == 1
+    assert [b["number"] for b in rows] == [28, 29, 30, 31, 32, 33]
+    assert rows[2]["id"] == node.block_id(30)
+    assert rows[3] == {"number": 31, "error": "block 31 not found"}
+
+    code, rows = _run(node, ["replay", "--blocks", "30", "31"])
+    assert code == 1
+    assert rows == [{"blockNumber": 31, "error": "block 31 not found"}]  # block 30 has no tx
+
+
+def test_events_paged_and_chunked(node):
+    code, rows = _run(node, ["events", "1", "20", "--chunk", "7", "--page-size", "4"])
+    assert code == 0
+    assert len(rows) == 60
+    assert [e["meta"]["blockNumber"] for e in rows] == sorted(e["meta"]["blockNumber"] for e in rows)
+
+    code, rows = _run(node, ["events", "1", "20", "--address", node.event_address(1)])
+    assert len(rows) == 20
+    assert {e["address"] for e in rows} == {node.event_address(1)}
+
+
+def test_events_failed_page(node, monkeypatch):
+    # The third page of the chunk 1..7 fails: its events so far, then an error record for it.
+    filter_logs = Connect._filter_logs
+
+    def _failing(self, kind, from_block, to_block, criteria_set, offset, limit, order):
+        if from_block == 1 and offset >= 8:
+            raise Exception("node down")
+        return filter_logs(self, kind, from_block, to_block, criteria_set, offset, limit, order)
+
+    monkeypatch.setattr(Connect, "_filter_logs", _failing)
+    code, rows = _run(node, ["events", "1", "14", "--chunk", "7", "--page-size", "4"])
+    assert code == 1
+    assert len(rows) == 8 + 1 + 21
+    assert rows[8] == {"from": 1, "to": 7, "error": "node down"}
+    assert {e["meta"]["blockNumber"] for e in rows[9:]} == set(range(8, 15))
+
+
+def test_broadcast_and_receipts(node, solo_wallet):
+    raws = []
+    for _ in range(3):
+        body = build_tx_body(
+            [{"to": "0x" + "00" * 20, "value": 1, "data": "0x"}],
+            node.chain_tag, calc_blockRef(node.block_id(node.head)), calc_nonce(), gas=21000,
+        )
+        raws.append(calc_tx_signed(solo_wallet, body, encode=True))
+
+    code, rows = _run(node, ["broadcast"], "\n".join(raws + ["0xbad"]))
+    assert code == 1
+    assert [r["raw"] for r in rows] == raws + ["0xbad"]
+    assert "error" in rows[-1]
+
+    node.mine()
+    tx_ids = "\n".join(r["id"] for r in rows[:3])
+    code, rows = _run(node, ["receipts"], tx_ids)
+    assert code == 0
+    assert all(r["receipt"]["meta"]["blockNumber"] == node.head for r in rows)
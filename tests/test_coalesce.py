@@ -0,0 +1,113 @@
+''' Test the call coalescer: concurrent calls merged into multi-clause emulations '''
+import threading
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.coalesce import CallCoalescer
+from thor_requests.connect import Connect
+
+from .fixtures import vtho_contract, vtho_contract_address
+
+CALLER = "0x" + "ab" * 20
+POISON = 13  # balanceOf(POISON) reverts
+REVERT = "0x08c379a0" + (32).to_bytes(32, "big").hex() + (3).to_bytes(32, "big").hex() + b"bad".hex().ljust(64, "0")
+
+
+class Emulator:
+    '''balanceOf(x) returns x; stops at the first clause that reverts, like the node'''
+
+    def __init__(self, gas_for: int = None):
+        self.bodies = []
+        self.gas_for = gas_for  # clauses a tx has gas for, the next one runs out of gas
+        self.lock = threading.Lock()
+
+    def __call__(self, body, number):
+        with self.lock:
+            self.bodies.append(body)
+        results = []
+        for index, clause in enumerate(body["clauses"]):
+            arg = clause["data"][2:][-64:]
+            if index == self.gas_for:
+                results.append({"data": "0x", "events": [], "transfers": [], "gasUsed": 10, "reverted": True, "vmError": "out of gas"})
+                break
+            if not arg:  # VET transfer
+                results.append({"data": "0x", "events": [], "transfers": [], "gasUsed": 0, "reverted": False, "vmError": ""})
+                continue
+            if int(arg, 16) == POISON:
+                results.append({"data": REVERT, "events": [], "transfers": [], "gasUsed": 10, "reverted": True, "vmError": "evm: execution reverted"})
+                break
+            results.append({"data": "0x" + arg, "events": [], "transfers": [], "gasUsed": 10, "reverted": False, "vmError": ""})
+        return results
+
+
+def _holder(i: int) -> str:
+    return "0x" + i.to_bytes(20, "big").hex()
+
+
+def _concurrent(coalescer, contract, address, holders) -> list:
+    results = [None] * len(holders)
+    start = threading.Barrier(len(holders))
+
+    def _run(i):
+        start.wait()
+        results[i] = coalescer.call(CALLER, contract, "balanceOf", [holders[i]], address)
+
+    threads = [threading.Thread(target=_run, args=(i,)) for i in range(len(holders))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return results
+
+
+def test_concurrent_calls_share_emulations(vtho_contract, vtho_contract_address):
+    emulator = Emulator()
+    with FakeThor(emulate_fn=emulator) as node:
+        coalescer = CallCoalescer(Connect(node.url), window=0.05, max_batch=16)
+        holders = [_holder(i + 100) for i in range(40)]
+        results = _concurrent(coalescer, vtho_contract, vtho_contract_address, holders)
+
+        assert [r["decoded"]["0"] for r in results] == [i + 100 for i in range(40)]
+        assert coalescer.calls == 40
+        assert len(emulator.bodies) == coalescer.batches <= 6
+        assert max(len(b["clauses"]) for b in emulator.bodies) == 16
+
+
+def test_revert_in_a_batch(vtho_contract, vtho_contract_address):
+    emulator = Emulator()
+    with FakeThor(emulate_fn=emulator) as node:
+        coalescer = CallCoalescer(Connect(node.url), window=0.05, max_batch=64)
+        holders = [_holder(i) for i in range(10, 20)]
+        results = _concurrent(coalescer, vtho_contract, vtho_contract_address, holders)
+
+        for holder, result in zip(range(10, 20), results):
+            if holder == POISON:
+                assert result["reverted"] and result["decoded"]["revertReason"] == "bad"
+            else:
+                assert result["decoded"]["0"] == holder  # the clauses after the revert were sent again
+
+
+def test_state_changing_calls_go_alone(vtho_contract, vtho_contract_address):
+    emulator = Emulator()
+    with FakeThor(emulate_fn=emulator) as node:
+        coalescer = CallCoalescer(Connect(node.url), window=0.05)
+        coalescer.call(CALLER, vtho_contract, "transfer", [_holder(1), 1], vtho_contract_address)
+        coalescer.call(CALLER, vtho_contract, "balanceOf", [_holder(2)], vtho_contract_address, gas=100000)
+        assert len(emulator.bodies) == coalescer.batches == 2
+
+
+def test_out_of_gas_in_a_batch_checked_alone(vtho_contract, vtho_contract_address):
+    emulator = Emulator(gas_for=4)
+    with FakeThor(emulate_fn=emulator) as node:
+        coalescer = CallCoalescer(Connect(node.url), window=0.05, max_batch=64)
+        holders = [_holder(i) for i in range(100, 110)]
+        results = _concurrent(coalescer, vtho_contract, vtho_contract_address, holders)
+        assert [r["decoded"]["0"] for r in results] == list(range(100, 110))  # nobody sees the shared out of gas
+
+
+def test_vet_transfer_goes_alone():
+    emulator = Emulator()
+    with FakeThor(emulate_fn=emulator) as node:
+        coalescer = CallCoalescer(Connect(node.url), window=0.05)
+        result = coalescer.call(CALLER, None, None, None, _holder(1), value=5)
+        assert not result["reverted"]
+        assert len(emulator.bodies) == coalescer.batches == 1
@@ -0,0 +1,37 @@
+''' Test the JSON codecs and response compression '''
+import json
+
+import pytest
+
+from benchmarks.codec import CountingTransport
+from benchmarks.fake_thor import FakeThor
+from thor_requests.codec import JSONCodec, OrjsonCodec, default_codec
+from thor_requests.connect import Connect
+
+
+def test_codecs_agree():
+    body = {"clauses": [{"to": "0x" + "00" * 20, "value": 10 ** 30, "data": "0x"}], "gas": 21000}
+    for codec in (JSONCodec(), default_codec()):
+        assert json.loads(codec.dumps(body)) == body  # big ints fall back to stdlib
+        response = {"balance": hex(10 ** 30), "number": 5, "data": "0x", "reverted": False}
+        assert codec.loads(json.dumps(response).encode()) == response
+
+
+def test_default_codec_is_orjson_if_installed():
+    pytest.importorskip("orjson")
+    assert isinstance(default_codec(), OrjsonCodec)
+    assert Connect("http://localhost:8669").codec.name == "orjson"
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_gzip_negotiation(compress):
+    with FakeThor(txs_per_block=20, clause_data_size=68) as node:
+        transport = CountingTransport()
+        c = Connect(node.url, transport=transport, codec=JSONCodec(), compress=compress)
+        block = c.get_block(5, expanded=True)
+        assert block == json.loads(json.dumps(node.block(5, expanded=True)))
+        size = len(json.dumps(block))
+        if compress:
+            assert transport.wire_bytes < size / 3
+        else:
+            assert transport.wire_bytes == size
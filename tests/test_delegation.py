@@ -0,0 +1,90 @@
+''' Test the VIP-201 delegation service on a local port '''
+import asyncio
+import json
+
+from thor_devkit import transaction
+from thor_requests.delegation import DelegationService, load_test
+from thor_requests import utils
+
+from .fixtures import solo_wallet, clean_wallet
+
+
+def _raw(nonce: int) -> str:
+    body = utils.build_tx_body(
+        [{"to": "0x7567d83b7b8d80addcb281a71d54fc7b3364ffed", "value": 10000, "data": "0x"}],
+        1, "0x00000000aabbccdd", nonce, gas=21000, feeDelegation=True)
+    return "0x" + transaction.Transaction(body).encode().hex()
+
+
+def _small_value_only(tx_payer, tx_origin, tx):
+    if int(tx.get_body()["clauses"][0]["value"]) > 10000:
+        return False, "too much"
+    return True, ""
+
+
+def test_handle(solo_wallet, clean_wallet):
+    service = DelegationService(solo_wallet, _small_value_only, rate=2)
+    origin = clean_wallet.getAddress()
+    body = json.dumps({"raw": _raw(1), "origin": origin}).encode()
+    loop = asyncio.new_event_loop()
+
+    status, payload = loop.run_until_complete(service.handle(body))
+    assert status == 200
+    # Signature matches the one from utils.sign_delegated_tx
+    expected = utils.sign_delegated_tx(solo_wallet, origin, _raw(1), False, _small_value_only)
+    assert payload["signature"] == expected["signature"]
+
+    # Cached on the second request, then rate limited on the third
+    assert loop.run_until_complete(service.handle(body)) == (200, payload)
+    assert loop.run_until_complete(service.handle(body))[0] == 429
+    assert loop.run_until_complete(service.handle(b"{}"))[0] == 400
+
+    stats = service.stats()
+    assert stats["signed"] == 2
+    assert stats["cache_hits"] == 1
+    assert stats["rate_limited"] == 1
+    assert stats["latency"]["count"] == 4
+    loop.close()
+
+
+def test_load(solo_wallet):
+    service = DelegationService(solo_wallet, _small_value_only, rate=1000)
+    origin = solo_wallet.getAddress()
+    bodies = [{"raw": _raw(i % 20), "origin": origin} for i in range(200)]
+    loop = asyncio.new_event_loop()
+
+    server = loop.run_until_complete(service.start("127.0.0.1", 0))
+    port = server.sockets[0].getsockname()[1]
+    result = loop.run_until_complete(load_test("127.0.0.1", port, bodies, concurrency=8))
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
+
+    assert result["requests"] == 200
+    assert result["status"] == {200: 200}
+    assert service.stats()["cache_hits"] >= 150
+
+
+def test_malformed_http(solo_wallet):
+    service = DelegationService(solo_wallet, _small_value_only)
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(service.start("127.0.0.1", 0))
+    port = server.sockets[0].getsockname()[1]
+
+    async def _status(request: bytes) -> int:
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(request)
+        await writer.drain()
+        start_line = (await reader.readline()).decode("latin-1")
+        writer.close()
+        return int(start_line.split(" ")[1])
+
+    assert loop.run_until_complete(_status(b"GARBAGE\r\n\r\n")) == 400
+    assert loop.run_until_complete(_status(b"POST / HTTP/1.1\r\nContent-Length: abc\r\n\r\n")) == 400
+    too_large = "POST / HTTP/1.1\r\nContent-Length: {}\r\n\r\n".format(10 ** 6).encode()
+    assert loop.run_until_complete(_status(too_large)) == 413
+    assert loop.run_until_complete(_status(b"GET /metrics HTTP/1.1\r\nConnection: close\r\n\r\n")) == 200
+
+    server.close()
+    loop.run_until_complete(server.wait_closed())
+    loop.close()
@@ -0,0 +1,47 @@
+''' Test the batch emulation, the node is replaced by canned responses '''
+import threading
+from thor_requests.connect import Connect
+
+from .fixtures import vtho_contract, vtho_contract_address
+
+PINNED = "0x000000aa" + "cd" * 28
+BALANCE = "0x" + (5).to_bytes(32, "big").hex()
+REVERT = "0x08c379a0" + (32).to_bytes(32, "big").hex() + (3).to_bytes(32, "big").hex() + b"bad".hex().ljust(64, "0")
+
+
+class CannedConnect(Connect):
+    def __init__(self):
+        super().__init__("http://localhost:0")
+        self.revisions = []
+        self.lock = threading.Lock()
+
+    def get_block(self, id_or_number="best", expanded=False):
+        return {"number": 170, "id": PINNED}
+
+    def emulate(self, emulate_tx_body, block="best"):
+        with self.lock:
+            self.revisions.append(block)
+        if emulate_tx_body["clauses"][0]["data"] == "0xdead":
+            return [{"data": REVERT, "events": [], "transfers": [], "gasUsed": 100, "reverted": True, "vmError": "evm: execution reverted", "decoded": {"revertReason": "bad"}}]
+        return [{"data": BALANCE, "events": [], "transfers": [], "gasUsed": 500, "reverted": False, "vmError": ""} for _ in emulate_tx_body["clauses"]]
+
+
+def test_emulate_many(vtho_contract, vtho_contract_address):
+    c = CannedConnect()
+    clause = c.clause(vtho_contract, "balanceOf", [vtho_contract_address], vtho_contract_address)
+    good = {"caller": vtho_contract_address, "clauses": [clause.to_dict(), clause.to_dict()]}
+    bad = {"caller": vtho_contract_address, "clauses": [{"to": vtho_contract_address, "value": "0", "data": "0xdead"}]}
+    bodies = [good, bad] * 50
+
+    results = c.emulate_many(bodies, clauses=[[clause, clause], [clause]] * 50)
+
+    assert len(results) == 100
+    assert set(c.revisions) == {PINNED}  # all against the pinned block
+    for i, res in enumerate(results):
+        if i % 2 == 0:
+            assert res["reverted"] == False
+            assert res["gasUsed"] == 1000
+            assert res["responses"][0]["decoded"]["balance"] == 5
+        else:
+            assert res["reverted"] == True
+            assert res["revertReasons"] == ["bad"]
@@ -0,0 +1,79 @@
+''' Test the cache of emulations at fixed block ids, against the fake node '''
+from benchmarks.fake_thor import FakeThor
+from thor_requests.cache import EmulationCache
+from thor_requests.connect import Connect
+
+from .fixtures import fake_node, vtho_contract, vtho_contract_address
+
+CALLER = "0x" + "ab" * 20
+
+
+def _body(value=0) -> dict:
+    return {"caller": CALLER, "clauses": [{"to": "0x" + "CD" * 20, "value": value, "data": "0xAB"}]}
+
+
+def test_key_is_normalized():
+    block_id = "0x" + "0a" * 32
+    assert EmulationCache.key(block_id, _body(0)) == EmulationCache.key(block_id.upper().replace("0X", "0x"), _body("0x0"))
+    reordered = {"clauses": [{"data": "0xab", "value": "0x0", "to": "0x" + "cd" * 20}], "caller": CALLER.upper().replace("0X", "0x")}
+    assert EmulationCache.key(block_id, reordered) == EmulationCache.key(block_id, _body())
+    assert EmulationCache.key(block_id, _body()) != EmulationCache.key(block_id, _body(1))
+    assert EmulationCache.key(block_id, _body()) != EmulationCache.key("0x" + "0b" * 32, _body())
+
+
+def test_cached_at_block_id_only(fake_node):
+    c = Connect(fake_node.url)
+    block_id = fake_node.block_id(50)
+    first = c.emulate(_body(), block_id)
+    requests = fake_node.requests
+    for _ in range(5):
+        again = c.emulate(_body("0x0"), block_id)
+        assert again == first
+        again[0]["data"] = "changed"  # callers get their own copy
+    assert fake_node.requests == requests
+    assert c.emulation_cache.hits == 5
+
+    c.emulate(_body(), "best")
+    c.emulate(_body(), 50)
+    assert fake_node.requests == requests + 2
+
+    no_cache = Connect(fake_node.url, emulation_cache=False)
+    no_cache.emulate(_body(), block_id)
+    no_cache.emulate(_body(), block_id)
+    assert fake_node.requests == requests + 4
+
+
+def test_call_and_call_multi_use_the_cache(fake_node, vtho_contract, vtho_contract_address):
+    c = Connect(fake_node.url)
+    block_id = fake_node.block_id(10)
+    requests = fake_node.requests
+    for _ in range(3):
+        res = c.call(CALLER, vtho_contract, "balanceOf", [CALLER], vtho_contract_address, block=block_id)
+        assert res["decoded"]["0"] == 1
+    assert fake_node.requests == requests + 1 + 1  # the chain tag once, one emulation
+    requests = fake_node.requests
+    c.call(CALLER, vtho_contract, "balanceOf", [CALLER], vtho_contract_address, block=block_id)
+    assert fake_node.requests == requests  # a hit costs no request
+
+    clause = c.clause(vtho_contract, "balanceOf", [CALLER], vtho_contract_address)
+    requests = fake_node.requests
+    for _ in range(3):
+        results = c.call_multi(CALLER, [clause, clause], block=block_id)
+        assert results[0]["decoded"]["0"] == 1
+    assert fake_node.requests == requests + 1  # a hit costs no request
+
+
+def test_bounded_and_on_disk(tmp_path):
+    cache = EmulationCache(maxsize=3, max_bytes=100, directory=str(tmp_path))
+    for i in range(5):
+        cache.put(f"k{i}", b"x" * 30)
+    assert len(cache) == 3 and cache.size == 90
+    cache.put("big", b"y" * 60)
+    assert list(cache.data) == ["k4", "big"]  # evicted down to 100 bytes
+    assert "k0" not in cache
+    assert cache.get("k0") == b"x" * 30  # still on disk
+
+    restarted = EmulationCache(directory=str(tmp_path))
+    assert restarted.get("k2") == b"x" * 30
+    assert restarted.get("unknown") is None
+    assert (restarted.hits, restarted.misses) == (1, 1)
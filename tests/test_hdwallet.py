@@ -0,0 +1,27 @@
+''' Test HD wallet derivation and the address index '''
+from thor_requests.hdwallet import HDWallet
+from thor_requests.wallet import Wallet
+
+WORDS = "denial kitchen pet squirrel other broom bar gas better priority spoil cross".split(" ")
+
+
+def test_derive():
+    hd = HDWallet.fromMnemonic(WORDS)
+    # Index 0 is the default wallet of the words
+    assert hd.derive_address(0) == Wallet.fromMnemonic(WORDS).getAddress()
+    assert hd.derive_wallet(7).getAddress() == Wallet.fromMnemonic(WORDS, 7).getAddress()
+    assert hd.derive_address(7) == Wallet.fromMnemonic(WORDS, 7).getAddress()
+
+
+def test_bulk_derive_and_lookup():
+    hd = HDWallet.fromMnemonic(WORDS)
+    index = hd.derive_addresses(100, 50, processes=2, chunk_size=10)
+    assert len(index) == 50
+    assert index.address(100) == hd.derive_address(100)
+    assert index.address(149) == hd.derive_address(149)
+    assert index.index_of(hd.derive_address(123)) == 123
+    assert index.index_of("0x" + hd.derive_address(123)[2:].upper()) == 123
+    assert index.index_of(hd.derive_address(0)) is None
+
+    # Same result in process
+    assert hd.derive_addresses(100, 50, processes=1).data == index.data
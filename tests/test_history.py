@@ -0,0 +1,66 @@
+''' Test the balance change-point search, against a fake node with a known history '''
+import bisect
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.connect import Connect
+from thor_requests.history import BalanceHistory
+
+ADDRESS = "0x" + "ab" * 20
+OTHER = "0x" + "cd" * 20
+# block number -> balance from that block on
+CHANGES = {0: 100, 1000: 150, 25000: 120, 25001: 500, 70000: 100, 70010: 500, 99999: 7}
+
+
+def _node() -> FakeThor:
+    starts = sorted(CHANGES)
+
+    def account(address, number):
+        balance = CHANGES[starts[bisect.bisect_right(starts, number) - 1]] if address == ADDRESS else 0
+        return {"balance": hex(balance), "energy": "0x0", "hasCode": False}
+
+    def transfers(number):
+        if number in CHANGES and number:
+            return [{"sender": OTHER, "recipient": ADDRESS, "amount": "0x1"}]
+        return [{"sender": OTHER, "recipient": OTHER, "amount": "0x1"}]
+
+    return FakeThor(head=100000, account_fn=account, transfers_fn=transfers)
+
+
+def test_bisection_finds_changes_with_few_requests():
+    with _node() as node:
+        history = BalanceHistory(Connect(node.url))
+        points = history.change_points(ADDRESS, 0, 100000)
+        # 500 -> 100 -> 500 around 70000 cannot be seen from the ends alone
+        assert points[:4] == [(0, 100), (1000, 150), (25000, 120), (25001, 500)]
+        assert points[-1] == (99999, 7)
+        assert history.requests < 150
+
+        requests = history.requests
+        assert history.change_points(ADDRESS, 0, 100000) == points
+        assert history.requests == requests  # all cached
+
+
+def test_hints_find_every_change():
+    with _node() as node:
+        c = Connect(node.url)
+        history = BalanceHistory(c)
+        assert history.transfer_blocks(ADDRESS, 0, 100000) == set(CHANGES) - {0}
+        points = history.change_points(ADDRESS, 0, 100000, hints=True)
+        assert points == sorted(CHANGES.items())
+        assert history.requests <= 2 + 2 * (len(CHANGES) - 1)
+
+        assert history.change_points(ADDRESS, 2000, 3000) == [(2000, 150)]
+        assert history.change_points(ADDRESS, 70005, 70005) == [(70005, 100)]
+
+
+def test_iter_transfers_and_events_page_through():
+    with FakeThor(head=30, events_per_block=3, transfers_fn=lambda n: [{"sender": OTHER, "recipient": ADDRESS, "amount": "0x1"}]) as node:
+        c = Connect(node.url)
+        requests = node.requests
+        transfers = list(c.iter_transfers(1, 20, [{"recipient": ADDRESS}], page_size=6))
+        assert [t["meta"]["blockNumber"] for t in transfers] == list(range(1, 21))
+        assert node.requests - requests == 4  # pages of 6, 6, 6, 2
+
+        events = list(c.iter_events(criteria_set=[{"address": node.event_address(0)}], page_size=7, order="desc"))
+        numbers = [e["meta"]["blockNumber"] for e in events]
+        assert len(events) == 60 and numbers == sorted(numbers, reverse=True)  # 2 of 3 events per block
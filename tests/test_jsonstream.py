@@ -0,0 +1,86 @@
+''' Test the incremental parse of large responses '''
+import json
+
+import pytest
+
+from benchmarks.fake_thor import FakeThor
+from benchmarks.memory import stream_peaks
+from thor_requests.connect import Connect
+from thor_requests.jsonstream import iter_array
+from thor_requests.metrics import RequestMetrics
+
+from .fixtures import fake_connector, fake_node, solo_wallet, vtho_contract, vtho_contract_address
+
+
+def _cut(data: bytes, size: int) -> list:
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+
+@pytest.mark.parametrize("size", [1, 3, 64, 1 << 20])
+def test_iter_array_any_chunking(size):
+    doc = {
+        "number": 1,
+        "nested": {"transactions": ["not this one"]},
+        "transactions": [{"id": "0x01", "data": 'a\\"b][}{ é'}, "0x02", 12345, 7.5, True, None, [1, [2]]],
+        "after": "]",
+    }
+    data = json.dumps(doc, ensure_ascii=False).encode()
+    assert list(iter_array(_cut(data, size), "transactions")) == doc["transactions"]
+    data = json.dumps(doc["transactions"]).encode()
+    assert list(iter_array(_cut(data, size))) == doc["transactions"]
+
+
+def test_large_element_decoded_once(monkeypatch):
+    import thor_requests.jsonstream as jsonstream
+
+    element = {"data": "0x" + "ab" * 50000, "quoted": '\\"' * 1000, "list": list(range(1000))}
+    data = json.dumps([element, "x"]).encode()
+    decoded = []
+    loads = json.loads
+    monkeypatch.setattr(jsonstream.json, "loads", lambda s: decoded.append(len(s)) or loads(s))
+    assert list(iter_array(_cut(data, 7))) == [element, "x"]
+    assert decoded == [len(json.dumps(element))]  # once, when complete
+
+
+def test_iter_array_missing_or_truncated():
+    assert list(iter_array([b"null"], "transactions")) == []
+    assert list(iter_array([b'{"number": 1}'], "transactions")) == []
+    with pytest.raises(Exception):
+        list(iter_array([b'{"transactions": [{"a": 1}, {"a"'], "transactions"))
+
+
+def test_peak_memory_independent_of_block_size():
+    peaks = stream_peaks([200, 2000])
+    assert peaks[2000]["stream"] < peaks[200]["stream"] * 1.5
+    assert peaks[2000]["stream"] < peaks[2000]["whole"] / 10
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_stream_block(compress):
+    with FakeThor(txs_per_block=300, clause_data_size=68) as node:
+        metrics = RequestMetrics()
+        c = Connect(node.url, hooks=[metrics], compress=compress)
+        streamed = list(c.stream_block(5))
+        assert streamed == c.get_block(5, expanded=True)["transactions"]
+        assert metrics.snapshot()["stream_block"]["count"] == 1
+        assert metrics.snapshot()["stream_block"]["bytes_in"] > 300 * 100
+        assert list(c.stream_block(10 ** 6)) == []  # no such block
+
+        # Stop early, the connection is released for the next request
+        stream = c.stream_block(5)
+        next(stream)
+        stream.close()
+        assert c.get_block(5)["number"] == 5
+
+
+def test_stream_call_multi(fake_connector, solo_wallet, vtho_contract, vtho_contract_address):
+    clause = fake_connector.clause(vtho_contract, "balanceOf", [vtho_contract_address], vtho_contract_address)
+    clauses = [clause] * 50
+    streamed = list(fake_connector.stream_call_multi(solo_wallet.getAddress(), clauses))
+    assert streamed == fake_connector.call_multi(solo_wallet.getAddress(), clauses)
+    assert streamed[0]["decoded"]["0"] == 1
+
+
+def test_stream_http_error(fake_connector):
+    with pytest.raises(Exception):
+        list(fake_connector.stream_emulate({"clauses": []}, block="0x" + "ff" * 32))
@@ -0,0 +1,39 @@
+''' Test the deferred imports '''
+import json
+import subprocess
+import sys
+
+from thor_requests.lazy import LazyModule, lazy_import
+from benchmarks.importtime import compare, parse_importtime
+
+
+def test_connect_defers_heavy_imports():
+    code = (
+        "import sys, json, thor_requests.connect;"
+        "print(json.dumps([m for m in ('thor_devkit', 'requests') if m in sys.modules]))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], stdout=subprocess.PIPE, check=True).stdout
+    assert json.loads(out) == []
+
+
+def test_lazy_module_loads_on_access():
+    m = LazyModule("colorsys")
+    assert "not loaded" in repr(m)
+    assert m.rgb_to_hsv(1, 0, 0) == (0, 1, 1)
+    assert "loaded" in repr(m) and "not loaded" not in repr(m)
+    assert "rgb_to_hsv" in m.__dict__  # later lookups skip __getattr__
+    # Already imported modules are returned as is
+    assert lazy_import("json") is json
+
+
+def test_importtime_helpers():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       100 |        100 |   thor_requests.lazy\n"
+        "import time:      5000 |      28000 | thor_requests.connect\n"
+    )
+    assert parse_importtime(stderr, "thor_requests.connect") == 28000
+    baseline = {"thor_requests.connect": {"us": 28000, "heavy": []}}
+    assert compare({"thor_requests.connect": {"us": 30000, "heavy": []}}, baseline, 0.5) == []
+    failures = compare({"thor_requests.connect": {"us": 30000, "heavy": ["requests"]}}, baseline, 0.5)
+    assert failures == ["thor_requests.connect: now imports requests"]
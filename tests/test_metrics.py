@@ -0,0 +1,83 @@
+''' Test the instrumentation hooks on Connect, against a tiny local HTTP server '''
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+from thor_requests.connect import Connect
+from thor_requests.metrics import Hook, RequestMetrics, Histogram
+
+BLOCK = {"number": 1, "id": "0x00000001" + "ab" * 28, "parentID": "0x00000000" + "ab" * 28}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/blocks/"):
+            body = json.dumps(BLOCK).encode()
+            self.send_response(200)
+        else:
+            body = b"not found"
+            self.send_response(404)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_connector():
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield Connect(f"http://127.0.0.1:{server.server_address[1]}")
+    server.shutdown()
+
+
+class Recorder(Hook):
+    def __init__(self):
+        self.calls = []
+
+    def before(self, call):
+        self.calls.append(("before", dict(call)))
+
+    def after(self, call):
+        self.calls.append(("after", dict(call)))
+
+
+def test_hooks(local_connector):
+    recorder = Recorder()
+    metrics = RequestMetrics()
+    local_connector.add_hook(recorder)
+    local_connector.add_hook(metrics)
+
+    assert local_connector.get_block("best")["number"] == 1
+    local_connector.get_block(1)
+    with pytest.raises(Exception):
+        local_connector.get_tx("0x00")
+
+    stage, call = recorder.calls[0]
+    assert stage == "before"
+    assert call["method"] == "get_block" and call["path"] == "/blocks/{revision}"
+    stage, call = recorder.calls[1]
+    assert stage == "after"
+    assert call["status"] == 200
+    assert call["bytes_in"] == len(json.dumps(BLOCK))
+    assert call["latency"] > 0
+
+    snapshot = metrics.snapshot()
+    assert snapshot["get_block"]["count"] == 2
+    assert snapshot["get_tx"]["status"] == {404: 1}
+
+    text = metrics.render_prometheus()
+    assert 'thor_requests_http_requests_total{method="get_block",status="200"} 2' in text
+    assert 'thor_requests_http_request_duration_seconds_bucket{method="get_block",le="+Inf"} 2' in text
+    assert 'thor_requests_http_request_duration_seconds_count{method="get_tx"} 1' in text
+
+
+def test_histogram_quantile():
+    h = Histogram(buckets=(1, 2, 3, 4))
+    for v in [0.5] * 50 + [3.5] * 49 + [100]:
+        h.observe(v)
+    assert h.quantile(0.5) <= 1
+    assert 3 < h.quantile(0.99) <= 4
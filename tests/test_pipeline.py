@@ -0,0 +1,125 @@
+''' Test the indexing pipeline: sources, decode stages, sinks and resume '''
+import io
+import json
+import sqlite3
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.connect import Connect
+from thor_requests.contract import Contract
+from thor_requests.pipeline import (
+    BlockRangeSource,
+    CallbackSink,
+    EventStage,
+    JsonlSink,
+    Pipeline,
+    ReceiptStage,
+    SqliteSink,
+    StreamSource,
+    TransferStage,
+)
+from thor_requests.stream import BlockStream, FileCheckpoint
+
+VTHO = "0x0000000000000000000000000000456e65726779"
+ALICE = "0x" + "aa" * 20
+BOB = "0x" + "bb" * 20
+
+
+def _node(head: int = 30) -> FakeThor:
+    transfer = Contract.fromFile("tests/VTHO.json").get_events()
+    topic0 = "0x" + [e for e in transfer if e.get_name() == "Transfer"][0].get_signature().hex()
+
+    def event(number, index):
+        return {
+            "address": VTHO if index == 0 else "0x" + "cc" * 20,
+            "topics": [topic0, "0x" + "00" * 12 + ALICE[2:], "0x" + "00" * 12 + BOB[2:]],
+            "data": "0x" + number.to_bytes(32, "big").hex(),
+        }
+
+    return FakeThor(
+        head=head,
+        txs_per_block=2,
+        events_per_block=2,
+        event_fn=event,
+        transfers_fn=lambda number: [{"sender": ALICE, "recipient": BOB, "amount": hex(number)}],
+    )
+
+
+def test_stages_and_sinks(tmp_path):
+    vtho = Contract.fromFile("tests/VTHO.json")
+    with _node() as node:
+        c = Connect(node.url)
+        out = io.StringIO()
+        batches = []
+        db = str(tmp_path / "index.db")
+        pipeline = Pipeline(
+            BlockRangeSource(c, 1, 10),
+            [EventStage({VTHO: vtho}, workers=2), TransferStage(), ReceiptStage()],
+            [JsonlSink(out), SqliteSink(db), CallbackSink(batches.append)],
+            batch_size=4,
+        )
+        pipeline.run()
+
+        assert [len(b) for b in batches] == [16, 16, 8]  # per block: 1 event, 1 transfer, 2 receipts
+        records = [json.loads(line) for line in out.getvalue().splitlines()]
+        first = records[:4]
+        assert [r["kind"] for r in first] == ["event", "transfer", "receipt", "receipt"]
+        assert first[0]["name"] == "Transfer"
+        assert first[0]["decoded"]["_value"] == 1
+        assert first[0]["blockNumber"] == 1
+        assert first[1]["amount"] == 1
+        rows = sqlite3.connect(db).execute("SELECT kind, COUNT(*) FROM records GROUP BY kind ORDER BY kind").fetchall()
+        assert rows == [("event", 10), ("receipt", 20), ("transfer", 10)]
+
+        metrics = pipeline.metrics()
+        assert metrics["source"]["items"] == 10
+        assert metrics["stage:events"]["records"] == 10
+        assert metrics["stage:receipts"]["records"] == 20
+        assert metrics["sink:SqliteSink"]["records"] == 40
+
+
+def test_all_events_decoded_when_known():
+    vtho = Contract.fromFile("tests/VTHO.json")
+    with _node() as node:
+        records = []
+        Pipeline(BlockRangeSource(Connect(node.url), 5, 5), [EventStage([vtho])], [CallbackSink(records.extend)]).run()
+        assert [r["address"] for r in records] == [VTHO, "0x" + "cc" * 20]
+        assert all(r["name"] == "Transfer" for r in records)
+
+
+def test_resume_after_a_failure(tmp_path):
+    checkpoint = FileCheckpoint(str(tmp_path / "progress.json"))
+    with _node() as node:
+        c = Connect(node.url)
+        written = []
+
+        def flaky(records):
+            if records[0]["blockNumber"] >= 7:
+                raise Exception("disk full")
+            written.extend(records)
+
+        try:
+            Pipeline(BlockRangeSource(c, 1, 12, checkpoint), [ReceiptStage()], [CallbackSink(flaky)], batch_size=3).run()
+        except Exception:
+            pass
+        assert checkpoint.load() == {"next": 7}
+
+        Pipeline(BlockRangeSource(c, 1, 12, checkpoint), [ReceiptStage()], [CallbackSink(written.extend)], batch_size=3).run()
+        assert [r["blockNumber"] for r in written] == [n for n in range(1, 13) for _ in range(2)]
+
+
+def test_live_stream_with_rollbacks(tmp_path):
+    db = str(tmp_path / "index.db")
+    with _node(head=20) as node:
+        c = Connect(node.url)
+        stream = BlockStream(c, start=15, expanded=True, checkpoint=FileCheckpoint(str(tmp_path / "stream.json")))
+        sink = SqliteSink(db)
+        Pipeline(StreamSource(stream, stop_when_idle=True), [TransferStage()], [sink], batch_size=100).run(close=False)
+        old = node.block_id(20)
+
+        node.reorg(2, length=3)
+        Pipeline(StreamSource(stream, stop_when_idle=True), [TransferStage()], [sink], batch_size=100).run()
+
+        rows = sqlite3.connect(db).execute("SELECT block_number, block_id FROM records ORDER BY block_number").fetchall()
+        assert [n for n, _ in rows] == list(range(15, 22))
+        assert old not in [i for _, i in rows]
+        assert FileCheckpoint(str(tmp_path / "stream.json")).load()["chain"][-1] == [21, node.block_id(21)]
@@ -0,0 +1,121 @@
+''' Test the adaptive limits of Connect, against a fake node that throttles '''
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.connect import Connect
+from thor_requests.ratelimit import AIMDLimiter, NodeLimiter, ThrottledError, TokenBucket, endpoint_limiter
+from thor_requests.transport import Response
+
+from .fixtures import vtho_contract, vtho_contract_address
+
+
+def test_aimd_grows_and_backs_off():
+    aimd = AIMDLimiter(min_limit=1, max_limit=10, initial=2)
+    for _ in range(100):
+        aimd.acquire()
+        aimd.release(0.01)
+    assert aimd.limit == 10  # flat latency: up to the ceiling
+    assert aimd.in_flight == 0
+
+    aimd.acquire()
+    aimd.release(0.01, throttled=True)
+    assert aimd.limit == 5
+    aimd.acquire()
+    aimd.release(0.01, throttled=True)
+    assert aimd.limit == 5  # once per round trip only
+    time.sleep(0.06)
+    aimd.acquire()
+    aimd.release(0.05)  # sent after the decrease, far slower than the 10ms baseline
+    assert aimd.limit == 2.5
+    aimd.acquire()
+    aimd.release(0.05, key="/blocks/{revision}")  # another kind of request, its own baseline
+    assert aimd.limit > 2.5
+
+
+class FlakyTransport:
+    def __init__(self, failures: int, retry_after: str = None):
+        self.failures = failures
+        self.calls = 0
+        self.headers = {"Retry-After": retry_after} if retry_after else {}
+
+    def request(self, verb, url, **kwargs):
+        self.calls += 1
+        if self.calls <= self.failures:
+            return Response(429, b"slow down", self.headers)
+        return Response(200, b'{"number": 1}')
+
+
+def test_retries_then_gives_up():
+    transport = FlakyTransport(failures=2, retry_after="0")
+    c = Connect("http://localhost:0", transport=transport, limiter=NodeLimiter(retries=3))
+    assert c.get_block(1) == {"number": 1}
+    assert transport.calls == 3
+    assert c.limiter.throttled == 2
+
+    transport = FlakyTransport(failures=100)
+    c = Connect("http://localhost:0", transport=transport, limiter=NodeLimiter(retries=2, backoff=0.001))
+    with pytest.raises(ThrottledError) as e:
+        c.get_block(1)
+    assert e.value.status == 429
+    assert transport.calls == 3
+
+
+def test_adapts_to_node_capacity(vtho_contract, vtho_contract_address):
+    with FakeThor(latency=0.01, capacity=4) as node:
+        clause = Connect(node.url).clause(vtho_contract, "balanceOf", [vtho_contract_address], vtho_contract_address)
+        bodies = [{"caller": vtho_contract_address, "clauses": [clause.to_dict()]}] * 100
+
+        with pytest.raises(Exception):
+            Connect(node.url).emulate_many(bodies, max_workers=16)
+
+        c = Connect(node.url, limiter=NodeLimiter(initial_concurrency=16, max_concurrency=32, backoff=0.005))
+        assert c.concurrency() == 32
+        results = c.emulate_many(bodies)
+        assert len(results) == 100 and not any(r["reverted"] for r in results)
+        assert c.limiter.throttled > 0
+        assert c.limiter.aimd.limit < 16  # backed off towards the capacity
+
+
+def test_rate():
+    with FakeThor() as node:
+        c = Connect(node.url, limiter=NodeLimiter(rate=100, burst=1))
+        started = time.monotonic()
+        for _ in range(21):
+            c.get_block("best")
+        assert time.monotonic() - started >= 0.19
+
+
+def test_acquire_more_than_burst():
+    bucket = TokenBucket(rate=10, burst=5)
+    with pytest.raises(ValueError):
+        bucket.acquire(6)
+    bucket.acquire(5)
+    assert not bucket.try_acquire(1)
+
+
+def test_endpoint_limiter_is_shared():
+    assert endpoint_limiter("http://node:8669/") is endpoint_limiter("http://node:8669")
+    assert endpoint_limiter("http://node:8669") is not endpoint_limiter("http://other:8669")
+
+
+def test_requests_inside_a_stream_loop():
+    # The stream holds its slot until the headers are in only: a request made
+    # while consuming it does not wait for the stream to end.
+    with FakeThor(txs_per_block=5) as node:
+        limiter = NodeLimiter(min_concurrency=1, max_concurrency=1, initial_concurrency=1)
+        c = Connect(node.url, limiter=limiter)
+        numbers = []
+
+        def _consume():
+            for tx in c.stream_block(3):
+                numbers.append(c.get_block(2)["number"])
+
+        thread = threading.Thread(target=_consume, daemon=True)
+        thread.start()
+        thread.join(10)
+        assert not thread.is_alive()
+        assert numbers == [2] * 5
+        assert limiter.aimd.in_flight == 0
@@ -0,0 +1,90 @@
+''' Test the bulk tx replay, against a fake node with canned emulation results '''
+import io
+import json
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.cli import main
+from thor_requests.connect import Connect
+from thor_requests.contract import Contract
+
+VTHO = "0x0000000000000000000000000000456e65726779"
+ALICE = "0x" + "aa" * 20
+REVERT = "0x08c379a0" + (32).to_bytes(32, "big").hex() + (3).to_bytes(32, "big").hex() + b"bad".hex().ljust(64, "0")
+
+
+def _node() -> FakeThor:
+    events = Contract.fromFile("tests/VTHO.json").get_events()
+    topic0 = "0x" + [e for e in events if e.get_name() == "Transfer"][0].get_signature().hex()
+
+    def emulate(body, number):
+        transfer = {
+            "address": VTHO,
+            "topics": [topic0, "0x" + "00" * 12 + ALICE[2:], "0x" + "00" * 12 + ALICE[2:]],
+            "data": "0x" + number.to_bytes(32, "big").hex(),
+        }
+        first = {"data": "0x", "events": [transfer], "transfers": [], "gasUsed": 1000 + number, "reverted": False, "vmError": ""}
+        if number % 3 == 0:  # the second clause reverts
+            return [first, {"data": REVERT, "events": [], "transfers": [], "gasUsed": 50, "reverted": True, "vmError": "evm: execution reverted"}]
+        return [first, dict(first, events=[])]
+
+    return FakeThor(head=40, txs_per_block=3, clauses_per_tx=2, emulate_fn=emulate)
+
+
+def test_replay_blocks():
+    vtho = Contract.fromFile("tests/VTHO.json")
+    with _node() as node:
+        c = Connect(node.url)
+        reports = c.replay_blocks(1, 9, [vtho], max_workers=4)
+        assert not isinstance(reports, list)  # streamed
+        reports = list(reports)
+        assert [r["txID"] for r in reports] == [node.synthetic_tx_id(n, i) for n in range(1, 10) for i in range(3)]
+
+        ok, failed = reports[3], reports[6]  # blocks 2 and 3
+        assert ok["blockNumber"] == 2 and not ok["reverted"] and ok["gasUsed"] == 2 * 1002
+        assert ok["clauses"][0]["events"] == [{"address": VTHO, "name": "Transfer", "decoded": ok["clauses"][0]["events"][0]["decoded"]}]
+        assert ok["clauses"][0]["events"][0]["decoded"]["_value"] == 2
+        assert failed["reverted"] and failed["gasUsed"] == 1003 + 50
+        assert failed["clauses"][1]["revertReason"] == "bad"
+        assert failed["clauses"][1]["vmError"] == "evm: execution reverted"
+        assert failed["clauses"][0]["revertReason"] is None
+
+
+def test_replay_blocks_with_a_gap():
+    with _node() as node:
+        c = Connect(node.url)
+        get_block = c.get_block
+        c.get_block = lambda number, expanded=False: None if number == 5 else get_block(number, expanded)
+        reports = list(c.replay_blocks(4, 6, max_workers=4))
+        assert [r.get("txID") for r in reports] == [node.synthetic_tx_id(4, i) for i in range(3)] + [None] + [node.synthetic_tx_id(6, i) for i in range(3)]
+        assert reports[3] == {"blockNumber": 5, "error": "block 5 not found"}
+
+        # Past the head: one record per missing block, the range is not cut short
+        reports = list(c.replay_blocks(40, 42))
+        assert [r["blockNumber"] for r in reports] == [40, 40, 40, 41, 42]
+        assert reports[-1] == {"blockNumber": 42, "error": "block 42 not found"}
+
+
+def test_replay_txs_raw_events():
+    with _node() as node:
+        c = Connect(node.url)
+        tx_ids = (node.synthetic_tx_id(n, 0) for n in range(1, 31))
+        reports = list(c.replay_txs(tx_ids))
+        assert len(reports) == 30
+        assert reports[0]["blockID"] == node.block_id(1)
+        assert set(reports[0]["clauses"][0]["events"][0]) == {"address", "topics", "data"}
+
+
+def test_cli_replay():
+    with _node() as node:
+        out = io.StringIO()
+        tx_ids = "\n".join([node.synthetic_tx_id(3, 1), "0x" + "00" * 32])
+        code = main(["--node", node.url, "replay", "--abi", "tests/VTHO.json"], stdin=io.StringIO(tx_ids), stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        assert code == 1
+        assert rows[0]["clauses"][1]["revertReason"] == "bad"
+        assert rows[0]["clauses"][0]["events"][0]["name"] == "Transfer"
+        assert "error" in rows[1]
+
+        out = io.StringIO()
+        assert main(["--node", node.url, "replay", "--blocks", "4", "5"], stdin=io.StringIO(""), stdout=out) == 0
+        assert len(out.getvalue().splitlines()) == 6
@@ -0,0 +1,67 @@
+''' Test the slotted result objects '''
+import json
+
+from benchmarks.fake_thor import FakeThor
+from benchmarks.memory import run
+from thor_requests.connect import Connect
+from thor_requests.results import Block, ExpandedTx, Receipt, Tx
+
+from .fixtures import fake_node
+
+node = FakeThor(head=20, txs_per_block=3, clauses_per_tx=2, clause_data_size=4)
+tx_id = node.synthetic_tx_id(10, 1)
+
+
+def _roundtrip(data: dict) -> dict:
+    return json.loads(json.dumps(data))
+
+
+def test_to_dict_roundtrip():
+    for cls, data in [
+        (Block, node.block(10)),
+        (Block, node.block(10, expanded=True)),
+        (Tx, node.tx(tx_id)),
+        (Receipt, node.receipt(tx_id)),
+    ]:
+        data = _roundtrip(data)
+        obj = cls.from_dict(data)
+        assert obj.to_dict() == data
+        # still the same after every field was parsed
+        for name in obj._schema:
+            getattr(obj, name)
+        assert obj.to_dict() == data
+    assert Tx.from_dict(None) is None
+
+
+def test_lazy_hex_fields():
+    tx = Tx(_roundtrip(node.tx(tx_id)))
+    assert tx._nonce == node.tx(tx_id)["nonce"]  # not parsed yet
+    assert tx.nonce == int(node.tx(tx_id)["nonce"], 16)
+    assert tx._nonce is tx.nonce  # parsed once, kept
+    assert tx.id == bytes.fromhex(tx_id[2:])
+    assert tx.clauses[0].value == 0
+    assert tx.clauses[0].data == b"\xab" * 4
+    assert tx.meta.blockNumber == 10
+
+    receipt = Receipt(_roundtrip(node.receipt(tx_id)))
+    assert receipt.paid == 21000 * 2 * 10 ** 13
+    assert receipt.meta.txID == tx.id
+
+    block = Block(_roundtrip(node.block(10, expanded=True)))
+    assert isinstance(block.transactions[0], ExpandedTx)
+    assert block.transactions[1].id == tx.id
+    assert block.transactions[1].reward == int(node.receipt(tx_id)["reward"], 16)
+    assert not hasattr(block, "__dict__")
+
+
+def test_connect_typed(fake_node):
+    c = Connect(fake_node.url)
+    block = c.get_block(5, typed=True)
+    assert isinstance(block, Block) and block.number == 5
+    assert c.get_block(5) == block.to_dict()
+    assert c.get_tx("0x" + "00" * 32, typed=True) is None
+
+
+def test_memory_smaller_than_dicts():
+    for name, r in run(count=50, txs=5).items():
+        assert r["slots"] < r["dict"], name
@@ -0,0 +1,63 @@
+''' Test the dependsOn scheduler, posts go to an in-memory node '''
+from thor_devkit import transaction
+from thor_requests.clause import Clause
+from thor_requests.scheduler import TxScheduler
+
+from .fixtures import solo_wallet, clean_wallet
+
+
+class InMemoryNode:
+    ''' Minimal stand-in of Connect, decodes whatever is posted '''
+
+    def __init__(self):
+        self.posted = []
+
+    def get_chainTag(self):
+        return 0xa4
+
+    def get_block(self, id_or_number):
+        return {"number": 100, "id": "0x00000064" + "ab" * 28}
+
+    def emulate_tx(self, address, tx_body, block="best", gas_payer=None):
+        return [{"reverted": False, "gasUsed": 0} for _ in tx_body["clauses"]]
+
+    def post_tx(self, raw):
+        tx = transaction.Transaction.decode(bytes.fromhex(raw[2:]), False)
+        self.posted.append(tx)
+        return {"id": tx.get_id()}
+
+
+def test_chain_of_dependent_txs(solo_wallet, clean_wallet):
+    node = InMemoryNode()
+    scheduler = TxScheduler(node)
+    # Pure VET transfers
+    to = clean_wallet.getAddress()
+    scheduler.add("a", solo_wallet, [Clause(to, value=1)])
+    scheduler.add("b", solo_wallet, [Clause(to, value=2)], after="a")
+    scheduler.add("c", clean_wallet, [Clause(to, value=3)], after="b", gas=50000)
+    scheduler.add("d", solo_wallet, [Clause(to, value=4)], after="a")
+    scheduler.add("e", solo_wallet, [Clause(to, value=5)])
+
+    ids = scheduler.submit()
+    assert list(ids.keys()) == ["a", "b", "c", "d", "e"]
+
+    by_id = {tx.get_id(): tx for tx in node.posted}
+    assert set(by_id) == set(ids.values())
+    assert by_id[ids["a"]].get_body()["dependsOn"] is None
+    assert by_id[ids["b"]].get_body()["dependsOn"] == ids["a"]
+    assert by_id[ids["c"]].get_body()["dependsOn"] == ids["b"]
+    assert by_id[ids["d"]].get_body()["dependsOn"] == ids["a"]
+    assert by_id[ids["c"]].get_body()["gas"] == 50000
+
+    # Parents are posted before children
+    order = [tx.get_id() for tx in node.posted]
+    assert order.index(ids["a"]) < order.index(ids["b"]) < order.index(ids["c"])
+
+
+def test_parent_must_exist(solo_wallet):
+    scheduler = TxScheduler(InMemoryNode())
+    try:
+        scheduler.add("b", solo_wallet, [], after="a")
+        assert False, "should raise"
+    except Exception as e:
+        assert "not found" in str(e)
@@ -0,0 +1,94 @@
+''' Test Connect.at(): reads pinned to one block, against the fake node '''
+import threading
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.connect import Connect
+
+from .fixtures import vtho_contract, vtho_contract_address
+
+HOLDER = "0x" + "cd" * 20
+CALLER = "0x" + "ab" * 20
+
+
+def _account(address, number):
+    # the balance tells which block was read
+    return {"balance": hex(number), "energy": hex(2 * number), "hasCode": False}
+
+
+def test_reads_stay_on_one_block():
+    with FakeThor(account_fn=_account) as node:
+        snap = Connect(node.url).at("best")
+        head = node.head
+        node.mine(3)
+        assert snap.number == head
+        assert snap.get_vet_balance(HOLDER) == head
+        assert snap.get_vtho_balance(HOLDER.upper().replace("0X", "0x")) == 2 * head
+        assert snap.get_storage(HOLDER, 1) == node.storage_fn(HOLDER, "0x" + "00" * 31 + "01", head)
+        assert snap.reads == 2 and snap.shared == 1
+
+
+def test_concurrent_duplicates_sent_once():
+    with FakeThor(account_fn=_account, latency=0.02) as node:
+        snap = Connect(node.url).at(50)
+        requests = node.requests
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(snap.get_account(HOLDER))) for _ in range(20)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert node.requests - requests == 1
+        assert results == [_account(HOLDER, 50)] * 20
+        assert all(r is results[0] for r in results)  # one value, shared
+
+
+def test_memo_is_bounded():
+    with FakeThor(account_fn=_account) as node:
+        snap = Connect(node.url).at(50, memo_size=3)
+        holders = ["0x%040x" % i for i in range(5)]
+        for holder in holders:
+            snap.get_account(holder)
+        assert len(snap._flights) == 3
+        requests = node.requests
+        snap.get_account(holders[-1])  # recent: remembered
+        snap.get_account(holders[0])  # forgotten: read again
+        assert node.requests == requests + 1
+        assert snap.reads == 6 and snap.shared == 1
+
+        accounts = snap.get_accounts([HOLDER, "0x" + "ef" * 20, HOLDER])
+        assert list(accounts) == [HOLDER, "0x" + "ef" * 20]
+
+
+def test_calls_share_the_emulation_cache(vtho_contract, vtho_contract_address):
+    emulations = []
+
+    def _emulate(body, number):
+        emulations.append(number)
+        return [{"data": "0x" + number.to_bytes(32, "big").hex(), "events": [], "transfers": [], "gasUsed": 10, "reverted": False, "vmError": ""}]
+
+    with FakeThor(emulate_fn=_emulate) as node:
+        c = Connect(node.url)
+        snap = c.at("best")
+        node.mine()
+        args = (CALLER, vtho_contract, "balanceOf", [HOLDER], vtho_contract_address)
+        assert snap.call(*args)["decoded"]["0"] == snap.number
+        assert snap.call(*args)["decoded"]["0"] == snap.number  # memo
+        clause = c.clause(vtho_contract, "balanceOf", [HOLDER], vtho_contract_address)
+        assert snap.call_multi(CALLER, [clause])[0]["decoded"]["0"] == snap.number  # emulation cache
+        assert c.at(snap.id).call(*args)["decoded"]["0"] == snap.number  # another snapshot, same cache
+        assert emulations == [snap.number]
+
+
+def test_finalized_refreshes_on_a_new_head():
+    with FakeThor(account_fn=_account, finality_depth=5) as node:
+        c = Connect(node.url)
+        snap = c.at("finalized", refresh=0)
+        fixed = c.at("finalized")
+        assert snap.get_vet_balance(HOLDER) == node.head - 5
+        pinned = snap.pinned()
+
+        node.mine(2)
+        assert snap.get_vet_balance(HOLDER) == node.head - 5
+        assert snap.moves == 1
+        assert fixed.get_vet_balance(HOLDER) == pinned.get_vet_balance(HOLDER) == node.head - 7
+        assert not pinned.refresh()
@@ -0,0 +1,71 @@
+''' Test the storage and code readers of Connect, against the fake node '''
+from benchmarks.fake_thor import FakeThor
+from thor_requests.connect import Connect
+
+from .fixtures import fake_node, fake_connector
+
+CONTRACT = "0x0000000000000000000000000000456e65726779"
+
+
+def test_get_storage_key_forms(fake_node, fake_connector):
+    block_id = fake_node.block_id(50)
+    value = fake_connector.get_storage(CONTRACT, 1, block_id)
+    assert value == fake_node.storage_fn(CONTRACT.lower(), "0x" + "00" * 31 + "01", 50)
+    # Same slot written differently: served from the cache.
+    requests = fake_node.requests
+    assert fake_connector.get_storage(CONTRACT.upper().replace("0X", "0x"), "0x01", block_id) == value
+    assert fake_connector.get_storage(CONTRACT, "0x" + "00" * 31 + "01", block_id) == value
+    assert fake_node.requests == requests
+
+
+def test_get_storage_best_not_cached(fake_node, fake_connector):
+    first = fake_connector.get_storage(CONTRACT, 1)
+    fake_node.mine()
+    assert fake_connector.get_storage(CONTRACT, 1) != first
+    assert len(fake_connector.storage_cache) == 0
+
+
+def test_get_storages_dedupe_and_cache(fake_node, fake_connector):
+    keys = [i % 10 for i in range(100)] + ["0x05", "0x0009"]
+    requests = fake_node.requests
+    values = fake_connector.get_storages(CONTRACT, keys, block=50)
+    assert len(values) == 10
+    assert fake_node.requests - requests == 1 + 10  # the block id, then each slot once
+    for key, value in values.items():
+        assert value == fake_node.storage_fn(CONTRACT.lower(), key, 50)
+
+    requests = fake_node.requests
+    assert fake_connector.get_storages(CONTRACT, keys, block=fake_node.block_id(50)) == values
+    assert fake_node.requests == requests
+
+
+def test_get_code_cached_by_address():
+    contracts = {"0x" + "aa" * 20: "0x6080", "0x" + "bb" * 20: "0x6060"}
+    with FakeThor(code_fn=lambda address, number: contracts.get(address, "0x")) as node:
+        c = Connect(node.url)
+        addresses = list(contracts) * 5 + ["0x" + "CC" * 20]
+        codes = c.get_codes(addresses)
+        assert codes == dict(contracts, **{"0x" + "cc" * 20: "0x"})
+        assert node.requests == 3
+
+        c.get_codes(addresses, block=10)
+        assert node.requests == 6  # seen at "best" only: a past block is asked
+        assert c.get_code("0x" + "AA" * 20) == "0x6080"
+        assert c.get_code("0x" + "aa" * 20, 12) == "0x6080"
+        assert c.get_code("0x" + "aa" * 20, node.block_id(10)) == "0x6080"
+        assert node.requests == 6
+
+
+def test_get_code_not_served_before_deployment():
+    # deployed at block 50
+    with FakeThor(code_fn=lambda address, number: "0x6080" if number >= 50 else "0x") as node:
+        c = Connect(node.url)
+        address = "0x" + "aa" * 20
+        assert c.get_code(address) == "0x6080"
+        assert c.get_code(address, 10) == "0x"
+        assert c.at(10).get_code(address) == "0x"
+        assert c.get_code(address, 60) == "0x6080"
+        requests = node.requests
+        assert c.get_code(address, 70) == "0x6080"
+        assert c.get_code(address, 40) == "0x"
+        assert node.requests == requests + 1
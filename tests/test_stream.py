@@ -0,0 +1,77 @@
+''' Test the reorg-aware block stream, against a fake node that can fork '''
+import pytest
+
+from benchmarks.fake_thor import FakeThor
+from thor_requests.connect import Connect
+from thor_requests.stream import BLOCK, ROLLBACK, BlockStream, FileCheckpoint, ReorgTooDeep
+
+from .fixtures import fake_node, fake_connector
+
+
+def _kinds(events) -> list:
+    return [(e.kind, e.block["number"]) for e in events]
+
+
+def test_fills_gaps(fake_node, fake_connector):
+    stream = BlockStream(fake_connector, start=95)
+    events = list(stream.poll())
+    assert _kinds(events) == [(BLOCK, n) for n in range(95, 101)]
+    assert list(stream.poll()) == []
+
+    fake_node.mine(5)  # several blocks between two polls
+    events = list(stream.poll())
+    assert _kinds(events) == [(BLOCK, n) for n in range(101, 106)]
+    for parent, child in zip(events, events[1:]):
+        assert child.block["parentID"] == parent.block["id"]
+    assert stream.head == (105, fake_node.block_id(105))
+
+
+def test_reorg_rolls_back(fake_node, fake_connector):
+    stream = BlockStream(fake_connector)
+    assert _kinds(stream.poll()) == [(BLOCK, 100)]
+    fake_node.mine(3)
+    list(stream.poll())
+    old_ids = [fake_node.block_id(n) for n in (102, 103)]
+
+    fake_node.reorg(2, length=4)  # 102, 103 replaced, chain up to 105
+    events = list(stream.poll())
+    assert _kinds(events) == [(ROLLBACK, 103), (ROLLBACK, 102)] + [(BLOCK, n) for n in range(102, 106)]
+    assert [e.block["id"] for e in events[:2]] == old_ids[::-1]
+    assert stream.head == (105, fake_node.block_id(105))
+
+
+def test_confirmations_hide_shallow_reorgs(fake_node, fake_connector):
+    stream = BlockStream(fake_connector, confirmations=3)
+    assert _kinds(stream.poll()) == [(BLOCK, 97)]
+    fake_node.mine(2)
+    fake_node.reorg(2)
+    assert _kinds(stream.poll()) == [(BLOCK, 98), (BLOCK, 99)]
+
+
+def test_reorg_too_deep(fake_node, fake_connector):
+    stream = BlockStream(fake_connector, start=96, keep=3)
+    list(stream.poll())
+    fake_node.reorg(4)
+    with pytest.raises(ReorgTooDeep):
+        list(stream.poll())
+
+
+def test_resume_from_checkpoint(tmp_path):
+    path = str(tmp_path / "stream.json")
+    with FakeThor(head=50) as node:
+        c = Connect(node.url)
+        stream = BlockStream(c, start=40, checkpoint=FileCheckpoint(path), checkpoint_every=1000)
+        seen = []
+        for event in stream.follow(stop_when_idle=True):
+            seen.append(event.block["number"])
+            if len(seen) == 5:
+                stream.stop()
+        assert seen == [40, 41, 42, 43, 44]  # the last one is applied: saved on the way out
+
+        # Restart, after a reorg of the last delivered blocks happened meanwhile.
+        node.reorg(8, length=10)
+        stream = BlockStream(c, start=0, checkpoint=FileCheckpoint(path))
+        assert stream.head[0] == 44
+        events = list(stream.follow(stop_when_idle=True))
+        assert _kinds(events) == [(ROLLBACK, 44), (ROLLBACK, 43)] + [(BLOCK, n) for n in range(43, 53)]
+        assert FileCheckpoint(path).load()["chain"][-1] == [52, node.block_id(52)]
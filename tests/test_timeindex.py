@@ -0,0 +1,63 @@
+''' Test the timestamp to block number index, against a fake node with missed slots '''
+import bisect
+from datetime import datetime, timezone
+
+import pytest
+
+from benchmarks.fake_thor import GENESIS_TIMESTAMP, FakeThor
+from thor_requests.connect import Connect
+
+from .fixtures import fake_node, fake_connector
+
+HEAD = 200000
+
+
+def _slot(number: int) -> int:
+    '''Slot of a block: one slot in 50 is missed, more after block 100000'''
+    return number + number // 50 + max(0, number - 100000) // 7
+
+
+TIMESTAMPS = [GENESIS_TIMESTAMP + 10 * _slot(n) for n in range(HEAD + 1)]
+
+
+def _expected(ts: int) -> int:
+    return bisect.bisect_right(TIMESTAMPS, ts) - 1
+
+
+def test_no_missed_slot(fake_node, fake_connector):
+    assert fake_connector.block_number_at(GENESIS_TIMESTAMP + 10 * 42 + 9) == 42
+    requests = fake_connector.time_index.requests
+    assert fake_connector.block_number_at(GENESIS_TIMESTAMP + 10 * 77) == 77
+    assert fake_connector.time_index.requests == requests  # genesis and best known, all between is dense
+    assert fake_connector.block_number_at(GENESIS_TIMESTAMP + 10 ** 9) == fake_node.head
+    with pytest.raises(Exception):
+        fake_connector.block_number_at(GENESIS_TIMESTAMP - 1)
+
+
+def test_missed_slots_few_requests():
+    with FakeThor(head=HEAD, timestamp_fn=TIMESTAMPS.__getitem__) as node:
+        c = Connect(node.url)
+        numbers = sorted({_slot(n) for n in range(0, HEAD, 997)})
+        cold = GENESIS_TIMESTAMP + 10 * 150123 + 3
+        assert c.block_number_at(cold) == _expected(cold)
+        assert c.time_index.requests <= 20
+
+        for slot in numbers[:50]:
+            ts = GENESIS_TIMESTAMP + 10 * slot + 5
+            assert c.block_number_at(ts) == _expected(ts)
+        # a lookup right after a known anchor: at most one block read
+        ts = GENESIS_TIMESTAMP + 10 * _slot(5001) + 1
+        c.block_number_at(ts)
+        before = c.time_index.requests
+        assert c.block_number_at(ts + 10) == _expected(ts + 10)
+        assert c.time_index.requests - before <= 1
+
+
+def test_bulk():
+    with FakeThor(head=HEAD, timestamp_fn=TIMESTAMPS.__getitem__) as node:
+        c = Connect(node.url)
+        days = [datetime(2018, 7, d, tzinfo=timezone.utc) for d in range(1, 20)]
+        timestamps = days + days[:5] + [GENESIS_TIMESTAMP + 10 ** 8]
+        numbers = c.block_numbers_at(timestamps)
+        assert numbers == [_expected(int(t.timestamp())) for t in days + days[:5]] + [HEAD]
+        assert c.time_index.requests <= 5 * len(days)
@@ -0,0 +1,72 @@
+''' Test the time-series reader of contract calls, against the fake node '''
+from benchmarks.fake_thor import FakeThor
+from thor_requests.connect import Connect
+from thor_requests.timeseries import EventProbe, Series, TimeSeries
+
+from .fixtures import vtho_contract, vtho_contract_address
+
+CALLER = "0x" + "ab" * 20
+OTHER = "0x" + "ee" * 20
+TOKEN = "0x0000000000000000000000000000456e65726779"  # VTHO
+
+
+def _supply(number: int) -> int:
+    return (number // 100) * 7 * 10 ** 18  # minted at every 100th block
+
+
+class Node:
+    def __init__(self, head=1000, finality_depth=0):
+        self.emulated = []
+        self.node = FakeThor(head=head, emulate_fn=self._emulate, events_per_block=1,
+                             event_fn=self._event, finality_depth=finality_depth)
+
+    def _emulate(self, body, number):
+        self.emulated.append(number)
+        data = "0x" + _supply(number).to_bytes(32, "big").hex()
+        return [{"data": data, "events": [], "transfers": [], "gasUsed": 10, "reverted": False, "vmError": ""}] * len(body["clauses"])
+
+    def _event(self, number, index):
+        address = TOKEN if number % 100 == 0 else OTHER
+        return {"address": address, "topics": ["0x" + "00" * 32], "data": "0x"}
+
+
+def test_every_block_evaluated(vtho_contract, vtho_contract_address):
+    n = Node()
+    with n.node as node:
+        series = TimeSeries(Connect(node.url)).call(CALLER, vtho_contract, "totalSupply", [], vtho_contract_address, blocks=[300, 0, 150, 150, 999])
+        assert list(series.blocks) == [0, 150, 300, 999]
+        assert series.values == [_supply(b) for b in [0, 150, 300, 999]]
+        assert sorted(n.emulated) == [0, 150, 300, 999]
+        assert series.changes() == list(series)
+
+
+def test_probe_skips_unchanged_blocks(vtho_contract, vtho_contract_address):
+    n = Node()
+    with n.node as node:
+        c = Connect(node.url)
+        blocks = range(0, 1001, 10)
+        series = TimeSeries(c).call(CALLER, vtho_contract, "totalSupply", [], vtho_contract_address, blocks,
+                                    probe=EventProbe(c, [vtho_contract_address]))
+        assert series.values == [_supply(b) for b in blocks]
+        assert series.evaluated == len(n.emulated) == 11  # the first block, then one per mint
+        assert series.changes() == [(b, _supply(b)) for b in range(0, 1001, 100)]
+
+
+def test_finalized_values_cached(vtho_contract, vtho_contract_address):
+    n = Node(finality_depth=500)
+    with n.node as node:
+        c = Connect(node.url)
+        reader = TimeSeries(c)
+        clauses = [c.clause(vtho_contract, "totalSupply", [], vtho_contract_address)] * 2
+        first = reader.call_multi(CALLER, clauses, range(400, 700, 100))
+        assert first.values == [(_supply(b), _supply(b)) for b in range(400, 700, 100)]
+        second = reader.call_multi(CALLER, clauses, range(400, 700, 100))
+        assert second.values == first.values
+        # 400 and 500 are finalized and cached, 600 is not
+        assert sorted(n.emulated) == [400, 500, 600, 600]
+        assert reader.calls == 4
+
+
+def test_empty_series():
+    series = Series([], [])
+    assert len(series) == 0 and series.changes() == []
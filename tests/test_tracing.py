@@ -0,0 +1,45 @@
+''' Test the phase-level tracing of Connect '''
+import time
+
+from thor_requests.connect import Connect
+from thor_requests.tracing import InMemoryCollector, NOOP_TRACER
+
+from .fixtures import fake_node, solo_wallet, vtho_contract, vtho_contract_address
+
+
+def test_transact_spans(fake_node, solo_wallet, vtho_contract, vtho_contract_address):
+    collector = InMemoryCollector()
+    c = Connect(fake_node.url, tracer=collector)
+    c.transact(solo_wallet, vtho_contract, "transfer", [vtho_contract_address, 1], vtho_contract_address)
+
+    spans = collector.export()
+    root = spans[-1]
+    assert root["name"] == "transact"
+    assert root["parent"] is None
+    assert root["attributes"]["gas"] > 0
+    phases = [s["name"] for s in spans if s["parent"] == root["id"]]
+    assert phases == ["chainTag", "best_block", "emulate", "sign", "post"]
+    # Each HTTP request is a span under its phase
+    http = [s for s in spans if s["name"] == "http"]
+    assert [s["attributes"]["method"] for s in http] == ["get_block", "get_block", "emulate", "post_tx"]
+    assert all(s["duration"] <= root["duration"] for s in spans)
+
+
+def test_call_multi_spans(fake_node, solo_wallet, vtho_contract, vtho_contract_address):
+    collector = InMemoryCollector()
+    c = Connect(fake_node.url, tracer=collector)
+    clause = c.clause(vtho_contract, "balanceOf", [vtho_contract_address], vtho_contract_address)
+    c.call_multi(solo_wallet.getAddress(), [clause] * 3)
+
+    summary = collector.summary()
+    assert summary["call_multi"]["count"] == 1
+    assert summary["http"]["count"] == 3
+    assert collector.export()[-1]["attributes"] == {"clauses": 3, "revision": "best"}
+
+
+def test_noop_is_cheap():
+    started = time.perf_counter()
+    for _ in range(100000):
+        with NOOP_TRACER.span("x", a=1) as span:
+            span.set_attribute("b", 2)
+    assert time.perf_counter() - started < 1
@@ -0,0 +1,132 @@
+''' Test the tx tracker against a scripted chain '''
+from thor_requests import utils
+from thor_requests.tracker import TxTracker, INCLUDED, REVERTED, EXPIRED, PENDING
+
+from .fixtures import solo_wallet
+
+
+def _block_id(number: int) -> str:
+    return "0x" + number.to_bytes(4, "big").hex() + "ab" * 28
+
+
+class ScriptedChain:
+    ''' Minimal stand-in of Connect, serves blocks and receipts from memory '''
+
+    def __init__(self):
+        self.blocks = {}
+        self.receipts = {}
+        self.posted = []
+
+    def add_block(self, number: int, tx_ids: list = None):
+        self.blocks[number] = {"number": number, "id": _block_id(number), "transactions": tx_ids or []}
+        return self.blocks[number]
+
+    def get_block(self, number):
+        return self.blocks.get(number)
+
+    def get_tx_receipt(self, tx_id):
+        return self.receipts.get(tx_id)
+
+    def post_tx(self, raw):
+        tx_id = "0x" + ("%064x" % (len(self.posted) + 1))
+        self.posted.append(raw)
+        return {"id": tx_id}
+
+
+def _body(ref_number: int, expiration: int = 3) -> dict:
+    return utils.build_tx_body(
+        [{"to": "0x0000000000000000000000000000456e65726779", "value": 0, "data": "0x"}],
+        1,
+        utils.calc_blockRef(_block_id(ref_number)),
+        utils.calc_nonce(),
+        expiration=expiration,
+        gas=21000,
+    )
+
+
+def test_included_reverted_expired():
+    chain = ScriptedChain()
+    tracker = TxTracker(chain)
+    tracker.track("0x01", _body(10))
+    tracker.track("0x02", _body(10))
+    tracker.track("0x03", _body(10))
+
+    tracker.process_block(chain.add_block(10))
+    chain.receipts["0x01"] = {"reverted": False, "meta": {"blockNumber": 11}}
+    chain.receipts["0x02"] = {"reverted": True, "meta": {"blockNumber": 12}}
+    chain.add_block(11, ["0x01"])
+    # Block 12 is skipped by the stream, should be filled in.
+    chain.add_block(12, ["0x02"])
+    changed = tracker.process_block(chain.add_block(13))
+    assert [x.tx_id for x in changed] == ["0x01", "0x02"]
+    assert tracker.status("0x01") == INCLUDED
+    assert tracker.status("0x02") == REVERTED
+    assert tracker.status("0x03") == PENDING
+
+    tracker.process_block(chain.add_block(14))
+    assert tracker.status("0x03") == EXPIRED
+    assert not tracker.pending
+
+
+def test_resubmit_expired(solo_wallet):
+    chain = ScriptedChain()
+    tracker = TxTracker(chain, resubmit=True, max_resubmits=1)
+    tracker.track("0x01", _body(10, expiration=1), solo_wallet)
+    tracker.process_block(chain.add_block(10))
+    tracker.process_block(chain.add_block(11))
+
+    changed = tracker.process_block(chain.add_block(12))
+    assert [x.status for x in changed] == [EXPIRED, PENDING]
+    new_id = tracker.get("0x01").replaced_by
+    assert new_id == changed[1].tx_id
+    assert changed[1].deadline == 13
+    assert len(chain.posted) == 1
+
+    # Only one resubmit is allowed.
+    tracker.process_block(chain.add_block(13))
+    tracker.process_block(chain.add_block(14))
+    assert tracker.status(new_id) == EXPIRED
+    assert tracker.get(new_id).replaced_by is None
+    assert len(chain.posted) == 1
+
+
+def test_bounded_memory():
+    chain = ScriptedChain()
+    tracker = TxTracker(chain, max_settled=10)
+    for i in range(100):
+        tracker.track("0x%02x" % i, _body(1, expiration=0))
+    tracker.process_block(chain.add_block(1))
+    tracker.process_block(chain.add_block(2))
+    assert not tracker.pending
+    assert len(tracker.settled) == 10
+
+
+def test_deadlines_of_included_txs_dropped():
+    chain = ScriptedChain()
+    tracker = TxTracker(chain, max_settled=10)
+    for number in range(1, 51):
+        tx_ids = ["0x%04x%02x" % (number, i) for i in range(20)]
+        for tx_id in tx_ids:
+            tracker.track(tx_id, _body(number, expiration=10 ** 6))  # far deadlines
+            chain.receipts[tx_id] = {"reverted": False, "meta": {"blockNumber": number}}
+        tracker.process_block(chain.add_block(number, tx_ids))
+        assert not tracker.pending
+        assert len(tracker._deadlines) <= 64
+
+
+def test_gap_fill_stops_at_a_missing_block():
+    chain = ScriptedChain()
+    tracker = TxTracker(chain)
+    tracker.track("0x01", _body(10, expiration=100))
+    chain.receipts["0x01"] = {"reverted": False, "meta": {"blockNumber": 12}}
+    tracker.process_block(chain.add_block(10))
+    chain.add_block(11)
+    # Block 12 vanished (reorg) after block 13 was read
+    assert tracker.process_block({"number": 13, "id": _block_id(13), "transactions": []}) == []
+    assert tracker.head_number == 11
+    assert tracker.status("0x01") == PENDING
+
+    chain.add_block(12, ["0x01"])
+    changed = tracker.process_block(chain.add_block(13))
+    assert [x.tx_id for x in changed] == ["0x01"]
+    assert tracker.status("0x01") == INCLUDED
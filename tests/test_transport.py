@@ -0,0 +1,41 @@
+''' Test record and replay of the HTTP exchanges '''
+import pytest
+from thor_requests.connect import Connect
+from thor_requests.ratelimit import NodeLimiter
+from thor_requests.transport import HttpTransport, RecordingTransport, ReplayTransport
+
+from .fixtures import fake_node, solo_wallet, vtho_contract, vtho_contract_address
+
+
+def _workload(c, wallet, contract, address, mine):
+    balance = c.call(wallet.getAddress(), contract, "balanceOf", [wallet.getAddress()], address)
+    tx_id = c.transact(wallet, contract, "transfer", [address, 1], address)["id"]
+    mine()
+    return balance["decoded"], tx_id, c.replay_tx(tx_id), c.get_tx_receipt(tx_id)
+
+
+def test_record_then_replay(tmp_path, fake_node, solo_wallet, vtho_contract, vtho_contract_address):
+    path = str(tmp_path / "calls.jsonl.gz")
+    recorder = RecordingTransport(path)
+    c = Connect(fake_node.url, transport=recorder)
+    recorded = _workload(c, solo_wallet, vtho_contract, vtho_contract_address, fake_node.mine)
+    recorder.close()
+    requests_to_node = fake_node.requests
+    fake_node.stop()
+
+    # Replay at another address, the node is gone.
+    c = Connect("http://replay", transport=ReplayTransport(path))
+    replayed = _workload(c, solo_wallet, vtho_contract, vtho_contract_address, lambda: None)
+    assert replayed == recorded
+    assert fake_node.requests == requests_to_node
+
+    with pytest.raises(Exception, match="Not recorded"):
+        c.get_block(12345)
+
+
+def test_pool_sized_to_the_limiter():
+    c = Connect("http://localhost:8669", limiter=NodeLimiter(max_concurrency=64))
+    assert c.transport.session.get_adapter("http://localhost:8669")._pool_maxsize == 64
+    assert c.transport.session.get_adapter("https://example.org")._pool_maxsize == 64
+    assert Connect("http://localhost:8669").transport.session.get_adapter("http://x")._pool_maxsize == 10
+    assert HttpTransport(pool_maxsize=3).session.get_adapter("http://x")._pool_maxsize == 3
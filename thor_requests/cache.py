@@ -0,0 +1,158 @@
+'''
+    In-memory caches, and the cache of emulation responses (which can also live on disk).
+'''
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Union
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024):
+        '''
+        Thread-safe least-recently-used cache.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            Max entries kept, by default 1024
+        '''
+        self.maxsize = maxsize
+        self.data: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        with self._lock:
+            self.data[key] = value
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def clear(self):
+        with self._lock:
+            self.data.clear()
+
+
+def _normalized(obj):
+    '''Same value, same form: sorted keys, lower case hex, ints as hex'''
+    if isinstance(obj, dict):
+        return {k: _normalized(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_normalized(v) for v in obj]
+    if isinstance(obj, bool) or obj is None:
+        return obj
+    if isinstance(obj, int):
+        return hex(obj)
+    if isinstance(obj, str) and obj[:2] in ("0x", "0X"):
+        return "0x" + obj[2:].lower()
+    return obj
+
+
+class EmulationCache:
+    def __init__(self, maxsize: int = 4096, max_bytes: int = 64 * 1024 * 1024, directory: str = None):
+        '''
+        Responses of emulations at a fixed block id, which never change.
+        Kept as the raw response bytes, so each hit decodes a fresh copy.
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            Max entries in memory, by default 4096
+        max_bytes : int, optional
+            Max total size of the responses in memory, by default 64 MB
+        directory : str, optional
+            Also keep every response in this directory (one file each, never evicted),
+            so the cache survives restarts. By default None (memory only)
+        '''
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.data: OrderedDict = OrderedDict()
+        self.size = 0  # bytes in memory
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(block_id: str, body: dict) -> str:
+        '''block id + digest of the normalized emulate body'''
+        canonical = json.dumps(_normalized(body), sort_keys=True, separators=(",", ":"))
+        return block_id.lower() + "-" + hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key: str) -> Union[bytes, None]:
+        with self._lock:
+            if key in self.data:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return self.data[key]
+        if self.directory and os.path.exists(self._path(key)):
+            with open(self._path(key), "rb") as f:
+                value = f.read()
+            self._remember(key, value)
+            with self._lock:
+                self.hits += 1
+            return value
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _remember(self, key: str, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.data:
+                self.size -= len(self.data[key])
+            self.data[key] = value
+            self.data.move_to_end(key)
+            self.size += len(value)
+            while len(self.data) > self.maxsize or self.size > self.max_bytes:
+                _, evicted = self.data.popitem(last=False)
+                self.size -= len(evicted)
+
+    def put(self, key: str, value: bytes):
+        self._remember(key, value)
+        if self.directory:
+            path = self._path(key)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(value)
+            os.replace(tmp, path)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self.data
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def clear(self):
+        '''Forget the responses in memory (not the ones on disk)'''
+        with self._lock:
+            self.data.clear()
+            self.size = 0
@@ -73,4 +73,11 @@ class Clause:
         dict
             The clause as a dict: {"to":, "value":, "data":}
         '''
-        return self.dict
\ No newline at end of file
+        return self.dict
+
+    def key(self) -> tuple:
+        '''
+        Identify the clause, to deduplicate or cache its results.
+        The function name is part of it: the same data decoded by another ABI is another result.
+        '''
+        return (self.dict["to"].lower(), self.dict["value"], self.dict["data"].lower(), self.func_name)
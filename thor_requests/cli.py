@@ -0,0 +1,212 @@
+'''
+    thor-requests: streaming command line tool for bulk chain operations.
+
+    thor-requests balances addresses.txt            > balances.jsonl
+    thor-requests blocks 1000 2000 --expanded       > blocks.jsonl
+    thor-requests events 1000 2000 --address 0x...  > events.jsonl
+    cat tx_ids.txt | thor-requests receipts         > receipts.jsonl
+    cat raw_txs.txt | thor-requests broadcast       > posted.jsonl
+    cat tx_ids.txt | thor-requests replay --abi token.json > replays.jsonl
+
+    Inputs are read line by line (file or stdin), outputs are written as JSON lines
+    as soon as they are ready, in input order. At most a bounded window of items
+    is in flight, so memory stays constant whatever the input size.
+    Items that fail are written as {..., "error": "..."} and the exit code is 1.
+'''
+
+import argparse
+import json
+import os
+import sys
+from typing import Callable, Iterable, Iterator, List, TextIO
+
+from .concurrency import map_ordered
+from .connect import Connect
+from .contract import Contract
+from .ratelimit import NodeLimiter
+
+DEFAULT_NODE = "http://localhost:8669"
+
+
+def _lines(stream: TextIO) -> Iterator[str]:
+    '''Non-empty lines, comments (#) skipped'''
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith("#"):
+            yield line
+
+
+def _safe(fn: Callable, key: str) -> Callable:
+    '''Wrap fn(item) so a failure becomes {key: item, "error": "..."}'''
+    def _run(item):
+        try:
+            return fn(item)
+        except Exception as e:
+            return {key: item, "error": str(e)}
+    return _run
+
+
+def _write(results: Iterable[dict], out: TextIO) -> int:
+    '''Write results as JSON lines, return the number of errors'''
+    errors = 0
+    for result in results:
+        if isinstance(result, dict) and "error" in result:
+            errors += 1
+        out.write(json.dumps(result) + "\n")
+    out.flush()
+    return errors
+
+
+def balances(c: Connect, args, stdin: TextIO, out: TextIO) -> int:
+    def _balance(address: str) -> dict:
+        account = c.get_account(address, args.block)
+        return {
+            "address": address,
+            "vet": str(int(account["balance"], 16)),
+            "vtho": str(int(account["energy"], 16)),
+        }
+    return _write(map_ordered(_safe(_balance, "address"), _lines(stdin), args.workers), out)
+
+
+def _block(c: Connect, number: int, expanded: bool) -> dict:
+    block = c.get_block(number, expanded)
+    if block is None:
+        raise Exception(f"block {number} not found")
+    return block
+
+
+def blocks(c: Connect, args, stdin: TextIO, out: TextIO) -> int:
+    to_block = args.to_block if args.to_block is not None else c.get_block("best")["number"]
+    numbers = range(args.from_block, to_block + 1)
+    results = map_ordered(_safe(lambda n: _block(c, n, args.expanded), "number"), numbers, args.workers)
+    return _write(results, out)
+
+
+def _events_of_chunk(c: Connect, criteria_set: List[dict], page_size: int) -> Callable:
+    def _fetch(chunk: range) -> tuple:
+        # Only the first page is read here, concurrently with the other chunks;
+        # the next pages are read as the chunk is written: one page per chunk in memory.
+        events = c.iter_events(chunk.start, chunk.stop - 1, criteria_set, page_size)
+        try:
+            first = next(events, None)
+        except Exception as e:
+            return chunk, None, None, str(e)
+        return chunk, first, events, None
+    return _fetch
+
+
+def _chunk_events(chunks: Iterator[tuple]) -> Iterator[dict]:
+    for chunk, first, rest, error in chunks:
+        if first is not None:
+            yield first
+            try:
+                for event in rest:
+                    yield event
+            except Exception as e:
+                error = str(e)
+        if error:
+            # After the events written so far, the chunk is reported whole.
+            yield {"from": chunk.start, "to": chunk.stop - 1, "error": error}
+
+
+def events(c: Connect, args, stdin: TextIO, out: TextIO) -> int:
+    to_block = args.to_block if args.to_block is not None else c.get_block("best")["number"]
+    criteria = {}
+    if args.address:
+        criteria["address"] = args.address
+    for i, topic in enumerate(args.topic or []):
+        if topic != "-":
+            criteria[f"topic{i}"] = topic
+    criteria_set = [criteria] if criteria else []
+
+    chunks = (range(n, min(n + args.chunk, to_block + 1)) for n in range(args.from_block, to_block + 1, args.chunk))
+    fetched = map_ordered(_events_of_chunk(c, criteria_set, args.page_size), chunks, args.workers)
+    return _write(_chunk_events(fetched), out)
+
+
+def receipts(c: Connect, args, stdin: TextIO, out: TextIO) -> int:
+    def _receipt(tx_id: str) -> dict:
+        return {"id": tx_id, "receipt": c.wait_for_tx_receipt(tx_id, args.wait)}
+    return _write(map_ordered(_safe(_receipt, "id"), _lines(stdin), args.workers), out)
+
+
+def broadcast(c: Connect, args, stdin: TextIO, out: TextIO) -> int:
+    def _post(raw: str) -> dict:
+        return {"raw": raw, "id": c.post_tx(raw)["id"]}
+    return _write(map_ordered(_safe(_post, "raw"), _lines(stdin), args.workers), out)
+
+
+def replay(c: Connect, args, stdin: TextIO, out: TextIO) -> int:
+    contracts = [Contract.fromFile(path) for path in args.abi or []]
+    if args.blocks:
+        return _write(c.replay_blocks(args.blocks[0], args.blocks[1], contracts, args.workers), out)
+    _report = _safe(lambda tx_id: c.replay_report(tx_id, contracts), "txID")
+    return _write(map_ordered(_report, _lines(stdin), args.workers), out)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="thor-requests", description="Bulk operations on VeChain, streamed as JSON lines")
+    parser.add_argument("--node", default=os.environ.get("THOR_NODE", DEFAULT_NODE), help="node url, or env THOR_NODE")
+    parser.add_argument("--workers", type=int, help="concurrent requests, by default 8 (64 if --adaptive)")
+    parser.add_argument("--adaptive", action="store_true", help="adapt concurrency to the node, retry on 429/503")
+    parser.add_argument("--rate", type=float, help="max requests per second (implies --adaptive)")
+    parser.add_argument("--timeout", type=float, default=20, help="HTTP timeout in seconds, by default 20")
+    sub = parser.add_subparsers(dest="command")
+    sub.required = True
+
+    p = sub.add_parser("balances", help="VET and VTHO balances (in Wei) of addresses, one per line")
+    p.add_argument("input", nargs="?", default="-", help="address file, by default stdin")
+    p.add_argument("--block", default="best", help="block id or number, by default best")
+    p.set_defaults(func=balances)
+
+    p = sub.add_parser("blocks", help="dump a range of blocks")
+    p.add_argument("from_block", type=int)
+    p.add_argument("to_block", type=int, nargs="?", help="included, by default the best block")
+    p.add_argument("--expanded", action="store_true", help="include txs and receipts")
+    p.set_defaults(func=blocks)
+
+    p = sub.add_parser("events", help="export event logs of a block range")
+    p.add_argument("from_block", type=int)
+    p.add_argument("to_block", type=int, nargs="?", help="included, by default the best block")
+    p.add_argument("--address", help="emitting contract")
+    p.add_argument("--topic", nargs="*", help="topic0 topic1 ... ('-' for any)")
+    p.add_argument("--chunk", type=int, default=1000, help="blocks per query, by default 1000")
+    p.add_argument("--page-size", type=int, default=256, help="events per page, by default 256")
+    p.set_defaults(func=events)
+
+    p = sub.add_parser("receipts", help="wait for receipts of tx ids, one per line")
+    p.add_argument("input", nargs="?", default="-", help="tx id file, by default stdin")
+    p.add_argument("--wait", type=int, default=30, help="seconds to wait for each receipt, by default 30")
+    p.set_defaults(func=receipts)
+
+    p = sub.add_parser("broadcast", help="post signed raw txs ('0x...'), one per line")
+    p.add_argument("input", nargs="?", default="-", help="raw tx file, by default stdin")
+    p.set_defaults(func=broadcast)
+
+    p = sub.add_parser("replay", help="replay txs at their block: gas, revert reason and events per clause")
+    p.add_argument("input", nargs="?", default="-", help="tx id file, by default stdin")
+    p.add_argument("--blocks", type=int, nargs=2, metavar=("FROM", "TO"), help="replay every tx of a block range instead")
+    p.add_argument("--abi", nargs="*", help="contract meta files (with an abi) to decode the events")
+    p.set_defaults(func=replay)
+    return parser
+
+
+def main(argv: List[str] = None, stdin: TextIO = None, stdout: TextIO = None) -> int:
+    args = build_parser().parse_args(argv)
+    stdin = stdin or sys.stdin
+    stdout = stdout or sys.stdout
+    limiter = NodeLimiter(rate=args.rate) if args.adaptive or args.rate else None
+    c = Connect(args.node, timeout=args.timeout, limiter=limiter)
+    args.workers = args.workers or c.concurrency()
+
+    source = getattr(args, "input", "-")
+    if source != "-":
+        with open(source, "r") as f:
+            errors = args.func(c, args, f, stdout)
+    else:
+        errors = args.func(c, args, stdin, stdout)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+'''
+    Merge concurrent Connect.call() into one multi-clause emulation.
+
+    Threads that call() at about the same time, with the same caller,
+    gas payer and revision, are answered by a single call_multi():
+    the first one waits up to "window" seconds (or until "max_batch" calls)
+    for others to join, sends them all as one tx, and each thread
+    gets back the result of its own clause.
+
+    coalescer = CallCoalescer(connector, window=0.002, max_batch=32)
+    coalescer.call(caller, contract, "balanceOf", [holder], token)  # same arguments as Connect.call()
+
+    Only view / pure functions are merged: clauses of a tx run one after the other,
+    so a state-changing function would be seen by the clauses after it.
+    Calls with a gas limit, without a contract (VET transfer) or to a state-changing function,
+    go straight to Connect.call().
+
+    The clauses of a batch share the gas of one tx: a clause that reverts in a batch
+    (maybe out of gas because of heavy clauses before it) is sent again alone,
+    and only that result is reported.
+'''
+
+import threading
+from typing import List, Tuple, Union
+
+from .clause import Clause
+from .contract import Contract
+
+
+class _Slot:
+    __slots__ = ("clause", "done", "result", "error")
+
+    def __init__(self, clause: Clause):
+        self.clause = clause
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Batch:
+    __slots__ = ("slots", "full")
+
+    def __init__(self):
+        self.slots: List[_Slot] = []
+        self.full = threading.Event()
+
+
+def _is_read_only(contract: Contract, func_name: str) -> bool:
+    abi = contract.get_abi(func_name) or {}
+    return abi.get("stateMutability") in ("view", "pure") or abi.get("constant") is True
+
+
+class CallCoalescer:
+    def __init__(self, connector, window: float = 0.002, max_batch: int = 32):
+        '''
+        Coalesce concurrent read-only calls into call_multi().
+
+        Parameters
+        ----------
+        connector : Connect
+            Where the emulations go
+        window : float, optional
+            Seconds the first call of a batch waits for others, by default 0.002
+        max_batch : int, optional
+            Clauses per emulation, a full batch is sent at once, by default 32
+        '''
+        self.connector = connector
+        self.window = window
+        self.max_batch = max_batch
+        self.calls = 0  # calls answered
+        self.batches = 0  # emulations sent for them
+        self._pending = {}  # (caller, gas_payer, block) -> _Batch filling up
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        caller: str,
+        contract: Contract,
+        func_name: str,
+        func_params: List,
+        to: str,
+        value=0,
+        gas=0,
+        gas_payer: str = None,
+        block: str = "best",
+    ) -> dict:
+        '''Same as Connect.call(), possibly answered together with concurrent calls'''
+        if gas or contract is None or not _is_read_only(contract, func_name):
+            with self._lock:
+                self.calls += 1
+                self.batches += 1
+            return self.connector.call(caller, contract, func_name, func_params, to, value, gas, gas_payer, block)
+
+        slot = _Slot(self.connector.clause(contract, func_name, func_params, to, value))
+        key = (caller.lower(), gas_payer.lower() if gas_payer else None, block)
+        with self._lock:
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _Batch()
+            batch.slots.append(slot)
+            if len(batch.slots) >= self.max_batch:
+                del self._pending[key]  # later calls start a new batch
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+            self._send(key, batch.slots)
+
+        slot.done.wait()
+        if slot.error is not None:
+            raise slot.error
+        return slot.result
+
+    def _send(self, key: Tuple, slots: List[_Slot]):
+        caller, gas_payer, block = key
+        while slots:
+            with self._lock:
+                self.batches += 1
+            try:
+                results = self.connector.call_multi(caller, [s.clause for s in slots], 0, gas_payer, block)
+            except Exception as e:
+                for s in slots:
+                    s.error = e
+                    s.done.set()
+                with self._lock:
+                    self.calls += len(slots)
+                return
+            for s, result in zip(slots, results):
+                if result["reverted"] and len(slots) > 1:
+                    result = self._alone(caller, gas_payer, block, s)
+                    if result is None:
+                        continue  # the error is set
+                s.result = result
+                s.done.set()
+            with self._lock:
+                self.calls += len(results)
+            # The node stops at a reverted clause: send the ones after it again.
+            slots = slots[len(results):]
+
+    def _alone(self, caller: str, gas_payer: str, block: str, slot: _Slot) -> Union[dict, None]:
+        '''Result of a clause sent in a tx of its own, None if that failed (error set on the slot)'''
+        with self._lock:
+            self.batches += 1
+        try:
+            return self.connector.call_multi(caller, [slot.clause], 0, gas_payer, block)[0]
+        except Exception as e:
+            slot.error = e
+            slot.done.set()
+            return None
@@ -0,0 +1,59 @@
+'''
+    JSON codecs used by Connect to encode request bodies and decode responses.
+
+    JSONCodec:   stdlib json.
+    OrjsonCodec: orjson (pip3 install orjson), several times faster on large
+                 responses such as expanded blocks and emulation results.
+
+    default_codec() picks orjson when it is installed, stdlib otherwise.
+    Any object with dumps(obj) -> bytes and loads(bytes) -> obj can be used.
+'''
+
+import json
+
+
+class JSONCodec:
+    name = "json"
+
+    def dumps(self, obj) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: bytes):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    name = "orjson"
+
+    def __init__(self):
+        '''
+        Raises
+        ------
+        Exception
+            If orjson is not installed
+        '''
+        try:
+            import orjson
+        except ImportError:
+            raise Exception("orjson is not installed, pip3 install orjson")
+        self._orjson = orjson
+
+    def dumps(self, obj) -> bytes:
+        try:
+            return self._orjson.dumps(obj)
+        except TypeError:
+            # orjson has no integers beyond 64 bits, eg. a VET value in Wei.
+            return super().dumps(obj)
+
+    def loads(self, data: bytes):
+        # Thor sends 256-bit quantities as hex strings, JSON numbers are small,
+        # so orjson's 64-bit integer limit is never hit here.
+        return self._orjson.loads(data)
+
+
+def default_codec() -> JSONCodec:
+    '''OrjsonCodec if orjson is installed, else JSONCodec'''
+    try:
+        return OrjsonCodec()
+    except Exception:
+        return JSONCodec()
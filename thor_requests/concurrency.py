@@ -0,0 +1,42 @@
+'''
+    Helpers to run many network calls concurrently.
+'''
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable, Iterator
+
+
+def map_ordered(fn: Callable, items: Iterable, max_workers: int = 8, window: int = None) -> Iterator:
+    '''
+    Apply fn on each item with a thread pool, yield the results in input order.
+
+    At most "window" items are in flight at the same time,
+    so a very large (or endless) input is never fully held in memory.
+
+    Parameters
+    ----------
+    fn : Callable
+        Function to apply on each item.
+    items : Iterable
+        The input items, can be a generator.
+    max_workers : int, optional
+        Threads in the pool, by default 8
+    window : int, optional
+        Max items in flight, by default 2 * max_workers
+
+    Yields
+    -------
+    Iterator
+        fn(item), in the same order as items.
+        If fn raises, the exception is raised here.
+    '''
+    window = window or max_workers * 2
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = deque()
+        for item in items:
+            futures.append(executor.submit(fn, item))
+            if len(futures) >= window:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
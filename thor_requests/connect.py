@@ -1,7 +1,7 @@
 import time
 import json
-from typing import Union, List
-import requests
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, Union, List
 from .utils import (
     build_tx_body,
     build_url,
@@ -15,17 +15,74 @@ from .utils import (
     inject_decoded_event,
     inject_decoded_return,
     inject_revert_reason,
+    is_block_id,
     is_emulate_failed,
+    read_blockRef_number,
     read_vm_gases,
     build_params,
     suggest_gas_for_tx,
 )
 from .wallet import Wallet
 from .contract import Contract
+from .cache import EmulationCache, LRUCache
 from .clause import Clause
+from .codec import JSONCodec, default_codec
+from .concurrency import map_ordered
+from .jsonstream import iter_array
+from .metrics import Hook
+from .ratelimit import THROTTLE_STATUS, NodeLimiter, ThrottledError
+from .results import Block, Receipt, Tx
+from .snapshot import Snapshot
+from .timeindex import Timestamp, TimeIndex
+from .tracing import NOOP_TRACER, Tracer
+from .transport import HttpTransport, Transport
 from .const import VTHO_ABI, VTHO_ADDRESS
 
 
+@lru_cache(maxsize=1)
+def _vip180_contract() -> Contract:
+    ''' VTHO's ABI (a VIP-180 token), parsed on first use only '''
+    return Contract({"abi": json.loads(VTHO_ABI)})
+
+
+def _replay_body(tx: dict) -> dict:
+    ''' Emulate body of an existing tx (from get_tx() or an expanded block) '''
+    emulate_body = calc_emulate_tx_body(tx["origin"], tx)
+    if tx.get("delegator"):
+        emulate_body["gasPayer"] = tx["delegator"]
+    return emulate_body
+
+
+def _compact_event(event: dict, contracts: List[Contract]) -> dict:
+    ''' An emulated event, decoded with the first contract that knows it, else raw '''
+    if contracts and event["topics"]:
+        signature = bytes.fromhex(event["topics"][0][2:])
+        for contract in contracts:
+            if contract.get_event_by_signature(signature):
+                decoded = inject_decoded_event(dict(event), contract)
+                return {"address": event["address"], "name": decoded["name"], "decoded": decoded["decoded"]}
+    return {"address": event["address"], "topics": event["topics"], "data": event["data"]}
+
+
+def _revision_number(block) -> Union[int, None]:
+    ''' Block number of a revision, None if it is not known without asking ("best", "finalized"...) '''
+    if isinstance(block, int):
+        return block
+    if is_block_id(block):
+        return read_blockRef_number(block)
+    return int(block) if isinstance(block, str) and block.isdigit() else None
+
+
+def _storage_key(key: Union[str, int]) -> str:
+    ''' Storage slot as '0x' + 64 lower case hex chars '''
+    if isinstance(key, int):
+        return "0x" + key.to_bytes(32, "big").hex()
+    key = key[2:] if key.startswith("0x") else key
+    if len(key) > 64:
+        raise Exception("storage key should be at most 32 bytes")
+    return "0x" + key.lower().rjust(64, "0")
+
+
 def _beautify(response: dict, contract: Contract, func_name: str) -> dict:
     ''' Beautify a emulation response dict, to include decoded return and decoded events '''
     # Decode return value
@@ -42,10 +99,37 @@ def _beautify(response: dict, contract: Contract, func_name: str) -> dict:
     return response
 
 
+def _summarize(responses: List[dict]) -> dict:
+    ''' Summarize the emulation responses of a tx: total gas and revert reasons '''
+    reasons = []
+    for response in responses:
+        if not is_emulate_failed(response):
+            continue
+        decoded = response.get("decoded") or {}
+        reasons.append(decoded.get("revertReason") or response["vmError"])
+    return {
+        "responses": responses,
+        "gasUsed": sum(read_vm_gases(responses)),
+        "reverted": any_emulate_failed(responses),
+        "revertReasons": reasons,
+    }
+
+
 class Connect:
     """Connect to VeChain"""
 
-    def __init__(self, url, timeout: float = 20):
+    def __init__(
+        self,
+        url,
+        timeout: float = 20,
+        hooks: List[Hook] = None,
+        transport: Transport = None,
+        tracer: Tracer = None,
+        codec: JSONCodec = None,
+        compress: bool = True,
+        limiter: NodeLimiter = None,
+        emulation_cache: Union[EmulationCache, bool] = None,
+    ):
         '''
         Create a new connector to VeChain
 
@@ -55,9 +139,47 @@ class Connect:
             VeChain node url
         timeout : float, optional
             timeout (in seconds) on POST/GET when connecting to VeChain, by default 20
+        hooks : List[Hook], optional
+            Instrumentation hooks run around every HTTP call, see metrics.Hook
+        transport : Transport, optional
+            Carries the HTTP exchanges, by default HttpTransport().
+            See transport.RecordingTransport and transport.ReplayTransport
+        tracer : Tracer, optional
+            Records spans of each phase of call(), transact()..., by default no tracing.
+            See tracing.InMemoryCollector and tracing.OpenTelemetryTracer
+        codec : JSONCodec, optional
+            Encodes request bodies and decodes responses, by default codec.default_codec()
+            (orjson if installed, else stdlib json)
+        compress : bool, optional
+            Ask the node for gzip compressed responses, by default True
+        limiter : NodeLimiter, optional
+            Rate and adaptive concurrency limits, with retries of throttled (429/503) requests.
+            By default None: no limits. ratelimit.endpoint_limiter(url) gives one shared per node.
+        emulation_cache : Union[EmulationCache, bool], optional
+            Keeps the responses of emulations at a block id (call, call_multi, replay_tx...),
+            by default an in-memory cache.EmulationCache(). False: no cache.
+            Emulations at "best" or a block number are never cached.
         '''
         self.url = url
         self.timeout = timeout
+        self.hooks: List[Hook] = list(hooks or [])
+        self.limiter: NodeLimiter = limiter
+        # one kept-alive connection per worker thread
+        self.transport: Transport = transport or HttpTransport(pool_maxsize=max(10, self.concurrency()))
+        self.tracer: Tracer = tracer or NOOP_TRACER
+        self.codec: JSONCodec = codec or default_codec()
+        self.compress = compress
+        # (block id, address, key) -> value; entries of a fixed block never change
+        self.storage_cache = LRUCache(100000)
+        # address -> (code, lowest block number it was seen at or None);
+        # code does not change after deployment, but is not there before
+        self.code_cache = LRUCache(256)
+        self._chain_tag: int = None  # from the genesis block, read on first use
+        # timestamp -> block number, remembers the blocks it reads
+        self.time_index = TimeIndex(self)
+        if emulation_cache is None or emulation_cache is True:
+            emulation_cache = EmulationCache()
+        self.emulation_cache: EmulationCache = None if emulation_cache is False else emulation_cache
 
     def get_endpoint(self):
         '''Return which node current connector is linked to'''
@@ -67,15 +189,165 @@ class Connect:
         """Adjust the time out for the connector in seconds"""
         self.timeout = float(timeout)
 
+    def add_hook(self, hook: Hook):
+        """Add an instrumentation hook, it runs around every HTTP call"""
+        self.hooks.append(hook)
+
+    def _request(self, method: str, verb: str, path_template: str, path: str, params: dict = None, body=None):
+        """
+        Send a HTTP request to the node, run the hooks around it.
+
+        Parameters
+        ----------
+        method : str
+            Which Connect method is calling, eg. "get_block"
+        verb : str
+            "GET" or "POST"
+        path_template : str
+            Path without variable parts, eg. "/blocks/{revision}"
+        path : str
+            The real path, eg. "/blocks/best"
+        params : dict, optional
+            URL query params
+        body : optional
+            JSON body to POST
+
+        Returns
+        -------
+        transport.Response
+            The raw response, status code is not checked.
+        """
+        url = build_url(self.url, path)
+        headers, data = self._prepare(body)
+
+        call = {
+            "method": method,
+            "verb": verb,
+            "endpoint": self.url,
+            "path": path_template,
+            "url": url,
+        }
+        for hook in self.hooks:
+            hook.before(call)
+
+        def _send():
+            with self.tracer.span("http", method=method, verb=verb, path=path_template):
+                return self.transport.request(
+                    verb, url, params=params, data=data, headers=headers, timeout=self.timeout
+                )
+
+        started = time.perf_counter()
+        try:
+            r = self.limiter.call(_send, key=path_template) if self.limiter else _send()
+        except Exception as e:
+            call.update({"status": None, "latency": time.perf_counter() - started, "bytes_out": 0, "bytes_in": 0, "error": e})
+            for hook in self.hooks:
+                hook.after(call)
+            raise
+
+        call.update({
+            "status": r.status_code,
+            "latency": time.perf_counter() - started,
+            "bytes_out": len(data or b""),
+            "bytes_in": len(r.content),
+            "error": None,
+        })
+        for hook in self.hooks:
+            hook.after(call)
+        return r
+
+    def concurrency(self) -> int:
+        """
+        Worker threads for concurrent features: 8, or the limiter's max concurrency
+        (the limiter then lets through as many requests as the node sustains).
+        """
+        return self.limiter.max_concurrency if self.limiter else 8
+
+    def _prepare(self, body) -> tuple:
+        """Headers and encoded body (or None) of a request"""
+        headers = {"accept": "application/json", "Accept-Encoding": "gzip" if self.compress else "identity"}
+        data = None
+        if body is not None:
+            headers["Content-Type"] = "application/json"
+            data = self.codec.dumps(body)
+        return headers, data
+
+    def _stream(self, method: str, verb: str, path_template: str, path: str, params: dict = None, body=None, key: str = None) -> Iterator:
+        """
+        Like _request(), but yield the elements of a JSON array in the response
+        as they arrive (see jsonstream.iter_array), the body is never held whole.
+        Hooks run after the last element. Raise if the status is not 200.
+        """
+        url = build_url(self.url, path)
+        headers, data = self._prepare(body)
+        call = {
+            "method": method,
+            "verb": verb,
+            "endpoint": self.url,
+            "path": path_template,
+            "url": url,
+        }
+        for hook in self.hooks:
+            hook.before(call)
+
+        started = time.perf_counter()
+        received = [0]
+        error = None
+
+        def _counted(chunks):
+            for chunk in chunks:
+                received[0] += len(chunk)
+                yield chunk
+
+        status, chunks = None, None
+        first_byte = None
+        try:
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                with self.tracer.span("http", method=method, verb=verb, path=path_template, stream=True):
+                    status, chunks = self.transport.stream(
+                        verb, url, params=params, data=data, headers=headers, timeout=self.timeout
+                    )
+                first_byte = time.perf_counter() - started
+            finally:
+                if self.limiter:
+                    # The slot is given back once the headers are in, not after the last element:
+                    # the caller may send requests while it consumes the stream.
+                    # Not retried, latency is up to the response headers.
+                    throttled = status is None or status in THROTTLE_STATUS
+                    self.limiter.release(first_byte or time.perf_counter() - started, throttled, path_template)
+            if status != 200:
+                text = b"".join(chunks).decode("utf-8", errors="replace")
+                if status in THROTTLE_STATUS:
+                    raise ThrottledError(status, text)
+                raise Exception(f"HTTP error: {status} {text}")
+            for element in iter_array(_counted(chunks), key):
+                yield element
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if hasattr(chunks, "close"):
+                chunks.close()  # the caller may stop early, release the connection
+            call.update({
+                "status": status,
+                "latency": time.perf_counter() - started,
+                "bytes_out": len(data or b""),
+                "bytes_in": received[0],
+                "error": error,
+            })
+            for hook in self.hooks:
+                hook.after(call)
+
     def get_account(self, address: str, block: str = "best") -> dict:
         """Query account status against the "best" block (or your choice)"""
-        url = build_url(self.url, f"/accounts/{address}?revision={block}")
-        r = requests.get(
-            url, headers={"accept": "application/json"}, timeout=self.timeout
-        )
+        path = f"/accounts/{address}?revision={block}"
+        url = build_url(self.url, path)
+        r = self._request("get_account", "GET", "/accounts/{address}", path)
         if not (r.status_code == 200):
             raise Exception(f"Cant connect to {url}, error {r.text}")
-        return r.json()
+        return self.codec.loads(r.content)
 
     def get_vet_balance(self, address: str, block: str = "best") -> int:
         """
@@ -115,37 +387,153 @@ class Connect:
         account_status = self.get_account(address, block)
         return int(account_status["energy"], 16)
 
-    def get_block(self, id_or_number: str = "best", expanded: bool = False) -> dict:
+    def get_code(self, address: str, block: str = "best") -> str:
+        """
+        Fetch the runtime code of a contract ('0x' if none).
+        Deployed code is cached by address, served for "best" and for the blocks
+        at or after the lowest block number it was read at.
+        """
+        address = address.lower()
+        number = _revision_number(block)
+        cached = self.code_cache.get(address)
+        if cached is not None:
+            code, since = cached
+            if block == "best" or (number is not None and since is not None and number >= since):
+                return code
+        path = f"/accounts/{address}/code?revision={block}"
+        r = self._request("get_code", "GET", "/accounts/{address}/code", path)
+        if not (r.status_code == 200):
+            raise Exception(f"HTTP error: {r.status_code} {r.text}")
+        code = self.codec.loads(r.content)["code"]
+        if code != "0x":  # no code yet may become code later
+            since = cached[1] if cached is not None else None
+            if number is not None:
+                since = number if since is None else min(since, number)
+            self.code_cache.put(address, (code, since))
+        return code
+
+    def get_codes(self, addresses: List[str], block: str = "best", max_workers: int = None) -> Dict[str, str]:
+        """
+        Fetch the code of many contracts concurrently, duplicates are fetched once.
+
+        Returns
+        -------
+        Dict[str, str]
+            {lower case address: '0x...' code}
+        """
+        unique = list(dict.fromkeys(a.lower() for a in addresses))
+        codes = map_ordered(lambda a: self.get_code(a, block), unique, max_workers or self.concurrency())
+        return dict(zip(unique, codes))
+
+    def _pin(self, block: str) -> str:
+        """Block id of a revision ("best", number or id)"""
+        return block if is_block_id(block) else self.get_block(block)["id"]
+
+    def get_storage(self, address: str, key: Union[str, int], block: str = "best") -> str:
+        """
+        Read a storage slot of a contract.
+
+        Parameters
+        ----------
+        address : str
+            The contract
+        key : Union[str, int]
+            Slot, as an int or a hex string (up to 32 bytes)
+        block : str, optional
+            Block id or number, by default "best".
+            Values read at a block id are cached.
+
+        Returns
+        -------
+        str
+            '0x' + 32 bytes hex
+        """
+        address = address.lower()
+        key = _storage_key(key)
+        cache_key = (block, address, key) if is_block_id(block) else None
+        if cache_key:
+            value = self.storage_cache.get(cache_key)
+            if value is not None:
+                return value
+        path = f"/accounts/{address}/storage/{key}?revision={block}"
+        r = self._request("get_storage", "GET", "/accounts/{address}/storage/{key}", path)
+        if not (r.status_code == 200):
+            raise Exception(f"HTTP error: {r.status_code} {r.text}")
+        value = self.codec.loads(r.content)["value"]
+        if cache_key:
+            self.storage_cache.put(cache_key, value)
+        return value
+
+    def get_storages(self, address: str, keys: List[Union[str, int]], block: str = "best", max_workers: int = None) -> Dict[str, str]:
+        """
+        Read many storage slots of a contract concurrently, all at the same block.
+        The block is resolved to its id first, so results are consistent and cached.
+        Duplicate keys are read once.
+
+        Returns
+        -------
+        Dict[str, str]
+            {'0x' + 32 bytes hex key: '0x' + 32 bytes hex value}
+        """
+        block_id = self._pin(block)
+        unique = list(dict.fromkeys(_storage_key(k) for k in keys))
+        values = map_ordered(lambda k: self.get_storage(address, k, block_id), unique, max_workers or self.concurrency())
+        return dict(zip(unique, values))
+
+    def get_block(self, id_or_number: str = "best", expanded: bool = False, typed: bool = False) -> Union[dict, Block]:
         """
             Get a block by id or number, default get "best" block
             If expanded is True, will return a block with expanded details.
+            If typed is True, will return a results.Block (or None) instead of a dict.
         """
-        url = build_url(self.url, f"blocks/{id_or_number}")
+        path = f"blocks/{id_or_number}"
+        url = build_url(self.url, path)
         if expanded:
             params = {'expanded': 'true'}
         else:
             params = {'expanded': 'false'}
-        r = requests.get(
-            url, params=params, headers={"accept": "application/json"}, timeout=self.timeout
-        )
+        r = self._request("get_block", "GET", "/blocks/{revision}", path, params=params)
         if not (r.status_code == 200):
             raise Exception(f"Cant connect to {url}, error {r.text}")
-        return r.json()
+        result = self.codec.loads(r.content)
+        return Block.from_dict(result) if typed else result
+
+    def block_number_at(self, timestamp: Timestamp) -> int:
+        """
+        Number of the last block at or before a time (Unix seconds or datetime).
+        Usually zero or one request once a few lookups were made, see timeindex.TimeIndex
+        """
+        return self.time_index.block_number(timestamp)
+
+    def block_numbers_at(self, timestamps: List[Timestamp]) -> List[int]:
+        """block_number_at() of many timestamps, looked up concurrently"""
+        return self.time_index.block_numbers(timestamps)
+
+    def at(self, revision: str = "best", refresh: float = None, memo_size: int = 10000) -> Snapshot:
+        """
+        A view whose reads (accounts, storage, code, calls) all target one block,
+        resolved from revision ("best", "finalized", number or id) once.
+        With refresh (seconds), a moving revision is resolved again when due.
+        The last memo_size distinct reads are remembered. See snapshot.Snapshot.
+        """
+        return Snapshot(self, revision, refresh, memo_size=memo_size)
 
     def get_chainTag(self) -> int:
-        """Fetch ChainTag from the remote network"""
-        b = self.get_block(0)
-        return calc_chaintag(b["id"][-2:])
-
-    def get_tx(self, tx_id: str) -> Union[dict, None]:
-        """Fetch a transaction, if not found then None"""
-        url = build_url(self.url, f"/transactions/{tx_id}")
-        r = requests.get(
-            url, headers={"accept": "application/json"}, timeout=self.timeout
-        )
+        """Fetch ChainTag from the remote network, once: the genesis block never changes"""
+        if self._chain_tag is None:
+            b = self.get_block(0)
+            self._chain_tag = calc_chaintag(b["id"][-2:])
+        return self._chain_tag
+
+    def get_tx(self, tx_id: str, typed: bool = False) -> Union[dict, Tx, None]:
+        """Fetch a transaction, if not found then None. If typed is True, a results.Tx"""
+        path = f"/transactions/{tx_id}"
+        url = build_url(self.url, path)
+        r = self._request("get_tx", "GET", "/transactions/{id}", path)
         if not (r.status_code == 200):
             raise Exception(f"Cant connect to {url}, error {r.text}")
-        return r.json()
+        result = self.codec.loads(r.content)
+        return Tx.from_dict(result) if typed else result
 
     def post_tx(self, raw: str) -> dict:
         """
@@ -166,29 +554,20 @@ class Connect:
         Exception
             http exception
         """
-        url = build_url(self.url, "transactions")
-        r = requests.post(
-            url,
-            headers={"accept": "application/json",
-                     "Content-Type": "application/json"},
-            json={"raw": raw},
-            timeout=self.timeout
-        )
+        r = self._request("post_tx", "POST", "/transactions", "transactions", body={"raw": raw})
         if not (r.status_code == 200):
             raise Exception(f"Creation error? HTTP: {r.status_code} {r.text}")
 
-        return r.json()
+        return self.codec.loads(r.content)
 
-    def get_tx_receipt(self, tx_id: str) -> Union[dict, None]:
-        """Fetch tx receipt as a dict, or None"""
-        url = build_url(self.url, f"transactions/{tx_id}/receipt")
-        r = requests.get(
-            url, headers={"accept": "application/json"}, timeout=self.timeout
-        )
+    def get_tx_receipt(self, tx_id: str, typed: bool = False) -> Union[dict, Receipt, None]:
+        """Fetch tx receipt as a dict (or a results.Receipt if typed is True), or None"""
+        r = self._request("get_tx_receipt", "GET", "/transactions/{id}/receipt", f"transactions/{tx_id}/receipt")
         if not (r.status_code == 200):
             raise Exception(f"Creation error? HTTP: {r.status_code} {r.text}")
 
-        return r.json()
+        result = self.codec.loads(r.content)
+        return Receipt.from_dict(result) if typed else result
 
     def wait_for_tx_receipt(self, tx_id: str, timeout: int = 20) -> Union[dict, None]:
         """
@@ -219,7 +598,9 @@ class Connect:
 
     def ticker(self) -> dict:
         '''
-        Yields the block one by one
+        Yields the block one by one.
+        Blocks mined between two polls are skipped and reorgs are not reported,
+        see stream.BlockStream for that.
 
         Yields
         -------
@@ -236,6 +617,137 @@ class Connect:
             else:
                 time.sleep(sleep_second)
 
+    def stream_block(self, id_or_number: str = "best") -> Iterator[dict]:
+        """
+        Yield the transactions of an expanded block (each with its receipt fields) one by one,
+        parsed as the response arrives. Memory does not grow with the block size.
+        A missing block yields nothing.
+        """
+        path = f"blocks/{id_or_number}"
+        return self._stream("stream_block", "GET", "/blocks/{revision}", path, params={"expanded": "true"}, key="transactions")
+
+    def filter_events(
+        self,
+        from_block: int = 0,
+        to_block: int = None,
+        criteria_set: List[dict] = None,
+        offset: int = 0,
+        limit: int = 256,
+        order: str = "asc",
+    ) -> List[dict]:
+        """
+        Query event logs in a block range, one page at a time.
+
+        Parameters
+        ----------
+        from_block : int, optional
+            First block number, by default 0
+        to_block : int, optional
+            Last block number (included), by default the best block
+        criteria_set : List[dict], optional
+            eg. [{"address": "0x...", "topic0": "0x..."}], by default all events
+        offset : int, optional
+            Skip the first N matching events, by default 0
+        limit : int, optional
+            Max events returned, by default 256
+        order : str, optional
+            "asc" or "desc", by default "asc"
+
+        Returns
+        -------
+        List[dict]
+            Events: {"address", "topics", "data", "meta": {"blockID", "blockNumber", "txID", ...}}
+        """
+        return self._filter_logs("event", from_block, to_block, criteria_set, offset, limit, order)
+
+    def filter_transfers(
+        self,
+        from_block: int = 0,
+        to_block: int = None,
+        criteria_set: List[dict] = None,
+        offset: int = 0,
+        limit: int = 256,
+        order: str = "asc",
+    ) -> List[dict]:
+        """
+        Query VET transfer logs in a block range, one page at a time.
+
+        Parameters
+        ----------
+        criteria_set : List[dict], optional
+            eg. [{"sender": "0x..."}, {"recipient": "0x..."}], by default all transfers
+
+        Other parameters as filter_events()
+
+        Returns
+        -------
+        List[dict]
+            Transfers: {"sender", "recipient", "amount", "meta": {"blockID", "blockNumber", "txID", ...}}
+        """
+        return self._filter_logs("transfer", from_block, to_block, criteria_set, offset, limit, order)
+
+    def _filter_logs(self, kind: str, from_block: int, to_block: int, criteria_set: List[dict], offset: int, limit: int, order: str) -> List[dict]:
+        """One page of /logs/event or /logs/transfer ("event" or "transfer")"""
+        if to_block is None:
+            to_block = self.get_block("best")["number"]
+        body = {
+            "range": {"unit": "block", "from": from_block, "to": to_block},
+            "options": {"offset": offset, "limit": limit},
+            "criteriaSet": criteria_set or [],
+            "order": order,
+        }
+        path = f"/logs/{kind}"
+        r = self._request(f"filter_{kind}s", "POST", path, path[1:], body=body)
+        if not (r.status_code == 200):
+            raise Exception(f"HTTP error: {r.status_code} {r.text}")
+        return self.codec.loads(r.content)
+
+    def _iter_logs(self, kind: str, from_block: int, to_block: int, criteria_set: List[dict], page_size: int, order: str) -> Iterator[dict]:
+        if to_block is None:
+            to_block = self.get_block("best")["number"]  # once, so every page has the same range
+        offset = 0
+        while True:
+            page = self._filter_logs(kind, from_block, to_block, criteria_set, offset, page_size, order)
+            for log in page:
+                yield log
+            offset += len(page)
+            if len(page) < page_size:
+                return
+
+    def iter_events(
+        self,
+        from_block: int = 0,
+        to_block: int = None,
+        criteria_set: List[dict] = None,
+        page_size: int = 256,
+        order: str = "asc",
+    ) -> Iterator[dict]:
+        """
+        All the event logs of a block range, as filter_events(), fetched page after page.
+
+        Parameters
+        ----------
+        page_size : int, optional
+            Events per query, by default 256
+
+        Other parameters as filter_events()
+        """
+        return self._iter_logs("event", from_block, to_block, criteria_set, page_size, order)
+
+    def iter_transfers(
+        self,
+        from_block: int = 0,
+        to_block: int = None,
+        criteria_set: List[dict] = None,
+        page_size: int = 256,
+        order: str = "asc",
+    ) -> Iterator[dict]:
+        """
+        All the VET transfer logs of a block range, as filter_transfers(), fetched page after page.
+        See iter_events().
+        """
+        return self._iter_logs("transfer", from_block, to_block, criteria_set, page_size, order)
+
     def emulate(self, emulate_tx_body: dict, block: str = "best") -> List[dict]:
         """
         Helper function.
@@ -260,20 +772,30 @@ class Connect:
         Exception
             If http has error.
         """
-        url = build_url(self.url, f"/accounts/*?revision={block}")
-        r = requests.post(
-            url,
-            headers={"accept": "application/json",
-                     "Content-Type": "application/json"},
-            json=emulate_tx_body,
-            timeout=self.timeout,
-        )
-        if not (r.status_code == 200):
-            raise Exception(f"HTTP error: {r.status_code} {r.text}")
-
-        all_responses = r.json()  # A list of responses
+        # At a block id the result never changes: cache it.
+        key = content = None
+        if self.emulation_cache is not None and is_block_id(block):
+            key = EmulationCache.key(block, emulate_tx_body)
+            content = self.emulation_cache.get(key)
+        if content is None:
+            r = self._request("emulate", "POST", "/accounts/*", f"/accounts/*?revision={block}", body=emulate_tx_body)
+            if not (r.status_code == 200):
+                raise Exception(f"HTTP error: {r.status_code} {r.text}")
+            content = r.content
+            if key:
+                self.emulation_cache.put(key, content)
+
+        all_responses = self.codec.loads(content)  # A list of responses
         return list(map(inject_revert_reason, all_responses))
 
+    def stream_emulate(self, emulate_tx_body: dict, block: str = "best") -> Iterator[dict]:
+        """
+        Like emulate(), but yield the clause results one by one, parsed as the response arrives.
+        """
+        results = self._stream("emulate", "POST", "/accounts/*", f"/accounts/*?revision={block}", body=emulate_tx_body)
+        for result in results:
+            yield inject_revert_reason(result)
+
     def replay_tx(self, tx_id: str) -> List[dict]:
         """
         Use the emulate function to replay the tx softly (for debug)
@@ -289,6 +811,64 @@ class Connect:
         List[dict]
             See emulate()
 
+        Raises
+        ------
+        Exception
+            If tx id doesn't exist
+        """
+        with self.tracer.span("replay_tx", tx_id=tx_id) as span:
+            with self.tracer.span("get_tx"):
+                tx = self.get_tx(tx_id)
+            if not tx:
+                raise Exception(f"tx: {tx_id} not found")
+
+            target_block = tx["meta"]["blockID"]
+            span.set_attribute("revision", target_block)
+            span.set_attribute("clauses", len(tx["clauses"]))
+            with self.tracer.span("emulate"):
+                return self.emulate(_replay_body(tx), target_block)
+
+    def _replay_report(self, tx: dict, block_id: str, block_number: int, contracts: List[Contract]) -> dict:
+        responses = self.emulate(_replay_body(tx), block_id)
+        clauses = []
+        for index, (clause, response) in enumerate(zip(tx["clauses"], responses)):
+            clauses.append({
+                "index": index,
+                "to": clause["to"],
+                "gasUsed": response["gasUsed"],
+                "reverted": response["reverted"],
+                "vmError": response["vmError"],
+                "revertReason": (response.get("decoded") or {}).get("revertReason"),
+                "events": [_compact_event(e, contracts) for e in response["events"]],
+            })
+        return {
+            "txID": tx["id"],
+            "blockNumber": block_number,
+            "blockID": block_id,
+            "origin": tx["origin"],
+            # A reverted clause stops the tx: the clauses after it have no result.
+            "reverted": any(r["reverted"] for r in responses),
+            "gasUsed": sum(r["gasUsed"] for r in responses),
+            "clauses": clauses,
+        }
+
+    def replay_report(self, tx_id: str, contracts: List[Contract] = None) -> dict:
+        """
+        Replay a tx at its block, return a compact report.
+
+        Parameters
+        ----------
+        tx_id : str
+            Existing tx id
+        contracts : List[Contract], optional
+            ABIs to decode the events with ("name", "decoded"), by default None
+
+        Returns
+        -------
+        dict
+            {"txID", "blockNumber", "blockID", "origin", "reverted", "gasUsed",
+             "clauses": [{"index", "to", "gasUsed", "reverted", "vmError", "revertReason", "events"}]}
+
         Raises
         ------
         Exception
@@ -297,14 +877,51 @@ class Connect:
         tx = self.get_tx(tx_id)
         if not tx:
             raise Exception(f"tx: {tx_id} not found")
+        return self._replay_report(tx, tx["meta"]["blockID"], tx["meta"]["blockNumber"], contracts)
 
-        caller = tx["origin"]
-        target_block = tx["meta"]["blockID"]
-        emulate_body = calc_emulate_tx_body(caller, tx)
-        if tx["delegator"]:
-            emulate_body["gasPayer"] = tx["delegator"]
+    def replay_txs(self, tx_ids: Iterable[str], contracts: List[Contract] = None, max_workers: int = None) -> Iterator[dict]:
+        """
+        replay_report() of many txs, concurrently, yielded in input order.
+        tx_ids can be a generator: only a bounded window is in flight.
+        """
+        return map_ordered(lambda tx_id: self.replay_report(tx_id, contracts), tx_ids, max_workers or self.concurrency())
+
+    def replay_blocks(self, from_block: int, to_block: int, contracts: List[Contract] = None, max_workers: int = None) -> Iterator[dict]:
+        """
+        replay_report() of every tx of a block range (included), concurrently, yielded in chain order.
+        The txs are read from the expanded blocks, blocks are fetched as the replays go.
 
-        return self.emulate(emulate_body, target_block)
+        A failure does not stop the others, it is yielded in place:
+        {"blockNumber", "error"} for a block that cannot be read (or does not exist),
+        {"txID", "blockNumber", "error"} for a tx that cannot be replayed.
+        """
+        workers = max_workers or self.concurrency()
+
+        def _block(number: int) -> tuple:
+            try:
+                block = self.get_block(number, expanded=True)
+            except Exception as e:
+                return number, None, str(e)
+            return number, block, None if block else f"block {number} not found"
+
+        def _txs() -> Iterator:
+            for number, block, error in map_ordered(_block, range(from_block, to_block + 1), workers):
+                if error:
+                    yield {"blockNumber": number, "error": error}
+                    continue
+                for tx in block["transactions"]:
+                    yield tx, block["id"], block["number"]
+
+        def _replay(item) -> dict:
+            if isinstance(item, dict):
+                return item  # the error of a block
+            tx, block_id, block_number = item
+            try:
+                return self._replay_report(tx, block_id, block_number, contracts)
+            except Exception as e:
+                return {"txID": tx["id"], "blockNumber": block_number, "error": str(e)}
+
+        return map_ordered(_replay, _txs(), workers)
 
     def emulate_tx(self, address: str, tx_body: dict, block: str = "best", gas_payer: str = None):
         """
@@ -327,6 +944,77 @@ class Connect:
         emulate_body = calc_emulate_tx_body(address, tx_body, gas_payer)
         return self.emulate(emulate_body, block)
 
+    def emulate_many(
+        self,
+        emulate_tx_bodies: List[dict],
+        block: str = "best",
+        clauses: List[List[Clause]] = None,
+        max_workers: int = None
+    ) -> List[dict]:
+        """
+        Emulate many tx bodies concurrently, all against the same block.
+        The block is resolved to a block id once, so the results are consistent
+        even if the chain moves on during the emulations.
+
+        Parameters
+        ----------
+        emulate_tx_bodies : List[dict]
+            Emulate Tx bodies, see emulate()
+        block : str, optional
+            Target at which block, by default "best"
+        clauses : List[List[Clause]], optional
+            The clauses each body was built from, if supplied,
+            successful responses are beautified with decoded return and events.
+        max_workers : int, optional
+            Emulations in flight at the same time, by default see concurrency()
+
+        Returns
+        -------
+        List[dict]
+            In the same order as the input:
+            [{"responses": [...], "gasUsed": int, "reverted": bool, "revertReasons": [str]}, ...]
+        """
+        if clauses is not None and len(clauses) != len(emulate_tx_bodies):
+            raise Exception("clauses should match emulate_tx_bodies one by one")
+
+        block_id = self._pin(block)
+
+        def _emulate(index: int) -> dict:
+            e_responses = self.emulate(emulate_tx_bodies[index], block_id)
+            if clauses is not None:
+                e_responses = [
+                    response if is_emulate_failed(response) or not clause.get_contract()
+                    else _beautify(response, clause.get_contract(), clause.get_func_name())
+                    for response, clause in zip(e_responses, clauses[index])
+                ]
+            return _summarize(e_responses)
+
+        return list(map_ordered(_emulate, range(len(emulate_tx_bodies)), max_workers or self.concurrency()))
+
+    def _chain_refs(self, block: str = "best") -> tuple:
+        """
+        Fetch (chainTag, blockRef of the "best" block) to build a tx body.
+        At a block id, the blockRef is that block's: the emulation is the same each time.
+        """
+        with self.tracer.span("chainTag"):
+            chainTag = self.get_chainTag()
+        if is_block_id(block):
+            return chainTag, calc_blockRef(block)
+        with self.tracer.span("best_block"):
+            blockRef = calc_blockRef(self.get_block("best")["id"])
+        return chainTag, blockRef
+
+    def _sign_and_post(self, wallet: Wallet, gas_payer: Union[Wallet, None], tx_body: dict) -> dict:
+        """Sign the tx body (with fee delegation if gas_payer) and post it"""
+        with self.tracer.span("sign"):
+            if gas_payer is None:
+                encoded_raw = calc_tx_signed(wallet, tx_body, True)
+            else:
+                encoded_raw = calc_tx_signed_with_fee_delegation(
+                    wallet, gas_payer, tx_body, True)
+        with self.tracer.span("post"):
+            return self.post_tx(encoded_raw)
+
     def clause(
         self,
         contract: Contract,
@@ -385,30 +1073,34 @@ class Connect:
         Response type view README.md
         If function has any return value, it will be included in "decoded" field
         """
-        # Get the Clause object
-        clause = self.clause(contract, func_name, func_params, to, value)
-        # Build tx body
-        need_fee_delegation = gas_payer != None
-        tx_body = build_tx_body(
-            [clause.to_dict()],
-            self.get_chainTag(),
-            calc_blockRef(self.get_block("best")["id"]),
-            calc_nonce(),
-            gas=gas,
-            feeDelegation=need_fee_delegation
-        )
-
-        # Emulate the Tx
-        e_responses = self.emulate_tx(
-            caller, tx_body, block=block, gas_payer=gas_payer)
-        # Should only have one response, since we only have 1 clause
-        assert len(e_responses) == 1
-
-        # If emulation failed just return the failed response.
-        if any_emulate_failed(e_responses):
-            return e_responses[0]
-
-        return _beautify(e_responses[0], clause.get_contract(), clause.get_func_name())
+        with self.tracer.span("call", func_name=func_name, clauses=1, revision=block):
+            # Get the Clause object
+            clause = self.clause(contract, func_name, func_params, to, value)
+            # Build tx body
+            need_fee_delegation = gas_payer != None
+            chainTag, blockRef = self._chain_refs(block)
+            tx_body = build_tx_body(
+                [clause.to_dict()],
+                chainTag,
+                blockRef,
+                calc_nonce(),
+                gas=gas,
+                feeDelegation=need_fee_delegation
+            )
+
+            # Emulate the Tx
+            with self.tracer.span("emulate"):
+                e_responses = self.emulate_tx(
+                    caller, tx_body, block=block, gas_payer=gas_payer)
+            # Should only have one response, since we only have 1 clause
+            assert len(e_responses) == 1
+
+            # If emulation failed just return the failed response.
+            if any_emulate_failed(e_responses):
+                return e_responses[0]
+
+            with self.tracer.span("decode"):
+                return _beautify(e_responses[0], clause.get_contract(), clause.get_func_name())
 
     def call_multi(self, caller: str, clauses: List[Clause], gas: int = 0, gas_payer: str = None, block="best") -> List[dict]:
         """
@@ -420,34 +1112,60 @@ class Connect:
         Response type view README.md
         If the called functions has any return value, it will be included in "decoded" field
         """
-        need_fee_delegation = gas_payer != None
-        # Build tx body
+        with self.tracer.span("call_multi", clauses=len(clauses), revision=block):
+            need_fee_delegation = gas_payer != None
+            # Build tx body
+            chainTag, blockRef = self._chain_refs(block)
+            tx_body = build_tx_body(
+                [clause.to_dict() for clause in clauses],
+                chainTag,
+                blockRef,
+                calc_nonce(),
+                gas=gas,
+                feeDelegation=need_fee_delegation
+            )
+
+            # Emulate the Tx
+            with self.tracer.span("emulate"):
+                e_responses = self.emulate_tx(
+                    caller, tx_body, block=block, gas_payer=gas_payer)
+            # The node may stop at a reverted clause: no result for the clauses after it.
+            assert 0 < len(e_responses) <= len(clauses)
+
+            # Try to beautify the responses
+            _responses = []
+            with self.tracer.span("decode"):
+                for response, clause in zip(e_responses, clauses):
+                    # Failed response just ouput plain response
+                    if is_emulate_failed(response):
+                        _responses.append(response)
+                        continue
+                    # Success response inject beautified decoded data
+                    _responses.append(
+                        _beautify(response, clause.get_contract(), clause.get_func_name()))
+
+            return _responses
+
+    def stream_call_multi(self, caller: str, clauses: List[Clause], gas: int = 0, gas_payer: str = None, block="best") -> Iterator[dict]:
+        """
+        Like call_multi(), but yield the decoded result of each clause one by one,
+        parsed as the emulation response arrives.
+        """
+        chainTag, blockRef = self._chain_refs(block)
         tx_body = build_tx_body(
             [clause.to_dict() for clause in clauses],
-            self.get_chainTag(),
-            calc_blockRef(self.get_block("best")["id"]),
+            chainTag,
+            blockRef,
             calc_nonce(),
             gas=gas,
-            feeDelegation=need_fee_delegation
+            feeDelegation=gas_payer is not None
         )
-
-        # Emulate the Tx
-        e_responses = self.emulate_tx(
-            caller, tx_body, block=block, gas_payer=gas_payer)
-        assert len(e_responses) == len(clauses)
-
-        # Try to beautify the responses
-        _responses = []
-        for response, clause in zip(e_responses, clauses):
-            # Failed response just ouput plain response
+        emulate_body = calc_emulate_tx_body(caller, tx_body, gas_payer)
+        for response, clause in zip(self.stream_emulate(emulate_body, block), clauses):
             if is_emulate_failed(response):
-                _responses.append(response)
-                continue
-            # Success response inject beautified decoded data
-            _responses.append(
-                _beautify(response, clause.get_contract(), clause.get_func_name()))
-
-        return _responses
+                yield response
+            else:
+                yield _beautify(response, clause.get_contract(), clause.get_func_name())
 
     def transact(
         self,
@@ -499,49 +1217,48 @@ class Connect:
         -------
             Return value see post_tx()
         """
-        clause = self.clause(contract, func_name, func_params, to, value)
-        need_fee_delegation = gas_payer != None
-        tx_body = build_tx_body(
-            [clause.to_dict()],
-            self.get_chainTag(),
-            calc_blockRef(self.get_block("best")["id"]),
-            calc_nonce(),
-            gasPriceCoef=gasPriceCoef,
-            dependsOn=dependsOn,
-            expiration=expiration,
-            gas=gas,
-            feeDelegation=need_fee_delegation
-        )
-
-        # Emulate the tx first.
-        if not need_fee_delegation:
-            e_responses = self.emulate_tx(wallet.getAddress(), tx_body)
-        else:
-            e_responses = self.emulate_tx(
-                wallet.getAddress(), tx_body, gas_payer=gas_payer.getAddress())
-
-        if any_emulate_failed(e_responses) and force == False:
-            raise Exception(f"Tx will revert: {e_responses}")
-
-        # Get gas estimation from remote node
-        # Calculate a safe gas for user
-        vm_gas = sum(read_vm_gases(e_responses))
-        safe_gas = suggest_gas_for_tx(vm_gas, tx_body)
-        if gas and gas < safe_gas:
-            if force == False:
-                raise Exception(f"gas {gas} < emulated gas {safe_gas}")
-
-        # Fill out the gas for user
-        if not gas:
-            tx_body["gas"] = safe_gas
-
-        # Post it to the remote node
-        if not need_fee_delegation:
-            encoded_raw = calc_tx_signed(wallet, tx_body, True)
-        else:
-            encoded_raw = calc_tx_signed_with_fee_delegation(
-                wallet, gas_payer, tx_body, True)
-        return self.post_tx(encoded_raw)
+        with self.tracer.span("transact", func_name=func_name, clauses=1) as span:
+            clause = self.clause(contract, func_name, func_params, to, value)
+            need_fee_delegation = gas_payer != None
+            chainTag, blockRef = self._chain_refs()
+            tx_body = build_tx_body(
+                [clause.to_dict()],
+                chainTag,
+                blockRef,
+                calc_nonce(),
+                gasPriceCoef=gasPriceCoef,
+                dependsOn=dependsOn,
+                expiration=expiration,
+                gas=gas,
+                feeDelegation=need_fee_delegation
+            )
+
+            # Emulate the tx first.
+            with self.tracer.span("emulate"):
+                if not need_fee_delegation:
+                    e_responses = self.emulate_tx(wallet.getAddress(), tx_body)
+                else:
+                    e_responses = self.emulate_tx(
+                        wallet.getAddress(), tx_body, gas_payer=gas_payer.getAddress())
+
+            if any_emulate_failed(e_responses) and force == False:
+                raise Exception(f"Tx will revert: {e_responses}")
+
+            # Get gas estimation from remote node
+            # Calculate a safe gas for user
+            vm_gas = sum(read_vm_gases(e_responses))
+            safe_gas = suggest_gas_for_tx(vm_gas, tx_body)
+            if gas and gas < safe_gas:
+                if force == False:
+                    raise Exception(f"gas {gas} < emulated gas {safe_gas}")
+
+            # Fill out the gas for user
+            if not gas:
+                tx_body["gas"] = safe_gas
+            span.set_attribute("gas", int(tx_body["gas"]))
+
+            # Post it to the remote node
+            return self._sign_and_post(wallet, gas_payer, tx_body)
 
     def transact_multi(
         self,
@@ -554,48 +1271,47 @@ class Connect:
         force: bool = False,
         gas_payer: Wallet = None
     ):
-        # Emulate the whole tx first.
-        if gas_payer:
-            e_responses = self.call_multi(
-                wallet.getAddress(), clauses, gas, gas_payer=gas_payer.getAddress())
-        else:
-            e_responses = self.call_multi(wallet.getAddress(), clauses, gas)
-        if any_emulate_failed(e_responses) and force == False:
-            raise Exception(f"Tx will revert: {e_responses}")
-
-        need_fee_delegation = gas_payer != None
-        # Build the body
-        tx_body = build_tx_body(
-            [clause.to_dict() for clause in clauses],
-            self.get_chainTag(),
-            calc_blockRef(self.get_block("best")["id"]),
-            calc_nonce(),
-            expiration=expiration,
-            gasPriceCoef=gasPriceCoef,
-            dependsOn=dependsOn,
-            gas=gas,
-            feeDelegation=need_fee_delegation
-        )
-
-        # Get gas estimation from remote node
-        # Calculate a safe gas for user
-        vm_gas = sum(read_vm_gases(e_responses))
-        safe_gas = suggest_gas_for_tx(vm_gas, tx_body)
-        if gas and gas < safe_gas:
-            if force == False:
-                raise Exception(f"gas {gas} < emulated gas {safe_gas}")
-
-        # Fill out the gas for user
-        if not gas:
-            tx_body["gas"] = safe_gas
-
-        # Post it to the remote node
-        if not need_fee_delegation:
-            encoded_raw = calc_tx_signed(wallet, tx_body, True)
-        else:
-            encoded_raw = calc_tx_signed_with_fee_delegation(
-                wallet, gas_payer, tx_body, True)
-        return self.post_tx(encoded_raw)
+        with self.tracer.span("transact_multi", clauses=len(clauses)) as span:
+            # Emulate the whole tx first.
+            with self.tracer.span("emulate"):
+                if gas_payer:
+                    e_responses = self.call_multi(
+                        wallet.getAddress(), clauses, gas, gas_payer=gas_payer.getAddress())
+                else:
+                    e_responses = self.call_multi(wallet.getAddress(), clauses, gas)
+            if any_emulate_failed(e_responses) and force == False:
+                raise Exception(f"Tx will revert: {e_responses}")
+
+            need_fee_delegation = gas_payer != None
+            # Build the body
+            chainTag, blockRef = self._chain_refs()
+            tx_body = build_tx_body(
+                [clause.to_dict() for clause in clauses],
+                chainTag,
+                blockRef,
+                calc_nonce(),
+                expiration=expiration,
+                gasPriceCoef=gasPriceCoef,
+                dependsOn=dependsOn,
+                gas=gas,
+                feeDelegation=need_fee_delegation
+            )
+
+            # Get gas estimation from remote node
+            # Calculate a safe gas for user
+            vm_gas = sum(read_vm_gases(e_responses))
+            safe_gas = suggest_gas_for_tx(vm_gas, tx_body)
+            if gas and gas < safe_gas:
+                if force == False:
+                    raise Exception(f"gas {gas} < emulated gas {safe_gas}")
+
+            # Fill out the gas for user
+            if not gas:
+                tx_body["gas"] = safe_gas
+            span.set_attribute("gas", int(tx_body["gas"]))
+
+            # Post it to the remote node
+            return self._sign_and_post(wallet, gas_payer, tx_body)
 
     def deploy(
         self,
@@ -626,37 +1342,40 @@ class Connect:
         -------
             Return value see post_tx()
         """
-        # Build the constructor call data.
-        if not params_types:
-            data_bytes = contract.get_bytecode()
-        else:
-            data_bytes = contract.get_bytecode() + build_params(params_types, params)
-        data = "0x" + data_bytes.hex()
-
-        # Build the tx body.
-        clause = {"to": None, "value": str(value), "data": data}
-        tx_body = build_tx_body(
-            [clause],
-            self.get_chainTag(),
-            calc_blockRef(self.get_block("best")["id"]),
-            calc_nonce(),
-            gas=0,  # We will estimate the gas later
-        )
-
-        # We emulate it first.
-        e_responses = self.emulate_tx(wallet.getAddress(), tx_body)
-        if any_emulate_failed(e_responses):
-            raise Exception(f"Tx will revert: {e_responses}")
-
-        # Get gas estimation from remote
-        vm_gas = sum(read_vm_gases(e_responses))
-        safe_gas = suggest_gas_for_tx(vm_gas, tx_body)
-
-        # Fill out the gas for user.
-        tx_body["gas"] = safe_gas
+        with self.tracer.span("deploy", clauses=1) as span:
+            # Build the constructor call data.
+            if not params_types:
+                data_bytes = contract.get_bytecode()
+            else:
+                data_bytes = contract.get_bytecode() + build_params(params_types, params)
+            data = "0x" + data_bytes.hex()
+
+            # Build the tx body.
+            clause = {"to": None, "value": str(value), "data": data}
+            chainTag, blockRef = self._chain_refs()
+            tx_body = build_tx_body(
+                [clause],
+                chainTag,
+                blockRef,
+                calc_nonce(),
+                gas=0,  # We will estimate the gas later
+            )
+
+            # We emulate it first.
+            with self.tracer.span("emulate"):
+                e_responses = self.emulate_tx(wallet.getAddress(), tx_body)
+            if any_emulate_failed(e_responses):
+                raise Exception(f"Tx will revert: {e_responses}")
+
+            # Get gas estimation from remote
+            vm_gas = sum(read_vm_gases(e_responses))
+            safe_gas = suggest_gas_for_tx(vm_gas, tx_body)
+
+            # Fill out the gas for user.
+            tx_body["gas"] = safe_gas
+            span.set_attribute("gas", safe_gas)
 
-        encoded_raw = calc_tx_signed(wallet, tx_body, True)
-        return self.post_tx(encoded_raw)
+            return self._sign_and_post(wallet, None, tx_body)
 
     def transfer_vet(self, wallet: Wallet, to: str, value: int = 0, gas_payer: Wallet = None) -> dict:
         """
@@ -694,7 +1413,7 @@ class Connect:
         dict
             See post_tx()
         '''
-        _contract = Contract({"abi": json.loads(VTHO_ABI)})
+        _contract = _vip180_contract()
         return self.transact(wallet, _contract, 'transfer', [to, vtho_in_wei], VTHO_ADDRESS, gas_payer=gas_payer)
     
     def transfer_token(self, wallet: Wallet, to: str, token_contract_addr: str, amount_in_wei: int = 0, gas_payer: Wallet = None) -> dict:
@@ -717,5 +1436,5 @@ class Connect:
         dict
             See post_tx()
         '''
-        _contract = Contract({"abi": json.loads(VTHO_ABI)})
+        _contract = _vip180_contract()
         return self.transact(wallet, _contract, 'transfer', [to, amount_in_wei], token_contract_addr, gas_payer=gas_payer)
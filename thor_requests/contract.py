@@ -1,9 +1,11 @@
 """ Contract is a representation of an underlying Solidity compiled JSON """
 from typing import Union, List
 from .file_utils import read_json_file
-from thor_devkit import abi
+from .lazy import lazy_import
 import json
 
+abi = lazy_import("thor_devkit.abi")
+
 
 class Contract:
     def __init__(self, meta_dict: dict):
@@ -55,7 +57,7 @@ class Contract:
 
     def get_function_by_name(
         self, func_name: str, strict_mode=False
-    ) -> Union[abi.Function, None]:
+    ) -> Union["abi.Function", None]:
         """
         Get a function instance by its name, or None if not found
 
@@ -71,13 +73,13 @@ class Contract:
         f = abi.Function(abi_dict)
         return f
 
-    def get_events(self) -> List[abi.Event]:
+    def get_events(self) -> List["abi.Event"]:
         """Get events from the abi sections"""
         return [
             abi.Event(each) for each in self.get_abis() if each.get("type") == "event"
         ]
 
-    def get_event_by_signature(self, signature: bytes) -> Union[abi.Event, None]:
+    def get_event_by_signature(self, signature: bytes) -> Union["abi.Event", None]:
         """
         Get target event from contract meta by signatuer string.
 
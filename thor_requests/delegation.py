@@ -0,0 +1,302 @@
+'''
+    VIP-201 fee delegation service.
+
+    A sponsor runs this service, users ask it to pay for their txs.
+
+    Request:  POST / {"raw": "0x...", "origin": "0x..."}
+    Response: 200 {"signature": "0x..."}
+              403 {"error": "..."}  judgment function refused to sign
+              400 {"error": "..."}  malformed request
+              413 {"error": "..."}  body over MAX_BODY_SIZE
+              429 {"error": "..."}  origin is over its rate limit
+
+    GET /metrics shows the counters and latencies of the service.
+'''
+
+import asyncio
+import json
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, List, Tuple
+
+from thor_devkit import transaction
+from thor_devkit.cry import address
+
+from .cache import LRUCache
+from .metrics import Counter, Histogram
+from .ratelimit import KeyedRateLimiter
+from .wallet import Wallet
+
+MAX_BODY_SIZE = 64 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 403: "Forbidden", 404: "Not Found", 413: "Payload Too Large", 429: "Too Many Requests"}
+
+
+class BodyTooLarge(Exception):
+    '''The Content-Length of a request is over MAX_BODY_SIZE'''
+
+
+def _decode_raw(raw: str, origin: str) -> Tuple[bytes, transaction.Transaction]:
+    '''
+    Decode the raw tx, return (payer signing hash, tx).
+    Module level function, so it can run on a process pool.
+    '''
+    if not address.is_address(origin):
+        raise ValueError(f"origin: {origin} not valid address")
+    if not raw.startswith("0x"):
+        raise ValueError("raw should start with 0x")
+    encoded = bytes.fromhex(raw[2:])
+    try:
+        tx = transaction.Transaction.decode(raw=encoded, unsigned=True)
+    except Exception:
+        # Origin may have signed already.
+        tx = transaction.Transaction.decode(raw=encoded, unsigned=False)
+    if not tx.is_delegated():
+        raise ValueError("raw: is not delegated tx")
+    return tx.get_signing_hash(delegate_for=origin), tx
+
+
+def _judge_and_sign(payer: Wallet, origin: str, tx: transaction.Transaction, payer_hash: bytes, judgment_fn: Callable) -> Tuple[int, dict]:
+    '''Run the judgment function, sign if it agrees. Module level for process pools.'''
+    should_sign, error_message = judgment_fn(payer.getAddress(), origin, tx)
+    if should_sign == True:
+        return 200, {"signature": "0x" + payer.sign(payer_hash).hex()}
+    return 403, {"error": error_message}
+
+
+def _http_response(status: int, payload: dict, keep_alive: bool) -> bytes:
+    body = json.dumps(payload).encode()
+    head = (
+        f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    )
+    return head.encode("latin-1") + body
+
+
+async def _read_http_message(reader: asyncio.StreamReader) -> Tuple[str, dict, bytes]:
+    '''
+    Read one HTTP/1.1 message, return (start line, headers, body). Empty start line on EOF.
+
+    Raises
+    ------
+    BodyTooLarge
+        If the body is over MAX_BODY_SIZE
+    ValueError
+        If the Content-Length is not a number
+    '''
+    start_line = (await reader.readline()).decode("latin-1").strip()
+    if not start_line:
+        return "", {}, b""
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        key, _, value = line.decode("latin-1").partition(":")
+        headers[key.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length < 0:
+        raise ValueError(f"content-length: {length} is negative")
+    if length > MAX_BODY_SIZE:
+        raise BodyTooLarge(f"body of {length} bytes, max {MAX_BODY_SIZE}")
+    body = await reader.readexactly(length) if length else b""
+    return start_line, headers, body
+
+
+class DelegationService:
+    def __init__(
+        self,
+        payer: Wallet,
+        judgment_fn: Callable,
+        executor: Executor = None,
+        cache_size: int = 10000,
+        rate: float = 10,
+        burst: float = None,
+        path: str = "/",
+    ):
+        '''
+        Create a fee delegation (VIP-201) service.
+
+        Parameters
+        ----------
+        payer : Wallet
+            The sponsor wallet, pays for the gas
+        judgment_fn : Callable
+            Same as utils.sign_delegated_tx(),
+            accepts (tx_payer:str, tx_origin:str, transaction:Transaction),
+            returns (success:bool, error_message:str).
+            Shall be a module level function if executor is a process pool.
+        executor : Executor, optional
+            Where decoding, judgment and signing run, by default a pool of 4 threads
+        cache_size : int, optional
+            Judgments remembered by tx signing hash, by default 10000
+        rate : float, optional
+            Requests per second allowed per origin, by default 10
+        burst : float, optional
+            Burst allowed per origin, by default equals to rate
+        path : str, optional
+            URL path to serve, by default "/"
+        '''
+        self.payer = payer
+        self.judgment_fn = judgment_fn
+        self.executor = executor or ThreadPoolExecutor(max_workers=4)
+        self.cache = LRUCache(cache_size)
+        self.limiter = KeyedRateLimiter(rate, burst)
+        self.path = path
+        self.latency = Histogram()
+        self.counters = {
+            name: Counter()
+            for name in ("requests", "signed", "refused", "bad_request", "rate_limited", "cache_hits")
+        }
+
+    async def handle(self, body: bytes) -> Tuple[int, dict]:
+        '''
+        Handle a single delegation request body.
+
+        Returns
+        -------
+        Tuple[int, dict]
+            (http status, response payload)
+        '''
+        started = time.perf_counter()
+        self.counters["requests"].inc()
+        try:
+            status, payload = await self._handle(body)
+        finally:
+            self.latency.observe(time.perf_counter() - started)
+        return status, payload
+
+    async def _handle(self, body: bytes) -> Tuple[int, dict]:
+        try:
+            request = json.loads(body)
+            raw, origin = request["raw"], request["origin"].lower()
+        except Exception:
+            self.counters["bad_request"].inc()
+            return 400, {"error": "body should be {\"raw\": \"0x...\", \"origin\": \"0x...\"}"}
+
+        if not self.limiter.try_acquire(origin):
+            self.counters["rate_limited"].inc()
+            return 429, {"error": f"too many requests from {origin}"}
+
+        loop = asyncio.get_event_loop()  # inside a coroutine: the running loop (get_running_loop() is 3.7+)
+        try:
+            payer_hash, tx = await loop.run_in_executor(self.executor, _decode_raw, raw, origin)
+        except Exception as e:
+            self.counters["bad_request"].inc()
+            return 400, {"error": str(e)}
+
+        cached = self.cache.get(payer_hash)
+        if cached:
+            self.counters["cache_hits"].inc()
+            status, payload = cached
+        else:
+            status, payload = await loop.run_in_executor(
+                self.executor, _judge_and_sign, self.payer, origin, tx, payer_hash, self.judgment_fn)
+            self.cache.put(payer_hash, (status, payload))
+
+        self.counters["signed" if status == 200 else "refused"].inc()
+        return status, payload
+
+    async def _on_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                start_line, headers, body = await _read_http_message(reader)
+                if not start_line:
+                    break
+                parts = start_line.split(" ")
+                if len(parts) != 3:
+                    raise ValueError(f"malformed request line: {start_line}")
+                method, path = parts[0:2]
+                if method == "POST" and path == self.path:
+                    status, payload = await self.handle(body)
+                elif method == "GET" and path == "/metrics":
+                    status, payload = 200, self.stats()
+                else:
+                    status, payload = 404, {"error": f"{method} {path} not found"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(_http_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except BodyTooLarge as e:
+            writer.write(_http_response(413, {"error": str(e)}, False))
+        except ValueError as e:
+            writer.write(_http_response(400, {"error": str(e)}, False))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8080):
+        '''Start serving in the running event loop, return the asyncio server'''
+        return await asyncio.start_server(self._on_connection, host, port)
+
+    def run(self, host: str = "127.0.0.1", port: int = 8080):
+        '''Serve forever (blocking)'''
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.run_until_complete(self.start(host, port))
+        loop.run_forever()
+
+    def stats(self) -> dict:
+        '''Counters and latency (seconds) of the service'''
+        result = {name: c.get() for name, c in self.counters.items()}
+        result["latency"] = self.latency.snapshot()
+        return result
+
+
+async def load_test(host: str, port: int, bodies: List[dict], concurrency: int = 32, path: str = "/") -> dict:
+    '''
+    Fire the request bodies at a running delegation service, over keep-alive connections.
+
+    Parameters
+    ----------
+    host : str
+        Host of the service
+    port : int
+        Port of the service
+    bodies : List[dict]
+        Request bodies: [{"raw": "0x...", "origin": "0x..."}, ...]
+    concurrency : int, optional
+        Connections in use at the same time, by default 32
+
+    Returns
+    -------
+    dict
+        {"requests":, "seconds":, "rps":, "status": {200: n, ...}, "latency": {"p50":, "p99":, ...}}
+    '''
+    todo = iter(bodies)
+    latency = Histogram()
+    status_counts = {}
+
+    async def _worker():
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for body in todo:
+                payload = json.dumps(body).encode()
+                started = time.perf_counter()
+                writer.write(
+                    f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                start_line, _, _ = await _read_http_message(reader)
+                latency.observe(time.perf_counter() - started)
+                status = int(start_line.split(" ")[1])
+                status_counts[status] = status_counts.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[_worker() for _ in range(concurrency)])
+    seconds = time.perf_counter() - started
+    return {
+        "requests": latency.count,
+        "seconds": seconds,
+        "rps": latency.count / seconds if seconds else 0.0,
+        "status": status_counts,
+        "latency": latency.snapshot(),
+    }
@@ -0,0 +1,163 @@
+'''
+    HD wallet: many keys and addresses from one mnemonic.
+
+    VeChain BIP-44 path: m/44'/818'/0'/0/<address_index>
+
+    The extended key at m/44'/818'/0'/0 is derived once and kept,
+    so each address afterwards is a single child derivation.
+'''
+
+import bisect
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Union
+
+from thor_devkit.cry import HDNode, mnemonic
+
+from .cache import LRUCache
+from .wallet import Wallet
+
+ADDRESS_SIZE = 20
+
+
+def _derive_chunk(public_key: bytes, chain_code: bytes, start: int, count: int) -> bytes:
+    '''
+    Derive addresses [start, start + count) from an extended public key.
+    Module level function, so it can run on a process pool.
+    No private key leaves the parent process.
+    '''
+    node = HDNode.from_public_key(public_key, chain_code)
+    return b"".join(node.derive(i).address() for i in range(start, start + count))
+
+
+class AddressIndex:
+    def __init__(self, start: int = 0, data: bytes = b""):
+        '''
+        Compact index of derived addresses: 20 bytes per address in one buffer.
+        Reverse lookup (address -> index) is built on first use.
+
+        Parameters
+        ----------
+        start : int, optional
+            Address index of the first address, by default 0
+        data : bytes, optional
+            Concatenated 20-byte addresses, by default b""
+        '''
+        if len(data) % ADDRESS_SIZE:
+            raise Exception(f"data should be multiple of {ADDRESS_SIZE} bytes")
+        self.start = start
+        self.data = bytearray(data)
+        self._prefixes = None  # sorted 8-byte prefixes
+        self._positions = None  # position of each sorted prefix
+
+    def __len__(self) -> int:
+        return len(self.data) // ADDRESS_SIZE
+
+    def __contains__(self, address: str) -> bool:
+        return self.index_of(address) is not None
+
+    def address(self, index: int) -> str:
+        '''Get the '0x...' address at the given address index'''
+        position = index - self.start
+        if not 0 <= position < len(self):
+            raise IndexError(f"index {index} not in the index")
+        return "0x" + self.data[position * ADDRESS_SIZE:(position + 1) * ADDRESS_SIZE].hex()
+
+    def addresses(self) -> List[str]:
+        return [self.address(self.start + i) for i in range(len(self))]
+
+    def extend(self, data: bytes):
+        '''Append more addresses (following the last one)'''
+        self.data.extend(data)
+        self._prefixes = self._positions = None
+
+    def index_of(self, address: str) -> Union[int, None]:
+        '''Get the address index of a '0x...' address, or None if not in the index'''
+        target = bytes.fromhex(address[2:] if address.startswith("0x") else address)
+        if self._prefixes is None:
+            self._build()
+        prefix = int.from_bytes(target[:8], "big")
+        i = bisect.bisect_left(self._prefixes, prefix)
+        while i < len(self._prefixes) and self._prefixes[i] == prefix:
+            position = self._positions[i]
+            if self.data[position * ADDRESS_SIZE:(position + 1) * ADDRESS_SIZE] == target:
+                return self.start + position
+            i += 1
+        return None
+
+    def _build(self):
+        prefixes = [
+            int.from_bytes(self.data[i * ADDRESS_SIZE:i * ADDRESS_SIZE + 8], "big")
+            for i in range(len(self))
+        ]
+        order = sorted(range(len(prefixes)), key=prefixes.__getitem__)
+        self._prefixes = array("Q", (prefixes[i] for i in order))
+        self._positions = array("L", order)
+
+
+class HDWallet:
+    def __init__(self, node: HDNode, cache_size: int = 1024):
+        '''
+        HD wallet on top of the node at m/44'/818'/0'/0.
+        Use HDWallet.fromMnemonic() to create one.
+        '''
+        self.node = node
+        self.cache = LRUCache(cache_size)  # index -> child HDNode
+
+    @classmethod
+    def fromMnemonic(cls, words: list):
+        """Get a HD wallet from words"""
+        if not mnemonic.validate(words):
+            raise Exception("Words validation failed, check spelling?")
+        return cls(HDNode.from_mnemonic(words))
+
+    def _child(self, index: int) -> HDNode:
+        child = self.cache.get(index)
+        if child is None:
+            child = self.node.derive(index)
+            self.cache.put(index, child)
+        return child
+
+    def derive_wallet(self, index: int) -> Wallet:
+        '''Get the wallet (with private key) at m/44'/818'/0'/0/<index>'''
+        return Wallet(self._child(index).private_key())
+
+    def derive_address(self, index: int) -> str:
+        '''Get the '0x...' address at m/44'/818'/0'/0/<index>'''
+        return "0x" + self._child(index).address().hex()
+
+    def derive_addresses(self, start: int, count: int, processes: int = None, chunk_size: int = 1000) -> AddressIndex:
+        '''
+        Bulk derive addresses [start, start + count) into a compact index.
+
+        Parameters
+        ----------
+        start : int
+            First address index
+        count : int
+            How many addresses
+        processes : int, optional
+            Process pool size, by default the number of CPUs. 1 to derive in this process.
+        chunk_size : int, optional
+            Addresses derived per task, by default 1000
+
+        Returns
+        -------
+        AddressIndex
+            The addresses, supports reverse lookup
+        '''
+        public_key = self.node.public_key()
+        chain_code = self.node.chain_code()
+        chunks = [(s, min(chunk_size, start + count - s)) for s in range(start, start + count, chunk_size)]
+
+        result = AddressIndex(start)
+        if processes == 1 or len(chunks) <= 1:
+            for s, n in chunks:
+                result.extend(_derive_chunk(public_key, chain_code, s, n))
+            return result
+
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [executor.submit(_derive_chunk, public_key, chain_code, s, n) for s, n in chunks]
+            for f in futures:
+                result.extend(f.result())
+        return result
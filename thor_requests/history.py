@@ -0,0 +1,122 @@
+'''
+    VET balance history of an address, without a query per block.
+
+    The balance is read at the two ends of the block range;
+    where they differ, at the middle, and so on (bisection),
+    until each change is pinned to the block that made it.
+    Parts of the range with the same balance at both ends are not looked into,
+    so the cost grows with the number of changes, not with the number of blocks:
+    about 2 * log2(blocks) requests per change.
+
+    A balance that changes and comes back within a range is missed by bisection alone.
+    With hints=True the transfer logs of the address are fetched first,
+    and each block with a transfer becomes a bisection point, so nothing is missed.
+
+    history = BalanceHistory(connector)
+    history.change_points("0x...", 0, 1000000)  # [(block number, balance in Wei), ...]
+'''
+
+import threading
+from typing import Dict, List, Set, Tuple
+
+from .cache import LRUCache
+from .concurrency import map_ordered
+
+
+class BalanceHistory:
+    def __init__(self, connector, cache_size: int = 100000, max_workers: int = None):
+        '''
+        Find the blocks where the VET balance of an address changed.
+
+        Parameters
+        ----------
+        connector : Connect
+            The node to query
+        cache_size : int, optional
+            Balances kept, by (address, block number), by default 100000
+        max_workers : int, optional
+            Balances read at the same time, by default connector.concurrency()
+        '''
+        self.connector = connector
+        self.cache = LRUCache(cache_size)
+        self.max_workers = max_workers
+        self.requests = 0  # balances read from the node (cache misses)
+        self._lock = threading.Lock()  # balance() runs on worker threads
+
+    def balance(self, address: str, number: int) -> int:
+        '''VET balance (Wei) of address at the end of block "number"'''
+        address = address.lower()
+        value = self.cache.get((address, number))
+        if value is None:
+            with self._lock:
+                self.requests += 1
+            value = int(self.connector.get_account(address, number)["balance"], 16)
+            self.cache.put((address, number), value)
+        return value
+
+    def _fill(self, address: str, numbers: List[int], known: Dict[int, int]):
+        '''Read the balance at each block number concurrently, into known'''
+        numbers = [n for n in numbers if n not in known]
+        workers = self.max_workers or self.connector.concurrency()
+        for number, value in zip(numbers, map_ordered(lambda n: self.balance(address, n), numbers, workers)):
+            known[number] = value
+
+    def transfer_blocks(self, address: str, from_block: int, to_block: int, page_size: int = 256) -> Set[int]:
+        '''Numbers of the blocks with a VET transfer from or to address'''
+        criteria_set = [{"sender": address}, {"recipient": address}]
+        transfers = self.connector.iter_transfers(from_block, to_block, criteria_set, page_size)
+        return {t["meta"]["blockNumber"] for t in transfers}
+
+    def change_points(self, address: str, from_block: int = 0, to_block: int = None, hints: bool = False) -> List[Tuple[int, int]]:
+        '''
+        Blocks where the VET balance of address changed, in a block range.
+
+        Parameters
+        ----------
+        address : str
+            The account
+        from_block : int, optional
+            First block number, by default 0
+        to_block : int, optional
+            Last block number (included), by default the best block
+        hints : bool, optional
+            Also split the range at the blocks with a transfer of the address, by default False.
+            Costs the transfer log queries, finds changes that are undone later in the range.
+
+        Returns
+        -------
+        List[Tuple[int, int]]
+            [(from_block, balance)] then (block number, new balance) for each change, in block order
+        '''
+        if to_block is None:
+            to_block = self.connector.get_block("best")["number"]
+        if to_block < from_block:
+            raise Exception(f"to_block {to_block} is before from_block {from_block}")
+
+        points = {from_block, to_block}
+        if hints:
+            for number in self.transfer_blocks(address, from_block, to_block):
+                points.update(n for n in (number - 1, number) if from_block <= n <= to_block)
+
+        known: Dict[int, int] = {}
+        self._fill(address, sorted(points), known)
+        ordered = sorted(known)
+        gaps = [(a, b) for a, b in zip(ordered, ordered[1:]) if b - a > 1 and known[a] != known[b]]
+
+        # Bisect all the gaps with a change at once, one level at a time.
+        while gaps:
+            middles = [(a + b) // 2 for a, b in gaps]
+            self._fill(address, middles, known)
+            gaps = [
+                (x, y)
+                for (a, b), m in zip(gaps, middles)
+                for x, y in ((a, m), (m, b))
+                if y - x > 1 and known[x] != known[y]
+            ]
+
+        ordered = sorted(known)
+        history = [(from_block, known[from_block])]
+        for a, b in zip(ordered, ordered[1:]):
+            if known[a] != known[b]:
+                history.append((b, known[b]))
+        return history
@@ -0,0 +1,184 @@
+'''
+    Incremental parse of a JSON array inside a response that arrives in chunks.
+
+    Only the bytes of the element being parsed (plus one chunk) are held,
+    so memory does not grow with the size of the array.
+    Each element is decoded on its own, as soon as its last byte arrives.
+    Each chunk is scanned once for the end of the element, so an element
+    spread over many chunks is decoded once, when it is complete.
+
+    iter_array(chunks)                      # the response itself is an array
+    iter_array(chunks, key="transactions")  # an array member of the top-level object
+'''
+
+import codecs
+import json
+import re
+from typing import Iterable, Iterator
+
+# Before the array: a whole string, or a structural char.
+# A lone quote is a string cut by the chunk end.
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|["\[\]{},:]')
+_SKIP = re.compile(r"[\s,]*")
+# Inside an element: what changes the nesting, what ends a string.
+_NESTING = re.compile(r'["\[\]{}]')
+_IN_STRING = re.compile(r'["\\]')
+
+_decoder = json.JSONDecoder()
+
+
+class _Scanner:
+    '''Finds the end of an object, array or string element, fed in pieces'''
+
+    __slots__ = ("depth", "in_string", "escaped")
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False  # the last piece ended with a backslash
+
+    def scan(self, text: str, i: int = 0) -> int:
+        '''Index in text after the element, -1 if it goes on in the next piece'''
+        n = len(text)
+        if self.escaped:
+            self.escaped = False
+            i += 1
+        while i < n:
+            if self.in_string:
+                m = _IN_STRING.search(text, i)
+                if m is None:
+                    return -1
+                i = m.end()
+                if m.group() == "\\":
+                    if i == n:
+                        self.escaped = True
+                        return -1
+                    i += 1
+                    continue
+                self.in_string = False
+                if self.depth == 0:
+                    return i
+            else:
+                m = _NESTING.search(text, i)
+                if m is None:
+                    return -1
+                i = m.end()
+                c = m.group()
+                if c == '"':
+                    self.in_string = True
+                elif c in "{[":
+                    self.depth += 1
+                else:
+                    self.depth -= 1
+                    if self.depth == 0:
+                        return i
+        return -1
+
+
+def iter_array(chunks: Iterable[bytes], key: str = None) -> Iterator:
+    '''
+    Yield the decoded elements of a JSON array, one by one, as the chunks arrive.
+
+    Parameters
+    ----------
+    chunks : Iterable[bytes]
+        The JSON document (utf-8), in pieces of any size.
+    key : str, optional
+        Name of the array member in the top-level object,
+        by default None: the document is the array.
+
+    Yields
+    -------
+    Iterator
+        Decoded elements. Nothing if the array (or the key) is missing, or null.
+
+    Raises
+    ------
+    Exception
+        If the document ends in the middle of the array.
+    '''
+    text = codecs.getincrementaldecoder("utf-8")()
+    buf = ""
+    pos = 0  # next char to scan
+    depth = 0
+    expect_key = False  # a string at depth 1 is a key of the top-level object
+    top_is_object = False
+    current_key = None
+    in_array = False
+    done = False
+    scanner = None
+    pending = None  # pieces of an element that spans several chunks
+
+    for chunk in chunks:
+        if done:
+            continue  # drain the rest of the response
+        piece = text.decode(chunk)
+        if pending is not None:
+            end = scanner.scan(piece)
+            if end < 0:
+                pending.append(piece)
+                continue
+            pending.append(piece[:end])
+            element = json.loads("".join(pending))
+            pending = None
+            yield element
+            buf, pos = piece[end:], 0
+        else:
+            buf = buf[pos:] + piece
+            pos = 0
+
+        # Find where the array starts.
+        while not in_array:
+            m = _TOKEN.search(buf, pos)
+            if m is None:
+                pos = len(buf)
+                break
+            token = m.group()
+            if token == '"':
+                pos = m.start()  # incomplete string, wait for more
+                break
+            pos = m.end()
+            if token[0] == '"':
+                if depth == 1 and top_is_object and expect_key:
+                    current_key = json.loads(token)
+            elif token in "{[":
+                depth += 1
+                if depth == 1:
+                    top_is_object = token == "{"
+                    expect_key = top_is_object
+                    in_array = key is None and not top_is_object
+                elif depth == 2 and top_is_object and token == "[" and current_key == key:
+                    in_array = True
+            elif token in "}]":
+                depth -= 1
+            elif depth == 1 and top_is_object:
+                expect_key = token == ","  # "," then a key, ":" then a value
+
+        # Decode the elements that are complete.
+        while in_array:
+            pos = _SKIP.match(buf, pos).end()
+            if pos == len(buf):
+                break
+            if buf[pos] == "]":
+                done = True
+                break
+            if buf[pos] in '{["':
+                scanner = _Scanner()
+                if scanner.scan(buf, pos) < 0:
+                    pending = [buf[pos:]]  # incomplete, only the new pieces are scanned
+                    pos = len(buf)
+                    break
+                element, pos = _decoder.raw_decode(buf, pos)
+                yield element
+                continue
+            try:
+                element, end = _decoder.raw_decode(buf, pos)
+            except ValueError:
+                break  # incomplete, wait for more
+            if end == len(buf) or buf[end] not in ",] \t\r\n":
+                break  # a number may go on in the next chunk, eg. "7." + "5"
+            pos = end
+            yield element
+
+    if in_array and not done:
+        raise Exception("JSON stream ended inside the array")
@@ -0,0 +1,65 @@
+'''
+    Deferred imports.
+
+    thor_devkit and requests take most of the time of "import thor_requests.connect".
+    lazy_import() returns a stand-in module that imports the real one
+    on first attribute access, so short-lived programs only pay for what they use.
+
+    Annotations that name lazy modules must be strings, eg. "transaction.Transaction",
+    otherwise they are resolved (and imported) when the function is defined.
+'''
+
+import importlib
+import sys
+import threading
+import types
+
+_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    # Later lookups hit this module's dict, no more __getattr__
+                    self.__dict__.update({k: v for k, v in module.__dict__.items() if not k.startswith("__")})
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, name: str):
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    '''
+    Return module "name", imported on first attribute access.
+
+    Parameters
+    ----------
+    name : str
+        Full module name, eg. "thor_devkit.abi"
+
+    Returns
+    -------
+    types.ModuleType
+        The module itself if already imported, or a LazyModule stand-in.
+    '''
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
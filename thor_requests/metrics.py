@@ -0,0 +1,188 @@
+'''
+    Light-weight, thread-safe metrics: counters and latency histograms.
+'''
+
+import bisect
+import threading
+from typing import Sequence
+
+# Latency buckets in seconds, upper bounds.
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+class Counter:
+    def __init__(self):
+        self._value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> int:
+        return self._value
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        '''
+        A fixed-bucket histogram, constant memory regardless of observations.
+
+        Parameters
+        ----------
+        buckets : Sequence[float], optional
+            Sorted upper bounds of the buckets, by default DEFAULT_BUCKETS
+        '''
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last one is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        '''
+        Estimate the q-quantile (0 ~ 1), interpolated within the bucket.
+        Values in the +Inf bucket are reported as the largest bound.
+        '''
+        with self._lock:
+            counts = list(self.counts)
+            total = self.count
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, c in enumerate(counts):
+            if c and seen + c >= rank:
+                if index == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / c
+            seen += c
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class Hook:
+    '''
+    Instrumentation hook on Connect, see Connect.add_hook().
+    Override before() and/or after(), both receive the same "call" dict:
+
+    before: {"method", "verb", "endpoint", "path", "url"}
+    after:  + {"status", "latency", "bytes_out", "bytes_in", "error"}
+
+    "method" is the Connect method issuing the HTTP call (eg. "get_block"),
+    "path" is the path template (eg. "/blocks/{revision}"),
+    "status" is None if the call raised ("error" holds the exception).
+    '''
+
+    def before(self, call: dict):
+        pass
+
+    def after(self, call: dict):
+        pass
+
+
+def _labels(**kwargs) -> str:
+    inner = ",".join(
+        '{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in kwargs.items()
+    )
+    return "{" + inner + "}"
+
+
+class RequestMetrics(Hook):
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS, prefix: str = "thor_requests"):
+        '''
+        Built-in hook: latency histograms, request counters and bytes per Connect method.
+
+        Parameters
+        ----------
+        buckets : Sequence[float], optional
+            Latency buckets (seconds), by default DEFAULT_BUCKETS
+        prefix : str, optional
+            Prefix of the Prometheus metric names, by default "thor_requests"
+        '''
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self.latency = {}  # method -> Histogram
+        self.requests = {}  # (method, status) -> Counter
+        self.bytes = {}  # (method, direction) -> Counter
+        self._lock = threading.Lock()
+
+    def _get(self, table: dict, key, factory):
+        item = table.get(key)
+        if item is None:
+            with self._lock:
+                item = table.setdefault(key, factory())
+        return item
+
+    def after(self, call: dict):
+        method = call["method"]
+        status = call["status"] if call["status"] is not None else "error"
+        self._get(self.latency, method, lambda: Histogram(self.buckets)).observe(call["latency"])
+        self._get(self.requests, (method, status), Counter).inc()
+        self._get(self.bytes, (method, "out"), Counter).inc(call["bytes_out"])
+        self._get(self.bytes, (method, "in"), Counter).inc(call["bytes_in"])
+
+    def snapshot(self) -> dict:
+        '''{method: {"count":, "sum":, "p50":, "p99":, "status": {status: n}, "bytes_in":, "bytes_out":}}'''
+        result = {}
+        for method, h in sorted(self.latency.items()):
+            result[method] = h.snapshot()
+            result[method]["status"] = {
+                status: c.get() for (m, status), c in self.requests.items() if m == method
+            }
+            result[method]["bytes_in"] = self.bytes.get((method, "in"), Counter()).get()
+            result[method]["bytes_out"] = self.bytes.get((method, "out"), Counter()).get()
+        return result
+
+    def render_prometheus(self) -> str:
+        '''Render the metrics in Prometheus text exposition format'''
+        p = self.prefix
+        lines = [
+            f"# HELP {p}_http_requests_total HTTP calls to the node by Connect method and status.",
+            f"# TYPE {p}_http_requests_total counter",
+        ]
+        for (method, status), c in sorted(self.requests.items(), key=lambda x: (x[0][0], str(x[0][1]))):
+            lines.append(f"{p}_http_requests_total{_labels(method=method, status=status)} {c.get()}")
+
+        lines += [
+            f"# HELP {p}_http_bytes_total Bytes sent to (out) and received from (in) the node.",
+            f"# TYPE {p}_http_bytes_total counter",
+        ]
+        for (method, direction), c in sorted(self.bytes.items()):
+            lines.append(f"{p}_http_bytes_total{_labels(method=method, direction=direction)} {c.get()}")
+
+        lines += [
+            f"# HELP {p}_http_request_duration_seconds Latency of HTTP calls to the node.",
+            f"# TYPE {p}_http_request_duration_seconds histogram",
+        ]
+        for method, h in sorted(self.latency.items()):
+            with h._lock:
+                counts, total, count = list(h.counts), h.sum, h.count
+            cumulative = 0
+            for bound, c in zip(h.buckets + ("+Inf",), counts):
+                cumulative += c
+                lines.append(f"{p}_http_request_duration_seconds_bucket{_labels(method=method, le=bound)} {cumulative}")
+            lines.append(f"{p}_http_request_duration_seconds_sum{_labels(method=method)} {total}")
+            lines.append(f"{p}_http_request_duration_seconds_count{_labels(method=method)} {count}")
+
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,439 @@
+'''
+    Indexing pipelines: blocks in, decoded records out, with progress saved.
+
+    source -> stages -> sinks
+
+    Source: where the (expanded) blocks come from.
+        BlockRangeSource  a fixed range of blocks, fetched concurrently
+        StreamSource      a live stream.BlockStream (gap-free, with rollbacks)
+
+    Stages: each one turns a block into records (dicts with a "kind"),
+    all stages see every block, each with its own pool of workers.
+        EventStage        contract events, decoded with Contract ABIs
+        TransferStage     VET transfers
+        ReceiptStage      one record per tx: gas, paid, reverted...
+
+    Sinks: where the records of each batch go.
+        JsonlSink         one JSON document per line
+        SqliteSink        a sqlite table, rolled back blocks are deleted
+        CallbackSink      any function of a list of records
+
+    Blocks are processed in batches; after the sinks wrote a batch,
+    the source saves its position in its checkpoint, so a restarted
+    pipeline goes on from the last batch written (at least once delivery).
+
+    pipeline = Pipeline(
+        BlockRangeSource(connector, 1000000, 1100000, checkpoint=FileCheckpoint("progress.json")),
+        [EventStage({token_address: token_contract}, workers=4), TransferStage()],
+        [SqliteSink("index.db")],
+    )
+    pipeline.run()
+    pipeline.metrics()  # records and seconds spent by the source, each stage, each sink
+'''
+
+import json
+import sqlite3
+import time
+from typing import Callable, Dict, Iterator, List, TextIO, Union
+
+from .concurrency import map_ordered
+from .contract import Contract
+from .stream import BLOCK, BlockStream, StreamEvent
+from .utils import inject_decoded_event
+
+EVENT = "event"
+TRANSFER = "transfer"
+RECEIPT = "receipt"
+ROLLBACK = "rollback"
+
+
+# ---- sources ----
+
+
+class BlockRangeSource:
+    def __init__(self, connector, start: int, end: int, checkpoint=None, max_workers: int = None):
+        '''
+        Expanded blocks start..end (included), in order.
+
+        Parameters
+        ----------
+        connector : Connect
+            The node to read
+        start : int
+            First block number
+        end : int
+            Last block number (included)
+        checkpoint : FileCheckpoint, optional
+            Keeps the next block number to read, by default None
+        max_workers : int, optional
+            Blocks fetched at the same time, by default connector.concurrency()
+        '''
+        self.connector = connector
+        self.end = end
+        self.checkpoint = checkpoint
+        self.max_workers = max_workers
+        state = checkpoint.load() if checkpoint else None
+        self.next = state["next"] if state else start
+        self._last = None  # last block number yielded
+
+    def __iter__(self) -> Iterator[StreamEvent]:
+        def _get(number: int) -> dict:
+            block = self.connector.get_block(number, expanded=True)
+            if block is None:
+                raise Exception(f"block {number} not found")
+            return block
+
+        workers = self.max_workers or self.connector.concurrency()
+        for block in map_ordered(_get, range(self.next, self.end + 1), workers):
+            self._last = block["number"]
+            yield StreamEvent(BLOCK, block)
+
+    def commit(self):
+        '''All the blocks yielded so far are written'''
+        if self._last is not None:
+            self.next = self._last + 1
+        if self.checkpoint:
+            self.checkpoint.save({"next": self.next})
+
+
+class StreamSource:
+    def __init__(self, stream: BlockStream, stop_when_idle: bool = False):
+        '''
+        Blocks (and rollbacks) of a live BlockStream, which must deliver expanded blocks.
+        Its own checkpoint keeps the position, saved only once a batch is written.
+        '''
+        if not stream.expanded:
+            raise Exception("StreamSource needs a BlockStream(expanded=True)")
+        stream.checkpoint_every = 0
+        self.stream = stream
+        self.stop_when_idle = stop_when_idle
+
+    def __iter__(self) -> Iterator[Union[StreamEvent, None]]:
+        # None when the stream is up to date: the pipeline writes what it holds.
+        return self.stream.follow(self.stop_when_idle, yield_idle=True)
+
+    def commit(self):
+        # The last event of the batch is recorded by the stream when the next one is asked for,
+        # a restart may deliver it again.
+        self.stream.save()
+
+
+# ---- stages ----
+
+
+def _tx_record(kind: str, block: dict, tx_index: int, tx: dict) -> dict:
+    return {
+        "kind": kind,
+        "blockNumber": block["number"],
+        "blockID": block["id"],
+        "blockTimestamp": block["timestamp"],
+        "txID": tx["id"],
+        "txIndex": tx_index,
+    }
+
+
+class Stage:
+    '''
+    Turns a block into records. Override process().
+
+    Records are dicts with at least "kind", "blockNumber", "blockID"
+    and a "position" unique within the block and kind.
+    '''
+
+    name = "stage"
+
+    def __init__(self, workers: int = 1):
+        '''
+        Parameters
+        ----------
+        workers : int, optional
+            Blocks of a batch processed at the same time, by default 1
+        '''
+        self.workers = workers
+
+    def process(self, block: dict) -> List[dict]:
+        raise NotImplementedError
+
+
+class EventStage(Stage):
+    name = "events"
+
+    def __init__(self, contracts: Union[Dict[str, Contract], List[Contract]], workers: int = 1):
+        '''
+        Contract events, with "decoded" and "name" when an ABI knows them
+        (see utils.inject_decoded_event).
+
+        Parameters
+        ----------
+        contracts : Union[Dict[str, Contract], List[Contract]]
+            {address: Contract}: only the events of these addresses, decoded with their ABI.
+            [Contract]: all the events, decoded with the first ABI that has the event.
+        workers : int, optional
+            Blocks decoded at the same time, by default 1
+        '''
+        super().__init__(workers)
+        if isinstance(contracts, dict):
+            self.by_address = {address.lower(): c for address, c in contracts.items()}
+            self.contracts = []
+        else:
+            self.by_address = None
+            self.contracts = list(contracts)
+
+    def _contract(self, event: dict) -> Union[Contract, None]:
+        if self.by_address is not None:
+            return self.by_address.get(event["address"].lower())
+        signature = bytes.fromhex(event["topics"][0][2:]) if event["topics"] else None
+        for contract in self.contracts:
+            if signature and contract.get_event_by_signature(signature):
+                return contract
+        return None
+
+    def process(self, block: dict) -> List[dict]:
+        records = []
+        for tx_index, tx in enumerate(block["transactions"]):
+            if tx.get("reverted"):
+                continue
+            for clause_index, output in enumerate(tx.get("outputs") or []):
+                for log_index, event in enumerate(output["events"]):
+                    contract = self._contract(event)
+                    if contract is None and self.by_address is not None:
+                        continue
+                    record = dict(event)
+                    if contract is not None and event["topics"]:
+                        record = inject_decoded_event(record, contract)
+                    record.update(_tx_record(EVENT, block, tx_index, tx))
+                    record["clauseIndex"] = clause_index
+                    record["logIndex"] = log_index
+                    record["position"] = f"{tx_index}.{clause_index}.{log_index}"
+                    records.append(record)
+        return records
+
+
+class TransferStage(Stage):
+    name = "transfers"
+
+    def process(self, block: dict) -> List[dict]:
+        records = []
+        for tx_index, tx in enumerate(block["transactions"]):
+            if tx.get("reverted"):
+                continue
+            for clause_index, output in enumerate(tx.get("outputs") or []):
+                for log_index, transfer in enumerate(output["transfers"]):
+                    record = dict(transfer, amount=int(transfer["amount"], 16))
+                    record.update(_tx_record(TRANSFER, block, tx_index, tx))
+                    record["clauseIndex"] = clause_index
+                    record["logIndex"] = log_index
+                    record["position"] = f"{tx_index}.{clause_index}.{log_index}"
+                    records.append(record)
+        return records
+
+
+class ReceiptStage(Stage):
+    name = "receipts"
+
+    def process(self, block: dict) -> List[dict]:
+        records = []
+        for tx_index, tx in enumerate(block["transactions"]):
+            record = _tx_record(RECEIPT, block, tx_index, tx)
+            record.update({
+                "origin": tx["origin"],
+                "gasPayer": tx["gasPayer"],
+                "gasUsed": tx["gasUsed"],
+                "paid": int(tx["paid"], 16),
+                "reward": int(tx["reward"], 16),
+                "reverted": tx["reverted"],
+                "clauses": len(tx["clauses"]),
+                "position": str(tx_index),
+            })
+            records.append(record)
+        return records
+
+
+# ---- sinks ----
+
+
+class JsonlSink:
+    def __init__(self, out: Union[str, TextIO]):
+        '''Append records as JSON lines to a file (path) or a text stream'''
+        self._owned = isinstance(out, str)
+        self.out = open(out, "a") if self._owned else out
+
+    def write(self, records: List[dict]):
+        for record in records:
+            self.out.write(json.dumps(record) + "\n")
+        self.out.flush()
+
+    def close(self):
+        if self._owned:
+            self.out.close()
+
+
+class SqliteSink:
+    def __init__(self, path: str, table: str = "records"):
+        '''
+        Store records in a sqlite table:
+        (kind, block_number, block_id, position, tx_id, record as JSON).
+
+        Records written again after a restart replace the first copy.
+        A rollback deletes the records of the block.
+        '''
+        self.table = table
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute(
+            f"CREATE TABLE IF NOT EXISTS {table} ("
+            "kind TEXT, block_number INTEGER, block_id TEXT, position TEXT, tx_id TEXT, record TEXT, "
+            "PRIMARY KEY (block_id, kind, position))"
+        )
+        self.db.execute(f"CREATE INDEX IF NOT EXISTS {table}_number ON {table} (block_number)")
+        self.db.commit()
+
+    def write(self, records: List[dict]):
+        with self.db:  # one transaction per batch
+            for record in records:
+                if record["kind"] == ROLLBACK:
+                    self.db.execute(f"DELETE FROM {self.table} WHERE block_id = ?", (record["blockID"],))
+                    continue
+                self.db.execute(
+                    f"INSERT OR REPLACE INTO {self.table} VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        record["kind"],
+                        record["blockNumber"],
+                        record["blockID"],
+                        record["position"],
+                        record.get("txID"),
+                        json.dumps(record),
+                    ),
+                )
+
+    def close(self):
+        self.db.close()
+
+
+class CallbackSink:
+    def __init__(self, fn: Callable[[List[dict]], None]):
+        '''Hand each batch of records to fn'''
+        self.fn = fn
+
+    def write(self, records: List[dict]):
+        self.fn(records)
+
+    def close(self):
+        pass
+
+
+# ---- pipeline ----
+
+
+class _Throughput:
+    __slots__ = ("items", "records", "seconds")
+
+    def __init__(self):
+        self.items = 0
+        self.records = 0
+        self.seconds = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "items": self.items,
+            "records": self.records,
+            "seconds": self.seconds,
+            "per_second": self.items / self.seconds if self.seconds else 0.0,
+        }
+
+
+class Pipeline:
+    def __init__(self, source, stages: List[Stage], sinks: list, batch_size: int = 100):
+        '''
+        Run blocks from a source through stages into sinks.
+
+        Parameters
+        ----------
+        source : BlockRangeSource or StreamSource
+            Yields StreamEvent (BLOCK / ROLLBACK), or None to flush; has commit()
+        stages : List[Stage]
+            Each stage sees every block, records keep the block order
+        sinks : list
+            Each sink gets every batch of records: write(records), close()
+        batch_size : int, optional
+            Blocks per batch: per write to the sinks and per checkpoint, by default 100
+        '''
+        self.source = source
+        self.stages = stages
+        self.sinks = sinks
+        self.batch_size = batch_size
+        self.batches = 0
+        self._stats: Dict[str, _Throughput] = {"source": _Throughput()}
+        for stage in stages:
+            self._stats[f"stage:{stage.name}"] = _Throughput()
+        for sink in sinks:
+            self._stats[f"sink:{type(sink).__name__}"] = _Throughput()
+
+    def _records(self, batch: List[StreamEvent]) -> List[dict]:
+        '''Records of a batch, in block order then stage order'''
+        blocks = [e.block for e in batch if e.kind == BLOCK]
+        per_stage = []
+        for stage in self.stages:
+            stats = self._stats[f"stage:{stage.name}"]
+            started = time.perf_counter()
+            results = list(map_ordered(stage.process, blocks, stage.workers))
+            stats.seconds += time.perf_counter() - started
+            stats.items += len(blocks)
+            stats.records += sum(len(r) for r in results)
+            per_stage.append(iter(results))
+
+        records = []
+        for event in batch:
+            if event.kind == BLOCK:
+                for results in per_stage:
+                    records.extend(next(results))
+            else:
+                records.append({"kind": ROLLBACK, "blockNumber": event.block["number"], "blockID": event.block["id"]})
+        return records
+
+    def _write(self, batch: List[StreamEvent]):
+        records = self._records(batch)
+        for sink in self.sinks:
+            stats = self._stats[f"sink:{type(sink).__name__}"]
+            started = time.perf_counter()
+            sink.write(records)
+            stats.seconds += time.perf_counter() - started
+            stats.items += len(records)
+            stats.records += len(records)
+        self.source.commit()
+        self.batches += 1
+
+    def run(self, close: bool = True):
+        '''
+        Process the whole source (until it ends, or forever for a live stream).
+
+        Parameters
+        ----------
+        close : bool, optional
+            Close the sinks at the end, by default True
+        '''
+        stats = self._stats["source"]
+        batch = []
+        try:
+            items = iter(self.source)
+            while True:
+                started = time.perf_counter()
+                event = next(items, StopIteration)
+                stats.seconds += time.perf_counter() - started
+                if event is StopIteration:
+                    break
+                if event is not None:
+                    batch.append(event)
+                    stats.items += 1
+                if batch and (event is None or len(batch) >= self.batch_size):
+                    self._write(batch)
+                    batch = []
+            if batch:
+                self._write(batch)
+        finally:
+            if close:
+                for sink in self.sinks:
+                    sink.close()
+
+    def metrics(self) -> Dict[str, dict]:
+        '''{"source" | "stage:<name>" | "sink:<class>": {"items", "records", "seconds", "per_second"}}'''
+        return {name: stats.to_dict() for name, stats in self._stats.items()}
@@ -0,0 +1,284 @@
+'''
+    Rate limiting primitives.
+
+    TokenBucket / KeyedRateLimiter: requests per second.
+    AIMDLimiter: adaptive concurrency, grows while the node keeps up,
+                 halves on throttling (429/503) or rising latency.
+    NodeLimiter: both, plus retries of throttled requests, for Connect.
+'''
+
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict
+
+THROTTLE_STATUS = (429, 503)
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float = None):
+        '''
+        Classic token bucket.
+
+        Parameters
+        ----------
+        rate : float
+            Tokens refilled per second
+        burst : float, optional
+            Bucket capacity, by default equals to rate
+        '''
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else rate)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self, n: float = 1) -> bool:
+        '''Take n tokens if available, never blocks'''
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= n:
+                self.tokens -= n
+                return True
+            return False
+
+    def acquire(self, n: float = 1):
+        '''
+        Take n tokens, block until they are available
+
+        Raises
+        ------
+        ValueError
+            If n is more than the bucket can ever hold
+        '''
+        if n > self.burst:
+            raise ValueError(f"cannot take {n} tokens from a bucket of {self.burst}")
+        while True:
+            with self._lock:
+                self._refill(time.monotonic())
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class KeyedRateLimiter:
+    def __init__(self, rate: float, burst: float = None, max_keys: int = 100000):
+        '''
+        One token bucket per key (eg. per origin address).
+        Least recently seen keys are forgotten beyond max_keys.
+        '''
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.buckets: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def try_acquire(self, key: str, n: float = 1) -> bool:
+        with self._lock:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst)
+                self.buckets[key] = bucket
+                if len(self.buckets) > self.max_keys:
+                    self.buckets.popitem(last=False)
+            else:
+                self.buckets.move_to_end(key)
+        return bucket.try_acquire(n)
+
+
+class ThrottledError(Exception):
+    def __init__(self, status: int, text: str, retry_after: float = None):
+        '''The node kept throttling (429 / 503) after all retries'''
+        super().__init__(f"Throttled by node: HTTP {status} {text}")
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AIMDLimiter:
+    def __init__(
+        self,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        initial: int = 4,
+        decrease: float = 0.5,
+        latency_tolerance: float = 2.0,
+        latency_slack: float = 0.005,
+    ):
+        '''
+        Adaptive concurrency limit (additive increase, multiplicative decrease).
+
+        Each request that goes well adds 1/limit, so the limit grows by 1
+        per round of "limit" requests. A throttled or slow request multiplies it
+        by "decrease", if it was sent after the previous decrease.
+
+        Parameters
+        ----------
+        min_limit : int, optional
+            Floor of the limit, by default 1
+        max_limit : int, optional
+            Ceiling of the limit, by default 64
+        initial : int, optional
+            Start limit, by default 4
+        decrease : float, optional
+            Factor on congestion, by default 0.5
+        latency_tolerance : float, optional
+            A request is slow if its latency is over tolerance * baseline, by default 2.0.
+            The baseline is the lowest recent latency, kept per key (eg. per endpoint),
+            as a block download is not comparable to a balance read.
+        latency_slack : float, optional
+            Seconds also allowed on top, so jitter on very fast requests is ignored, by default 0.005
+        '''
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = float(min(max(initial, min_limit), max_limit))
+        self.decrease = decrease
+        self.latency_tolerance = latency_tolerance
+        self.latency_slack = latency_slack
+        self.in_flight = 0
+        self.baselines: Dict[str, float] = {}
+        self._last_decrease = 0.0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        '''Block until a request may start'''
+        with self._cond:
+            while self.in_flight >= int(self.limit):
+                self._cond.wait()
+            self.in_flight += 1
+
+    def _slow(self, key, latency: float) -> bool:
+        baseline = self.baselines.get(key)
+        if baseline is None:
+            self.baselines[key] = latency
+            return False
+        slow = latency > baseline * self.latency_tolerance + self.latency_slack
+        # Follow the lowest latency, drift up slowly so a faster past is forgotten.
+        self.baselines[key] = latency if latency < baseline else baseline + (latency - baseline) * 0.01
+        return slow
+
+    def release(self, latency: float, throttled: bool = False, key: str = None):
+        '''A request ended, after "latency" seconds, "throttled" if the node pushed back'''
+        with self._cond:
+            self.in_flight -= 1
+            congested = self._slow(key, latency) or throttled
+            if congested:
+                now = time.monotonic()
+                # Requests sent before the last decrease say nothing about the new limit.
+                if now - latency >= self._last_decrease:
+                    self.limit = max(self.min_limit, self.limit * self.decrease)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._cond.notify_all()
+
+
+class NodeLimiter:
+    def __init__(
+        self,
+        rate: float = None,
+        burst: float = None,
+        min_concurrency: int = 1,
+        max_concurrency: int = 64,
+        initial_concurrency: int = 4,
+        retries: int = 5,
+        backoff: float = 0.1,
+        max_backoff: float = 10.0,
+    ):
+        '''
+        Limits the requests of Connect to one node, see Connect(limiter=...).
+
+        Parameters
+        ----------
+        rate : float, optional
+            Max requests per second, by default None (no fixed rate)
+        burst : float, optional
+            Token bucket size, by default equals to rate
+        min_concurrency, max_concurrency, initial_concurrency : int, optional
+            Bounds and start of the adaptive concurrency, see AIMDLimiter
+        retries : int, optional
+            Retries of a throttled (429/503) request, by default 5
+        backoff : float, optional
+            First wait (seconds) before a retry, doubled each time (with jitter),
+            unless the node sends Retry-After, by default 0.1
+        max_backoff : float, optional
+            Longest wait, by default 10.0
+        '''
+        self.bucket = TokenBucket(rate, burst) if rate else None
+        self.aimd = AIMDLimiter(min_concurrency, max_concurrency, initial_concurrency)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.throttled = 0  # throttled responses seen
+
+    @property
+    def max_concurrency(self) -> int:
+        return self.aimd.max_limit
+
+    def acquire(self):
+        if self.bucket:
+            self.bucket.acquire()
+        self.aimd.acquire()
+
+    def release(self, latency: float, throttled: bool = False, key: str = None):
+        if throttled:
+            self.throttled += 1
+        self.aimd.release(latency, throttled, key)
+
+    def _wait(self, attempt: int, r) -> float:
+        retry_after = r.headers.get("Retry-After") if r.headers else None
+        try:
+            return min(self.max_backoff, float(retry_after))
+        except (TypeError, ValueError):
+            return min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+    def call(self, send: Callable, key: str = None):
+        '''
+        Run send() -> transport.Response within the limits, retry if throttled.
+
+        Raises
+        ------
+        ThrottledError
+            If still throttled after all retries
+        '''
+        attempt = 0
+        while True:
+            self.acquire()
+            started = time.monotonic()
+            try:
+                r = send()
+            except Exception:
+                # Timeouts, refused connections: a sign of overload too.
+                self.aimd.release(time.monotonic() - started, True, key)
+                raise
+            throttled = r.status_code in THROTTLE_STATUS
+            self.release(time.monotonic() - started, throttled, key)
+            if not throttled:
+                return r
+            if attempt >= self.retries:
+                raise ThrottledError(r.status_code, r.text, r.headers.get("Retry-After") if r.headers else None)
+            time.sleep(self._wait(attempt, r))
+            attempt += 1
+
+
+_endpoint_limiters: Dict[str, NodeLimiter] = {}
+_endpoint_lock = threading.Lock()
+
+
+def endpoint_limiter(url: str, **kwargs) -> NodeLimiter:
+    '''
+    The NodeLimiter shared by every Connect to this node url in the process,
+    created with kwargs (see NodeLimiter) on first use.
+    '''
+    url = url.rstrip("/")
+    with _endpoint_lock:
+        limiter = _endpoint_limiters.get(url)
+        if limiter is None:
+            limiter = _endpoint_limiters[url] = NodeLimiter(**kwargs)
+        return limiter
@@ -0,0 +1,227 @@
+'''
+    Compact result objects for blocks, transactions and receipts.
+
+    Block.from_dict(connector.get_block(...)) etc. or get_block(..., typed=True).
+
+    Every field of the node's JSON is an attribute (same name), kept in __slots__.
+    Hex fields are converted only when read, and the converted value replaces
+    the string, so each field is parsed at most once:
+
+    ids, hashes, data  -> bytes
+    value, paid, nonce -> int
+
+    to_dict() gives the node's JSON form back (hex numbers without leading zeros).
+'''
+
+from typing import Dict, Union
+
+INT = "int"
+BYTES = "bytes"
+
+
+def _parse_int(value: str) -> int:
+    # Clause values are hex, but may come as decimal strings too.
+    return int(value, 16) if value.startswith("0x") else int(value)
+
+
+def _parse_bytes(value: str) -> bytes:
+    return bytes.fromhex(value[2:])
+
+
+_PARSE = {INT: _parse_int, BYTES: _parse_bytes}
+
+
+def _dump(value, kind):
+    if value is None:
+        return None
+    if kind == INT:
+        return hex(value) if isinstance(value, int) else value
+    if kind == BYTES:
+        return "0x" + value.hex() if isinstance(value, bytes) else value
+    if isinstance(kind, list):
+        return [v.to_dict() for v in value]
+    if isinstance(kind, type):
+        return value.to_dict()
+    return value
+
+
+def _slot(name: str, kind) -> str:
+    return "_" + name if kind in (INT, BYTES) else name
+
+
+class _Lazy:
+    '''Attribute that parses the hex string in its slot on first read'''
+
+    __slots__ = ("slot", "kind")
+
+    def __init__(self, slot: str, kind: str):
+        self.slot = slot
+        self.kind = kind
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return self
+        value = getattr(obj, self.slot)
+        if type(value) is str:
+            value = _PARSE[self.kind](value)
+            setattr(obj, self.slot, value)
+        return value
+
+
+class Result:
+    '''Base of the result classes, see the module doc'''
+
+    __slots__ = ()
+    _schema: Dict[str, Union[str, type, list, None]] = {}
+
+    def __init__(self, data: dict):
+        for name, kind in self._schema.items():
+            value = data.get(name)
+            if value is not None:
+                if isinstance(kind, type):
+                    value = kind(value)
+                elif isinstance(kind, list):
+                    value = [kind[0](v) for v in value]
+            setattr(self, _slot(name, kind), value)
+
+    @classmethod
+    def from_dict(cls, data: Union[dict, None]):
+        '''None (eg. tx not found) stays None'''
+        return None if data is None else cls(data)
+
+    def to_dict(self) -> dict:
+        return {
+            name: _dump(getattr(self, _slot(name, kind)), kind)
+            for name, kind in self._schema.items()
+        }
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        key = "id" if "id" in self._schema else next(iter(self._schema))
+        return f"<{type(self).__name__} {key}={self.to_dict()[key]}>"
+
+
+def _result_class(name: str, schema: dict, doc: str) -> type:
+    '''Build a Result subclass: plain fields are slots, hex fields are slots behind _Lazy'''
+    namespace = {
+        "__slots__": tuple(_slot(n, kind) for n, kind in schema.items()),
+        "__doc__": doc,
+        "_schema": schema,
+    }
+    for n, kind in schema.items():
+        if kind in (INT, BYTES):
+            namespace[n] = _Lazy("_" + n, kind)
+    return type(name, (Result,), namespace)
+
+
+_TX_META_SCHEMA = {
+    "blockID": BYTES,
+    "blockNumber": None,
+    "blockTimestamp": None,
+}
+
+TxMeta = _result_class("TxMeta", _TX_META_SCHEMA, "Where a tx is included")
+
+ReceiptMeta = _result_class("ReceiptMeta", dict(_TX_META_SCHEMA, txID=BYTES, txOrigin=None), "Where a receipt is included")
+
+LogMeta = _result_class("LogMeta", dict(_TX_META_SCHEMA, txID=BYTES, txOrigin=None, clauseIndex=None), "Where an event log is emitted")
+
+Clause = _result_class("Clause", {
+    "to": None,
+    "value": INT,
+    "data": BYTES,
+}, "A clause of a tx")
+
+_EVENT_SCHEMA = {
+    "address": None,
+    "topics": None,
+    "data": BYTES,
+}
+
+Event = _result_class("Event", _EVENT_SCHEMA, "An event in a receipt output, topics are '0x...' strings")
+
+EventLog = _result_class("EventLog", dict(_EVENT_SCHEMA, meta=LogMeta), "An event from Connect.filter_events()")
+
+Transfer = _result_class("Transfer", {
+    "sender": None,
+    "recipient": None,
+    "amount": INT,
+}, "A VET transfer in a receipt output")
+
+Output = _result_class("Output", {
+    "contractAddress": None,
+    "events": [Event],
+    "transfers": [Transfer],
+}, "Output of a clause, in a receipt")
+
+_TX_SCHEMA = {
+    "id": BYTES,
+    "chainTag": None,
+    "blockRef": BYTES,
+    "expiration": None,
+    "clauses": [Clause],
+    "gasPriceCoef": None,
+    "gas": None,
+    "origin": None,
+    "delegator": None,
+    "nonce": INT,
+    "dependsOn": BYTES,
+    "size": None,
+}
+
+_RECEIPT_SCHEMA = {
+    "gasUsed": None,
+    "gasPayer": None,
+    "paid": INT,
+    "reward": INT,
+    "reverted": None,
+    "outputs": [Output],
+}
+
+Tx = _result_class("Tx", dict(_TX_SCHEMA, meta=TxMeta), "A transaction, see Connect.get_tx()")
+
+Receipt = _result_class("Receipt", dict(_RECEIPT_SCHEMA, meta=ReceiptMeta), "A tx receipt, see Connect.get_tx_receipt()")
+
+ExpandedTx = _result_class("ExpandedTx", dict(_TX_SCHEMA, **_RECEIPT_SCHEMA), "A tx and its receipt, in an expanded block")
+
+_BLOCK_SCHEMA = {
+    "number": None,
+    "id": BYTES,
+    "size": None,
+    "parentID": BYTES,
+    "timestamp": None,
+    "gasLimit": None,
+    "beneficiary": None,
+    "gasUsed": None,
+    "totalScore": None,
+    "txsRoot": BYTES,
+    "txsFeatures": None,
+    "stateRoot": BYTES,
+    "receiptsRoot": BYTES,
+    "com": None,
+    "signer": None,
+    "isTrunk": None,
+    "isFinalized": None,
+}
+
+_Block = _result_class("Block", dict(_BLOCK_SCHEMA, transactions=None), "A block, see Connect.get_block()")
+
+
+class Block(_Block):
+    '''A block, see Connect.get_block(). "transactions" are tx ids (str), or ExpandedTx of an expanded block.'''
+
+    __slots__ = ()
+
+    def __init__(self, data: dict):
+        super().__init__(data)
+        txs = self.transactions
+        if txs and isinstance(txs[0], dict):
+            self.transactions = [ExpandedTx(tx) for tx in txs]
+
+    def to_dict(self) -> dict:
+        result = super().to_dict()
+        if result["transactions"] and isinstance(result["transactions"][0], ExpandedTx):
+            result["transactions"] = [tx.to_dict() for tx in result["transactions"]]
+        return result
@@ -0,0 +1,200 @@
+'''
+    Schedule chains of dependent transactions.
+
+    VeChain tx has a "dependsOn" field, the node won't pack a tx
+    until the tx it depends on is packed (and not reverted).
+    The tx id is known locally before posting,
+    so a whole chain of dependent txs can be signed and posted at once,
+    instead of waiting for each receipt before sending the next tx.
+
+    A tx has a single "dependsOn", so each intent has at most one parent:
+    the intents form a forest of chains.
+'''
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from .clause import Clause
+from .utils import (
+    any_emulate_failed,
+    build_tx_body,
+    calc_blockRef,
+    calc_nonce,
+    calc_tx_id,
+    calc_tx_signed,
+    calc_tx_signed_with_fee_delegation,
+    read_vm_gases,
+    suggest_gas_for_tx,
+)
+from .wallet import Wallet
+
+
+class TxIntent:
+    '''A tx to be sent, optionally after its parent'''
+
+    def __init__(
+        self,
+        name: str,
+        wallet: Wallet,
+        clauses: List[Clause],
+        after: str = None,
+        gas: int = 0,
+        gasPriceCoef: int = 0,
+        gas_payer: Wallet = None,
+    ):
+        self.name = name
+        self.wallet = wallet
+        self.clauses = clauses
+        self.after = after
+        self.gas = gas
+        self.gasPriceCoef = gasPriceCoef
+        self.gas_payer = gas_payer
+
+
+class TxScheduler:
+    def __init__(self, connector, expiration: int = 32, force: bool = False, max_workers: int = 8):
+        '''
+        Collect tx intents, then sign and post all of them in one go.
+
+        Parameters
+        ----------
+        connector : Connect
+            The connector to the VeChain node
+        expiration : int, optional
+            Expiration (in blocks) of every tx, the whole chain should land in it, by default 32
+        force : bool, optional
+            Post the txs even if emulation failed, by default False
+        max_workers : int, optional
+            Concurrent posts to the node, by default 8
+        '''
+        self.connector = connector
+        self.expiration = expiration
+        self.force = force
+        self.max_workers = max_workers
+        self.intents: Dict[str, TxIntent] = OrderedDict()
+
+    def add(
+        self,
+        name: str,
+        wallet: Wallet,
+        clauses: List[Clause],
+        after: str = None,
+        gas: int = 0,
+        gasPriceCoef: int = 0,
+        gas_payer: Wallet = None,
+    ) -> TxIntent:
+        '''
+        Add a tx intent.
+
+        Parameters
+        ----------
+        name : str
+            Unique name of the intent
+        wallet : Wallet
+            Signer of the tx
+        clauses : List[Clause]
+            Clauses of the tx
+        after : str, optional
+            Name of the parent intent, the tx "dependsOn" the parent tx, by default None
+        gas : int, optional
+            Gas of the tx, by default 0 (estimate by emulation against "best").
+            Set it when the tx only succeeds on top of its parent's effects,
+            as emulation can't see txs which are not packed yet.
+        gasPriceCoef : int, optional
+            [0~255], by default 0
+        gas_payer : Wallet, optional
+            Fee delegation payer, by default None
+
+        Returns
+        -------
+        TxIntent
+            The intent added
+        '''
+        if name in self.intents:
+            raise Exception(f"Intent {name} already exists")
+        # Parent must be added first, so there can't be a cycle.
+        if after is not None and after not in self.intents:
+            raise Exception(f"Parent intent {after} not found, add it first")
+        intent = TxIntent(name, wallet, clauses, after, gas, gasPriceCoef, gas_payer)
+        self.intents[name] = intent
+        return intent
+
+    def plan(self) -> List[dict]:
+        '''
+        Build and sign every intent, fill "dependsOn" with the parent's tx id.
+
+        Returns
+        -------
+        List[dict]
+            Parents first: [{"name":, "id":, "dependsOn":, "depth":, "raw":}, ...]
+        '''
+        chainTag = self.connector.get_chainTag()
+        blockRef = calc_blockRef(self.connector.get_block("best")["id"])
+
+        plans = OrderedDict()
+        for name, intent in self.intents.items():
+            parent = plans[intent.after] if intent.after is not None else None
+            need_fee_delegation = intent.gas_payer != None
+            tx_body = build_tx_body(
+                [clause.to_dict() for clause in intent.clauses],
+                chainTag,
+                blockRef,
+                calc_nonce(),
+                expiration=self.expiration,
+                gasPriceCoef=intent.gasPriceCoef,
+                gas=intent.gas,
+                dependsOn=parent["id"] if parent else None,
+                feeDelegation=need_fee_delegation,
+            )
+            if not intent.gas:
+                tx_body["gas"] = self._estimate_gas(intent, tx_body)
+
+            if not need_fee_delegation:
+                raw = calc_tx_signed(intent.wallet, tx_body, True)
+            else:
+                raw = calc_tx_signed_with_fee_delegation(
+                    intent.wallet, intent.gas_payer, tx_body, True)
+
+            plans[name] = {
+                "name": name,
+                "id": calc_tx_id(tx_body, intent.wallet.getAddress()),
+                "dependsOn": tx_body["dependsOn"],
+                "depth": parent["depth"] + 1 if parent else 0,
+                "raw": raw,
+            }
+
+        return list(plans.values())
+
+    def submit(self) -> Dict[str, str]:
+        '''
+        Sign and post every intent.
+        Txs of the same depth are posted concurrently, parents before children.
+
+        Returns
+        -------
+        Dict[str, str]
+            {name: tx id}
+        '''
+        plans = self.plan()
+        levels = {}
+        for p in plans:
+            levels.setdefault(p["depth"], []).append(p)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for depth in sorted(levels):
+                raws = [p["raw"] for p in levels[depth]]
+                for p, res in zip(levels[depth], executor.map(self.connector.post_tx, raws)):
+                    if res["id"] != p["id"]:
+                        raise Exception(f"tx id mismatch: {res['id']} != {p['id']}")
+
+        return OrderedDict((p["name"], p["id"]) for p in plans)
+
+    def _estimate_gas(self, intent: TxIntent, tx_body: dict) -> int:
+        gas_payer = intent.gas_payer.getAddress() if intent.gas_payer else None
+        e_responses = self.connector.emulate_tx(
+            intent.wallet.getAddress(), tx_body, gas_payer=gas_payer)
+        if any_emulate_failed(e_responses) and self.force == False:
+            raise Exception(f"Tx {intent.name} will revert: {e_responses}")
+        vm_gas = sum(read_vm_gases(e_responses))
+        return suggest_gas_for_tx(vm_gas, tx_body)
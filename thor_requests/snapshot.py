@@ -0,0 +1,224 @@
+'''
+    Many reads, one block.
+
+    Reads made one after the other at "best" may each see a different block,
+    and none of them can be cached. A Snapshot resolves its revision
+    to a block id once, and every read goes to that block id:
+
+    - the reads are consistent with each other;
+    - they share the caches of the connector (emulations, storage),
+      which only keep what was read at a block id;
+    - the same read asked twice (or by two threads at once) is sent once,
+      the last memo_size distinct reads are remembered.
+
+    Every caller of the same read gets the same object: do not mutate it.
+
+    snap = connector.at("best")                       # or a number, a block id, "finalized"
+    snap.get_vet_balance(holder)
+    snap.call(caller, contract, "balanceOf", [holder], token)
+
+    A snapshot of a moving revision ("best", "finalized") can follow the chain:
+    with refresh=N it resolves the revision again every N seconds,
+    and moves (with a fresh memo) when the block changed.
+    pinned() gives a fixed snapshot of where it is now, for reads that must agree.
+'''
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Union
+
+from .clause import Clause
+from .concurrency import map_ordered
+from .contract import Contract
+from .utils import is_block_id
+
+
+class _Flight:
+    '''One read: sent by the first thread asking for it, waited for by the others'''
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class Snapshot:
+    def __init__(self, connector, revision: str = "best", refresh: float = None, max_workers: int = None, memo_size: int = 10000):
+        '''
+        Reads pinned to one block.
+
+        Parameters
+        ----------
+        connector : Connect
+            The node to read from
+        revision : str, optional
+            "best", "finalized", a block number or a block id, by default "best"
+        refresh : float, optional
+            Seconds after which a moving revision is resolved again (on the next read),
+            by default None: pinned to the block it resolved to at creation.
+            Ignored for a block id.
+        max_workers : int, optional
+            Reads at the same time in bulk methods, by default connector.concurrency()
+        memo_size : int, optional
+            Distinct reads remembered (least recently used forgotten first), by default 10000
+        '''
+        self.connector = connector
+        self.revision = revision
+        self.refresh_interval = None if is_block_id(str(revision)) else refresh
+        self.max_workers = max_workers
+        self.memo_size = memo_size
+        self.reads = 0  # reads sent to the node (or its caches)
+        self.shared = 0  # reads answered by an earlier or concurrent identical one
+        self.moves = 0  # times a refresh found a new block
+        self._lock = threading.Lock()
+        self._block: dict = None
+        self._flights: OrderedDict = OrderedDict()  # key -> _Flight, least recently used first
+        self._checked = 0.0
+        self.refresh()
+
+    # ---- the block ----
+
+    def refresh(self) -> bool:
+        '''Resolve the revision again, return True if the snapshot moved to another block'''
+        if self._block is not None and is_block_id(str(self.revision)):
+            return False
+        block = self.connector.get_block(self.revision)
+        if block is None:
+            raise Exception(f"block {self.revision} not found")
+        with self._lock:
+            self._checked = time.monotonic()
+            if self._block is not None and self._block["id"] == block["id"]:
+                return False
+            moved = self._block is not None
+            self._block = block
+            self._flights = OrderedDict()  # reads of the previous block do not apply
+            if moved:
+                self.moves += 1
+            return moved
+
+    def _view(self) -> tuple:
+        '''(block, memo) to read from, refreshed if due'''
+        if self.refresh_interval is not None and time.monotonic() - self._checked >= self.refresh_interval:
+            self.refresh()
+        with self._lock:
+            return self._block, self._flights
+
+    @property
+    def block(self) -> dict:
+        '''The block of the snapshot (not expanded)'''
+        return self._view()[0]
+
+    @property
+    def id(self) -> str:
+        return self.block["id"]
+
+    @property
+    def number(self) -> int:
+        return self.block["number"]
+
+    @property
+    def timestamp(self) -> int:
+        return self.block["timestamp"]
+
+    def pinned(self) -> "Snapshot":
+        '''A snapshot fixed at the current block, sharing nothing with this one'''
+        return Snapshot(self.connector, self.id, max_workers=self.max_workers, memo_size=self.memo_size)
+
+    # ---- deduplication ----
+
+    def _once(self, key: tuple, read: Callable[[str], object]):
+        '''read(block id) once per key and block, the same value to each caller'''
+        block, flights = self._view()
+        with self._lock:
+            flight = flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = flights[key] = _Flight()
+                self.reads += 1
+                while len(flights) > self.memo_size:
+                    flights.popitem(last=False)  # a read in flight still completes, only unshared
+            else:
+                flights.move_to_end(key)
+                self.shared += 1
+        if owner:
+            try:
+                flight.value = read(block["id"])
+            except Exception as e:
+                flight.error = e
+                with self._lock:
+                    if flights.get(key) is flight:
+                        del flights[key]  # errors are not remembered, the next caller tries again
+            finally:
+                flight.done.set()
+        else:
+            flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    # ---- reads ----
+
+    def get_account(self, address: str) -> dict:
+        address = address.lower()
+        return self._once(("account", address), lambda block_id: self.connector.get_account(address, block_id))
+
+    def get_vet_balance(self, address: str) -> int:
+        return int(self.get_account(address)["balance"], 16)
+
+    def get_vtho_balance(self, address: str) -> int:
+        return int(self.get_account(address)["energy"], 16)
+
+    def get_accounts(self, addresses: List[str]) -> Dict[str, dict]:
+        '''get_account() of many addresses concurrently, {lower case address: account}'''
+        unique = list(dict.fromkeys(a.lower() for a in addresses))
+        return dict(zip(unique, map_ordered(self.get_account, unique, self._workers())))
+
+    def get_code(self, address: str) -> str:
+        address = address.lower()
+        return self._once(("code", address), lambda block_id: self.connector.get_code(address, block_id))
+
+    def get_storage(self, address: str, key: Union[str, int]) -> str:
+        address = address.lower()
+        key = int(key, 16) if isinstance(key, str) else key
+        return self._once(("storage", address, key), lambda block_id: self.connector.get_storage(address, key, block_id))
+
+    def get_storages(self, address: str, keys: List[Union[str, int]]) -> Dict[str, str]:
+        '''get_storage() of many keys concurrently, {'0x' + 32 bytes hex key: value}'''
+        unique = list(dict.fromkeys(int(k, 16) if isinstance(k, str) else k for k in keys))
+        values = map_ordered(lambda k: self.get_storage(address, k), unique, self._workers())
+        return {"0x" + k.to_bytes(32, "big").hex(): v for k, v in zip(unique, values)}
+
+    def emulate(self, emulate_tx_body: dict) -> List[dict]:
+        return self.connector.emulate(emulate_tx_body, self.id)
+
+    def call(
+        self,
+        caller: str,
+        contract: Contract,
+        func_name: str,
+        func_params: List,
+        to: str,
+        value=0,
+        gas=0,
+        gas_payer: str = None,
+    ) -> dict:
+        '''Connect.call() at the block of the snapshot'''
+        clause = self.connector.clause(contract, func_name, func_params, to, value)
+        key = ("call", caller.lower(), gas, gas_payer and gas_payer.lower(), clause.key())
+        return self._once(key, lambda block_id: self.connector.call(
+            caller, contract, func_name, func_params, to, value, gas, gas_payer, block_id))
+
+    def call_multi(self, caller: str, clauses: List[Clause], gas: int = 0, gas_payer: str = None) -> List[dict]:
+        '''Connect.call_multi() at the block of the snapshot'''
+        key = ("call_multi", caller.lower(), gas, gas_payer and gas_payer.lower(), tuple(c.key() for c in clauses))
+        return self._once(key, lambda block_id: self.connector.call_multi(caller, clauses, gas, gas_payer, block_id))
+
+    def _workers(self) -> int:
+        return self.max_workers or self.connector.concurrency()
+
+    def __repr__(self) -> str:
+        return f"Snapshot({self.revision}, {self.number}, {self.id})"
+
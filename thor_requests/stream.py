@@ -0,0 +1,272 @@
+'''
+    Follow the chain block by block, for indexers.
+
+    Unlike Connect.ticker(), BlockStream:
+
+    - delivers every block, in order: when several blocks arrived
+      between two polls, the missing ones are fetched (concurrently),
+      each one checked to be the child (parentID) of the previous one;
+    - notices reorganizations: when a block is not the child of the last
+      delivered one, the delivered blocks that left the chain are rolled back,
+      newest first, then the blocks of the new branch are delivered;
+    - can hold blocks back until they are N blocks deep (confirmations),
+      so that most reorgs are never seen;
+    - resumes from a checkpoint (the last delivered blocks) after a restart,
+      and rolls back what was reorganized while it was not running.
+
+    stream = BlockStream(connector, confirmations=12, checkpoint=FileCheckpoint("blocks.json"))
+    for event in stream.follow():
+        if event.kind == BLOCK:
+            index(event.block)
+        else:  # ROLLBACK
+            unindex(event.block["id"])
+
+    Delivery is at least once: the checkpoint records a block
+    only after the loop body that received it has returned.
+'''
+
+import json
+import os
+import time
+from collections import deque
+from typing import Iterator, Tuple, Union
+
+from .concurrency import map_ordered
+
+BLOCK = "block"
+ROLLBACK = "rollback"
+
+
+class ReorgTooDeep(Exception):
+    '''A reorganization went past the oldest block kept, the stream cannot unwind it'''
+
+
+class StreamEvent:
+    '''A block to apply (BLOCK), or a block to undo (ROLLBACK)'''
+
+    __slots__ = ("kind", "block")
+
+    def __init__(self, kind: str, block: dict):
+        self.kind = kind
+        # BLOCK: the block as get_block() returns it.
+        # ROLLBACK: {"number", "id"} of a delivered block that left the chain.
+        self.block = block
+
+    def __repr__(self) -> str:
+        return f"StreamEvent({self.kind}, {self.block['number']}, {self.block['id']})"
+
+
+class FileCheckpoint:
+    def __init__(self, path: str):
+        '''
+        Keep the state of a BlockStream in a JSON file.
+        Written to a temporary file then renamed, so a crash never leaves half a file.
+        '''
+        self.path = path
+
+    def load(self) -> Union[dict, None]:
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, "r") as f:
+            return json.load(f)
+
+    def save(self, state: dict):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp, self.path)
+
+
+class BlockStream:
+    def __init__(
+        self,
+        connector,
+        start: int = None,
+        confirmations: int = 0,
+        checkpoint=None,
+        keep: int = 256,
+        expanded: bool = False,
+        poll_interval: float = 1.0,
+        checkpoint_every: int = 100,
+        max_workers: int = None,
+    ):
+        '''
+        A gap-free, reorg-aware stream of blocks.
+
+        Parameters
+        ----------
+        connector : Connect
+            The node to follow
+        start : int, optional
+            First block number to deliver when there is no checkpoint,
+            by default the current best block (minus confirmations)
+        confirmations : int, optional
+            Deliver a block only once it is this many blocks below the best one, by default 0
+        checkpoint : FileCheckpoint, optional
+            Where the stream state is loaded from and saved to,
+            any object with load() -> dict or None and save(dict). By default None
+        keep : int, optional
+            Delivered blocks remembered (and saved) to unwind a reorg, by default 256.
+            A deeper reorg raises ReorgTooDeep.
+        expanded : bool, optional
+            Deliver expanded blocks (txs with their receipts), by default False
+        poll_interval : float, optional
+            Seconds between two polls once up to date, by default 1.0
+        checkpoint_every : int, optional
+            Save the checkpoint after this many events, and whenever up to date, by default 100.
+            0: only when save() is called.
+        max_workers : int, optional
+            Blocks fetched at the same time to catch up, by default connector.concurrency()
+        '''
+        self.connector = connector
+        self.start = start
+        self.confirmations = confirmations
+        self.checkpoint = checkpoint
+        self.expanded = expanded
+        self.poll_interval = poll_interval
+        self.checkpoint_every = checkpoint_every
+        self.max_workers = max_workers
+        self.chain: deque = deque(maxlen=keep)  # (number, id) of the delivered blocks, newest last
+        self.errors = 0  # failed polls, retried by follow()
+        self._unsaved = 0
+        self._stopped = False
+        state = checkpoint.load() if checkpoint else None
+        if state:
+            self.chain.extend((number, block_id) for number, block_id in state["chain"])
+
+    @property
+    def head(self) -> Union[Tuple[int, str], None]:
+        '''(number, id) of the last delivered block, None before the first one'''
+        return self.chain[-1] if self.chain else None
+
+    def state(self) -> dict:
+        return {"chain": [list(x) for x in self.chain]}
+
+    def save(self):
+        if self.checkpoint:
+            self.checkpoint.save(self.state())
+        self._unsaved = 0
+
+    def _applied(self, event: StreamEvent):
+        if event.kind == BLOCK:
+            self.chain.append((event.block["number"], event.block["id"]))
+        else:
+            self.chain.pop()
+        self._unsaved += 1
+        if self.checkpoint_every and self._unsaved >= self.checkpoint_every:
+            self.save()
+
+    def _fetch(self, numbers: range, best: dict) -> Iterator[Union[dict, None]]:
+        def _get(number: int) -> Union[dict, None]:
+            if number == best["number"] and not self.expanded:
+                return best
+            return self.connector.get_block(number, expanded=self.expanded)
+
+        return map_ordered(_get, numbers, self.max_workers or self.connector.concurrency())
+
+    def poll(self) -> Iterator[StreamEvent]:
+        '''
+        Yield the events up to the current best block (minus confirmations), then return.
+
+        Raises
+        ------
+        ReorgTooDeep
+            If the blocks to roll back go past the oldest one kept
+        '''
+        best = self.connector.get_block("best")
+        target = best["number"] - self.confirmations
+        while True:
+            check_tip = bool(self.chain)
+            if check_tip:
+                # Read the last delivered block again: a reorg may have replaced it
+                # with a block of the same number.
+                tip_number, tip_id = self.chain[-1]
+                numbers = range(tip_number, max(target, tip_number) + 1)
+            else:
+                first = target if self.start is None else self.start
+                if first > target:
+                    break
+                numbers = range(first, target + 1)
+
+            reorged = False
+            blocks = self._fetch(numbers, best)
+            try:
+                for block in blocks:
+                    if check_tip:
+                        check_tip = False
+                        if block is None or block["id"] != tip_id:
+                            reorged = True
+                            break
+                        continue
+                    if block is None:
+                        break  # the chain got shorter since "best" was read
+                    if self.chain and block["parentID"] != self.chain[-1][1]:
+                        reorged = True
+                        break
+                    event = StreamEvent(BLOCK, block)
+                    yield event
+                    self._applied(event)
+            finally:
+                blocks.close()
+            if not reorged:
+                break
+
+            # Undo the delivered blocks that are no longer on the chain, newest first.
+            while self.chain:
+                number, block_id = self.chain[-1]
+                canonical = self.connector.get_block(number)
+                if canonical is not None and canonical["id"] == block_id:
+                    break
+                event = StreamEvent(ROLLBACK, {"number": number, "id": block_id})
+                yield event
+                self._applied(event)
+            if not self.chain:
+                raise ReorgTooDeep(f"reorg deeper than the {self.chain.maxlen} blocks kept")
+
+        if self._unsaved and self.checkpoint_every:
+            self.save()
+
+    def follow(self, stop_when_idle: bool = False, yield_idle: bool = False) -> Iterator[Union[StreamEvent, None]]:
+        '''
+        Poll forever (or until stop()), yield the events as they come.
+        Errors of a poll (node down...) are counted in self.errors and retried
+        after poll_interval; ReorgTooDeep is raised.
+
+        Parameters
+        ----------
+        stop_when_idle : bool, optional
+            Return once up to date instead of waiting for new blocks, by default False
+        yield_idle : bool, optional
+            Yield None after each poll that found nothing new, by default False.
+            Lets a consumer flush what it buffered while waiting for blocks.
+        '''
+        self._stopped = False
+        try:
+            while not self._stopped:
+                delivered = False
+                try:
+                    for event in self.poll():
+                        if self._stopped:
+                            break  # the previous event is applied, this one is not delivered
+                        delivered = True
+                        yield event
+                except ReorgTooDeep:
+                    raise
+                except Exception:
+                    self.errors += 1
+                    time.sleep(self.poll_interval)
+                    continue
+                if delivered:
+                    continue
+                if yield_idle:
+                    yield None
+                if stop_when_idle:
+                    break
+                time.sleep(self.poll_interval)
+        finally:
+            if self._unsaved and self.checkpoint_every:
+                self.save()
+
+    def stop(self):
+        '''Make follow() return after the current event'''
+        self._stopped = True
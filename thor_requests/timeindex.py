@@ -0,0 +1,163 @@
+'''
+    Timestamp -> block number, with few requests.
+
+    Thor packs a block every 10 seconds, block timestamps are
+    genesis + k * 10 and a slot is sometimes missed (no block for it).
+    Every block read is kept as an anchor (number, timestamp):
+
+    - between two anchors with no missed slot (10 s per block),
+      every timestamp is known: no request;
+    - otherwise the next block read is interpolated from the anchors around,
+      falling back to the middle when interpolation does not narrow the range
+      fast enough, so a cold lookup is a handful of requests
+      and later lookups near known anchors zero or one.
+
+    index = TimeIndex(connector)
+    index.block_number(1700000000)               # last block at or before that time
+    index.block_numbers([t1, t2, ...])           # in bulk
+'''
+
+import bisect
+import threading
+from datetime import datetime
+from typing import Dict, List, Tuple, Union
+
+from .concurrency import map_ordered
+
+BLOCK_INTERVAL = 10  # seconds
+
+Timestamp = Union[int, float, datetime]
+
+
+def _seconds(timestamp: Timestamp) -> int:
+    if isinstance(timestamp, datetime):
+        # naive datetimes are taken as local time, as datetime.timestamp() does
+        timestamp = timestamp.timestamp()
+    return int(timestamp)
+
+
+class TimeIndex:
+    def __init__(self, connector, block_interval: int = BLOCK_INTERVAL, max_workers: int = None):
+        '''
+        Resolve timestamps to block numbers.
+
+        Parameters
+        ----------
+        connector : Connect
+            The node to query
+        block_interval : int, optional
+            Seconds between two block slots, by default 10
+        max_workers : int, optional
+            Lookups run at the same time by block_numbers(), by default connector.concurrency()
+        '''
+        self.connector = connector
+        self.block_interval = block_interval
+        self.max_workers = max_workers
+        self.requests = 0  # blocks read from the node
+        self._numbers: List[int] = []  # anchors, sorted, numbers and timestamps both increase
+        self._timestamps: List[int] = []
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def add(self, number: int, timestamp: int):
+        '''Remember a block of known timestamp as an anchor'''
+        with self._lock:
+            i = bisect.bisect_left(self._numbers, number)
+            if i < len(self._numbers) and self._numbers[i] == number:
+                return
+            self._numbers.insert(i, number)
+            self._timestamps.insert(i, timestamp)
+
+    def _read(self, revision: Union[int, str]) -> Tuple[int, int]:
+        with self._lock:
+            self.requests += 1
+        block = self.connector.get_block(revision)
+        if block is None:
+            raise Exception(f"block {revision} not found")
+        self.add(block["number"], block["timestamp"])
+        return block["number"], block["timestamp"]
+
+    def _around(self, ts: int) -> Tuple[int, int, int, int]:
+        '''Anchors (number, timestamp) at or before ts, and after ts (None, None if ts is past the last one)'''
+        with self._lock:
+            i = bisect.bisect_right(self._timestamps, ts)
+            lo = (self._numbers[i - 1], self._timestamps[i - 1])
+            hi = (self._numbers[i], self._timestamps[i]) if i < len(self._numbers) else (None, None)
+        return lo + hi
+
+    def block_number(self, timestamp: Timestamp) -> int:
+        '''
+        Number of the last block with a timestamp at or before "timestamp".
+
+        Parameters
+        ----------
+        timestamp : Timestamp
+            Unix time in seconds, or a datetime
+
+        Returns
+        -------
+        int
+            The block number, the best block for a time past it
+
+        Raises
+        ------
+        Exception
+            If the time is before the genesis block
+        '''
+        ts = _seconds(timestamp)
+        if not self._numbers:
+            self._read(0)
+        if ts < self._timestamps[0]:
+            raise Exception(f"timestamp {ts} is before the genesis block")
+
+        refreshed = False
+        probes = 0
+        last_width = None
+        while True:
+            lo_n, lo_ts, hi_n, hi_ts = self._around(ts)
+            if hi_n is None:
+                # Past the last anchor: is the chain further now?
+                if refreshed:
+                    return lo_n
+                refreshed = True
+                self._read("best")
+                continue
+            # At most one block per interval after lo: the answer is at most "upper".
+            upper = min(lo_n + (ts - lo_ts) // self.block_interval, hi_n - 1)
+            if upper <= lo_n:
+                return lo_n
+            width = hi_n - lo_n
+            if hi_ts - lo_ts == width * self.block_interval:
+                return upper  # no missed slot between lo and hi, so "upper" is exact
+            if probes == 0:
+                guess = upper  # right unless a slot was missed since lo
+            elif width * 2 > last_width:
+                guess = lo_n + width // 2  # interpolation did not halve the range
+            else:
+                guess = lo_n + (ts - lo_ts) * width // (hi_ts - lo_ts)
+            probes += 1
+            last_width = width
+            self._read(min(max(guess, lo_n + 1), upper))
+
+    def block_numbers(self, timestamps: List[Timestamp]) -> List[int]:
+        '''
+        block_number() of many timestamps, looked up concurrently.
+
+        The timestamps are resolved in time order so each lookup
+        finds the anchors of the previous ones. Duplicates are resolved once.
+
+        Returns
+        -------
+        List[int]
+            Block numbers, in the same order as timestamps
+        '''
+        seconds = [_seconds(t) for t in timestamps]
+        unique = sorted(set(seconds))
+        if unique and not self._numbers:
+            self._read(0)
+            self._read("best")
+        workers = self.max_workers or self.connector.concurrency()
+        resolved: Dict[int, int] = dict(zip(unique, map_ordered(self.block_number, unique, workers)))
+        return [resolved[s] for s in seconds]
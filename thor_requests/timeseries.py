@@ -0,0 +1,238 @@
+'''
+    A read-only call evaluated at many blocks: totalSupply, an oracle price,
+    a vault share price... over time.
+
+    The blocks are evaluated concurrently. Values at finalized blocks are cached
+    by block number, so a chart redrawn over an overlapping range costs only the new blocks.
+
+    A probe can skip blocks: it gives each block a key, and when two neighbour
+    blocks have the same key the value cannot have changed in between,
+    so it is not evaluated again. EventProbe keys each block by the events
+    of the contract up to it (a few log queries for the whole range):
+    a contract whose state changes always emit an event is evaluated
+    only after the blocks where it did.
+
+    series = TimeSeries(connector).call(caller, token, "totalSupply", [], token_address,
+                                        blocks=range(0, 1000000, 1000),
+                                        probe=EventProbe(connector, [token_address]))
+    for number, value in series: ...
+    blocks, values = series.to_numpy()
+'''
+
+import bisect
+import threading
+from array import array
+from typing import Callable, Hashable, Iterable, Iterator, List, Tuple
+
+from .cache import LRUCache
+from .clause import Clause
+from .concurrency import map_ordered
+from .contract import Contract
+
+_MISSING = object()
+
+
+def _compact(response: dict):
+    '''The decoded outputs of a call: one value, a tuple of several, None if reverted'''
+    decoded = response.get("decoded")
+    if response["reverted"] or not decoded:
+        return None
+    outputs = []
+    while str(len(outputs)) in decoded:
+        outputs.append(decoded[str(len(outputs))])
+    return outputs[0] if len(outputs) == 1 else tuple(outputs)
+
+
+class Series:
+    def __init__(self, blocks: List[int], values: List, evaluated: int = 0):
+        '''
+        Values of a call by block number, in block order.
+
+        Parameters
+        ----------
+        blocks : List[int]
+            Block numbers, increasing
+        values : List
+            The decoded value at each block (a tuple for several outputs or clauses, None if reverted)
+        evaluated : int, optional
+            Blocks actually evaluated (emulated or cached), the others took the value before them
+        '''
+        self.blocks = array("q", blocks)
+        self.values = list(values)
+        self.evaluated = evaluated
+
+    def __len__(self) -> int:
+        return len(self.blocks)
+
+    def __iter__(self) -> Iterator[Tuple[int, object]]:
+        return zip(self.blocks, self.values)
+
+    def changes(self) -> List[Tuple[int, object]]:
+        '''(block, value) of the first block and of each block where the value changed'''
+        return [
+            (block, value)
+            for i, (block, value) in enumerate(self)
+            if i == 0 or value != self.values[i - 1]
+        ]
+
+    def to_numpy(self) -> tuple:
+        '''
+        (blocks, values) as numpy arrays.
+        Values beyond 64 bits (token amounts in Wei) give an array of Python ints (dtype object).
+
+        Raises
+        ------
+        Exception
+            If numpy is not installed
+        '''
+        try:
+            import numpy
+        except ImportError:
+            raise Exception("numpy is not installed, pip3 install numpy")
+        return numpy.array(self.blocks, dtype=numpy.int64), numpy.array(self.values)
+
+
+class EventProbe:
+    def __init__(self, connector, addresses: List[str], page_size: int = 256):
+        '''
+        Key blocks by the number of blocks with an event of the addresses up to them.
+
+        Parameters
+        ----------
+        connector : Connect
+            The node to query
+        addresses : List[str]
+            Contracts whose events mark a possible change of the value
+        page_size : int, optional
+            Events per log query, by default 256
+        '''
+        self.connector = connector
+        self.addresses = list(addresses)
+        self.page_size = page_size
+
+    def event_blocks(self, from_block: int, to_block: int) -> List[int]:
+        '''Sorted numbers of the blocks with an event of the addresses'''
+        criteria_set = [{"address": a} for a in self.addresses]
+        events = self.connector.iter_events(from_block, to_block, criteria_set, self.page_size)
+        return sorted({e["meta"]["blockNumber"] for e in events})
+
+    def __call__(self, numbers: List[int]) -> List[int]:
+        # Blocks before the first one requested do not matter: only neighbours are compared.
+        changed = self.event_blocks(numbers[0] + 1, numbers[-1]) if len(numbers) > 1 else []
+        return [bisect.bisect_right(changed, n) for n in numbers]
+
+
+class TimeSeries:
+    def __init__(self, connector, max_workers: int = None, cache_size: int = 100000):
+        '''
+        Evaluate read-only calls over many blocks.
+
+        Parameters
+        ----------
+        connector : Connect
+            The node to query
+        max_workers : int, optional
+            Blocks evaluated at the same time, by default connector.concurrency()
+        cache_size : int, optional
+            Values kept, by (call, block number), by default 100000.
+            Only values at or below the finalized block are kept: those blocks cannot be reorganized.
+        '''
+        self.connector = connector
+        self.max_workers = max_workers
+        self.cache = LRUCache(cache_size)
+        self.calls = 0  # emulations sent
+        self._lock = threading.Lock()
+
+    def call(
+        self,
+        caller: str,
+        contract: Contract,
+        func_name: str,
+        func_params: List,
+        to: str,
+        blocks: Iterable[int],
+        value=0,
+        gas=0,
+        gas_payer: str = None,
+        probe: Callable[[List[int]], List[Hashable]] = None,
+    ) -> Series:
+        '''
+        Connect.call() at each block.
+
+        Parameters
+        ----------
+        blocks : Iterable[int]
+            Block numbers, in any order, duplicates evaluated once
+        probe : Callable[[List[int]], List[Hashable]], optional
+            Given the sorted block numbers, a key for each one, eg. EventProbe.
+            A block with the same key as the block before it takes its value without a call.
+            By default None: every block is evaluated.
+
+        Returns
+        -------
+        Series
+            The decoded return value at each block, None where the call reverted
+        '''
+        clause = self.connector.clause(contract, func_name, func_params, to, value)
+        key = ("call", caller.lower(), gas, gas_payer and gas_payer.lower(), clause.key())
+
+        def _evaluate(number: int):
+            return _compact(self.connector.call(caller, contract, func_name, func_params, to, value, gas, gas_payer, number))
+
+        return self._series(key, _evaluate, blocks, probe)
+
+    def call_multi(
+        self,
+        caller: str,
+        clauses: List[Clause],
+        blocks: Iterable[int],
+        gas: int = 0,
+        gas_payer: str = None,
+        probe: Callable[[List[int]], List[Hashable]] = None,
+    ) -> Series:
+        '''
+        Connect.call_multi() at each block, see call().
+        Each value is a tuple with the decoded value of each clause.
+        '''
+        key = ("call_multi", caller.lower(), gas, gas_payer and gas_payer.lower(), tuple(c.key() for c in clauses))
+
+        def _evaluate(number: int):
+            responses = self.connector.call_multi(caller, clauses, gas, gas_payer, number)
+            values = [_compact(r) for r in responses]
+            return tuple(values + [None] * (len(clauses) - len(values)))  # none after a reverted clause
+
+        return self._series(key, _evaluate, blocks, probe)
+
+    def _finalized(self) -> int:
+        '''Number of the finalized block, -1 if the node does not tell (nothing is cached)'''
+        try:
+            block = self.connector.get_block("finalized")
+        except Exception:
+            return -1
+        return block["number"] if block else -1
+
+    def _series(self, key: tuple, evaluate: Callable[[int], object], blocks: Iterable[int], probe) -> Series:
+        numbers = sorted(set(int(n) for n in blocks))
+        if not numbers:
+            return Series([], [])
+        keys = probe(numbers) if probe else None
+        todo = [n for i, n in enumerate(numbers) if keys is None or i == 0 or keys[i] != keys[i - 1]]
+        finalized = self._finalized()
+
+        def _value(number: int):
+            value = self.cache.get((key, number), _MISSING)
+            if value is _MISSING:
+                with self._lock:
+                    self.calls += 1
+                value = evaluate(number)
+                if number <= finalized:
+                    self.cache.put((key, number), value)
+            return value
+
+        workers = self.max_workers or self.connector.concurrency()
+        evaluated = dict(zip(todo, map_ordered(_value, todo, workers)))
+        values = []
+        for number in numbers:
+            values.append(evaluated[number] if number in evaluated else values[-1])
+        return Series(numbers, values, len(todo))
+
@@ -0,0 +1,159 @@
+'''
+    Optional tracing of Connect operations.
+
+    Connect opens nested spans for each phase of call(), transact() etc.
+    eg. transact -> chainTag, best_block, emulate, sign, post
+    and one span per HTTP request underneath.
+
+    NOOP_TRACER (default): spans cost almost nothing.
+    InMemoryCollector:     keeps finished spans in memory.
+    OpenTelemetryTracer:   forwards spans to OpenTelemetry (if installed).
+'''
+
+import itertools
+import threading
+import time
+from collections import deque
+from typing import List
+
+
+class Span:
+    '''A finished or running span'''
+
+    __slots__ = ("span_id", "parent_id", "name", "start", "end", "attributes")
+
+    def __init__(self, span_id: int, parent_id: int, name: str, attributes: dict):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end = None
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    @property
+    def duration(self) -> float:
+        return (self.end or time.perf_counter()) - self.start
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "name": self.name,
+            "duration": self.duration,
+            "attributes": dict(self.attributes),
+        }
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def set_attribute(self, key: str, value):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    '''Base tracer, does nothing'''
+
+    def span(self, name: str, **attributes):
+        '''
+        Context manager of a span, yields an object with set_attribute(key, value).
+        Spans opened inside are its children.
+        '''
+        return _NOOP_SPAN
+
+
+NOOP_TRACER = Tracer()
+
+
+class _SpanContext:
+    __slots__ = ("collector", "span")
+
+    def __init__(self, collector, span: Span):
+        self.collector = collector
+        self.span = span
+
+    def __enter__(self) -> Span:
+        self.collector._stack().append(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end = time.perf_counter()
+        if exc is not None:
+            self.span.attributes["error"] = repr(exc)
+        self.collector._stack().pop()
+        self.collector.spans.append(self.span)
+        return False
+
+
+class InMemoryCollector(Tracer):
+    def __init__(self, max_spans: int = 10000):
+        '''
+        Keep finished spans in memory, newest max_spans only.
+        Parents are tracked per thread.
+        '''
+        self.spans = deque(maxlen=max_spans)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def span(self, name: str, **attributes):
+        stack = self._stack()
+        parent_id = stack[-1].span_id if stack else None
+        return _SpanContext(self, Span(next(self._ids), parent_id, name, attributes))
+
+    def export(self) -> List[dict]:
+        '''Finished spans as dicts, in finishing order (children before parents)'''
+        return [s.to_dict() for s in list(self.spans)]
+
+    def summary(self) -> dict:
+        '''{span name: {"count":, "total":, "max":}} in seconds'''
+        result = {}
+        for s in list(self.spans):
+            item = result.setdefault(s.name, {"count": 0, "total": 0.0, "max": 0.0})
+            item["count"] += 1
+            item["total"] += s.duration
+            item["max"] = max(item["max"], s.duration)
+        return result
+
+    def clear(self):
+        self.spans.clear()
+
+
+class OpenTelemetryTracer(Tracer):
+    def __init__(self, tracer=None):
+        '''
+        Forward spans to OpenTelemetry.
+
+        Parameters
+        ----------
+        tracer : opentelemetry.trace.Tracer, optional
+            by default opentelemetry.trace.get_tracer("thor_requests")
+        '''
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError:
+                raise Exception("opentelemetry-api is not installed, pip3 install opentelemetry-api")
+            tracer = trace.get_tracer("thor_requests")
+        self.tracer = tracer
+
+    def span(self, name: str, **attributes):
+        attributes = {k: v for k, v in attributes.items() if v is not None}
+        return self.tracer.start_as_current_span(name, attributes=attributes)
@@ -0,0 +1,281 @@
+'''
+    Track in-flight transactions until they are settled.
+
+    A transaction carries "blockRef" and "expiration",
+    so once the chain grows past blockRef + expiration
+    and the tx is not packed, it can never land.
+
+    TxTracker follows a single block stream and settles
+    thousands of tracked transactions against it:
+    pending -> included | reverted | expired
+'''
+
+import heapq
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Union
+
+from .utils import (
+    calc_blockRef,
+    calc_nonce,
+    calc_tx_signed,
+    calc_tx_signed_with_fee_delegation,
+    read_blockRef_number,
+)
+from .wallet import Wallet
+
+PENDING = "pending"
+INCLUDED = "included"
+REVERTED = "reverted"
+EXPIRED = "expired"
+
+
+class TrackedTx:
+    '''A single transaction under tracking'''
+
+    __slots__ = (
+        "tx_id",
+        "deadline",
+        "status",
+        "block_number",
+        "resubmits",
+        "replaced_by",
+        "tx_body",
+        "wallet",
+        "gas_payer",
+    )
+
+    def __init__(self, tx_id: str, deadline: int, tx_body: dict = None, wallet: Wallet = None, gas_payer: Wallet = None, resubmits: int = 0):
+        self.tx_id = tx_id
+        self.deadline = deadline  # Last block number the tx can be packed in
+        self.status = PENDING
+        self.block_number = None  # Block that packed the tx, if any
+        self.resubmits = resubmits
+        self.replaced_by = None  # tx id of the resubmitted tx, if any
+        # Only kept when the tx can be rebuilt and resubmitted
+        self.tx_body = tx_body
+        self.wallet = wallet
+        self.gas_payer = gas_payer
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.tx_id,
+            "status": self.status,
+            "deadline": self.deadline,
+            "blockNumber": self.block_number,
+            "resubmits": self.resubmits,
+            "replacedBy": self.replaced_by,
+        }
+
+
+class TxTracker:
+    def __init__(
+        self,
+        connector,
+        resubmit: bool = False,
+        max_resubmits: int = 3,
+        max_pending: int = 100000,
+        max_settled: int = 10000,
+    ):
+        '''
+        Track posted transactions with one block stream.
+
+        Parameters
+        ----------
+        connector : Connect
+            The connector to the VeChain node
+        resubmit : bool, optional
+            Rebuild and post expired txs with a fresh blockRef, by default False
+        max_resubmits : int, optional
+            How many times a single tx may be resubmitted, by default 3
+        max_pending : int, optional
+            Max txs under tracking at the same time, by default 100000
+        max_settled : int, optional
+            Max settled txs remembered (oldest forgotten first), by default 10000
+        '''
+        self.connector = connector
+        self.resubmit = resubmit
+        self.max_resubmits = max_resubmits
+        self.max_pending = max_pending
+        self.max_settled = max_settled
+        self.pending: Dict[str, TrackedTx] = {}
+        self.settled: OrderedDict = OrderedDict()
+        self._deadlines = []  # heap of (deadline, tx_id), entries of settled txs are dropped lazily
+        self.head_number = None  # Last processed block number
+
+    def track(self, tx_id: str, tx_body: dict, wallet: Wallet = None, gas_payer: Wallet = None) -> TrackedTx:
+        '''
+        Start tracking a posted tx.
+
+        Parameters
+        ----------
+        tx_id : str
+            '0x...' id of the posted tx, see Connect.post_tx()
+        tx_body : dict
+            The tx body the tx was built from, see utils.build_tx_body()
+        wallet : Wallet, optional
+            The signer, required to resubmit the tx when it expires
+        gas_payer : Wallet, optional
+            The fee delegator, required to resubmit a delegated tx
+
+        Returns
+        -------
+        TrackedTx
+            The tracking record
+        '''
+        if len(self.pending) >= self.max_pending:
+            raise Exception(f"Too many pending txs: {len(self.pending)}")
+
+        deadline = read_blockRef_number(tx_body["blockRef"]) + int(tx_body["expiration"])
+        keep_body = self.resubmit and wallet is not None
+        record = TrackedTx(
+            tx_id.lower(),
+            deadline,
+            tx_body if keep_body else None,
+            wallet if keep_body else None,
+            gas_payer if keep_body else None,
+        )
+        self.pending[record.tx_id] = record
+        heapq.heappush(self._deadlines, (deadline, record.tx_id))
+        return record
+
+    def get(self, tx_id: str) -> Union[TrackedTx, None]:
+        '''Get the tracking record of a tx, or None if unknown (or forgotten)'''
+        tx_id = tx_id.lower()
+        return self.pending.get(tx_id) or self.settled.get(tx_id)
+
+    def status(self, tx_id: str) -> Union[str, None]:
+        '''Get the status of a tx, or None if unknown (or forgotten)'''
+        record = self.get(tx_id)
+        return record.status if record else None
+
+    def process_block(self, block: dict) -> List[TrackedTx]:
+        '''
+        Settle tracked txs against a new block.
+        Blocks skipped since the last call are fetched and processed first.
+
+        Parameters
+        ----------
+        block : dict
+            A (non-expanded) block, see Connect.get_block()
+
+        Returns
+        -------
+        List[TrackedTx]
+            Records that changed status, including resubmitted ones.
+        '''
+        number = int(block["number"])
+        if self.head_number is not None and number <= self.head_number:
+            return []
+
+        changed = []
+        if self.head_number is not None:
+            for n in range(self.head_number + 1, number):
+                skipped = self.connector.get_block(n)
+                if skipped is None:
+                    # The chain got shorter since the block was read (reorg):
+                    # the next call fills the gap from here.
+                    return changed
+                changed.extend(self._process_one(skipped))
+        changed.extend(self._process_one(block))
+        return changed
+
+    def follow(self, stop_when_idle: bool = True) -> Iterator[TrackedTx]:
+        '''
+        Follow the chain with Connect.ticker(), yield records when they change status.
+
+        Parameters
+        ----------
+        stop_when_idle : bool, optional
+            Stop when nothing is pending anymore, by default True
+
+        Yields
+        -------
+        Iterator[TrackedTx]
+            Records that changed status
+        '''
+        if stop_when_idle and not self.pending:
+            return
+        for block in self.connector.ticker():
+            for record in self.process_block(block):
+                yield record
+            if stop_when_idle and not self.pending:
+                return
+
+    def _process_one(self, block: dict) -> List[TrackedTx]:
+        number = int(block["number"])
+        self.head_number = number
+        changed = []
+
+        # Packed in this block?
+        for tx_id in block.get("transactions", []):
+            if not isinstance(tx_id, str):  # expanded block
+                tx_id = tx_id["id"]
+            record = self.pending.get(tx_id.lower())
+            if record:
+                self._settle_packed(record, self.connector.get_tx_receipt(record.tx_id))
+                changed.append(record)
+
+        # Expired? Confirm with a receipt, in case a block was missed.
+        while self._deadlines and self._deadlines[0][0] < number:
+            _, tx_id = heapq.heappop(self._deadlines)
+            record = self.pending.get(tx_id)
+            if not record:  # Already settled
+                continue
+            receipt = self.connector.get_tx_receipt(tx_id)
+            if receipt:
+                self._settle_packed(record, receipt)
+                changed.append(record)
+                continue
+            self._settle(record, EXPIRED)
+            changed.append(record)
+            new_record = self._resubmit(record, block)
+            if new_record:
+                changed.append(new_record)
+
+        return changed
+
+    def _settle_packed(self, record: TrackedTx, receipt: dict):
+        record.block_number = int(receipt["meta"]["blockNumber"])
+        self._settle(record, REVERTED if receipt["reverted"] else INCLUDED)
+
+    def _settle(self, record: TrackedTx, status: str):
+        record.status = status
+        self.pending.pop(record.tx_id, None)
+        if len(self._deadlines) > 2 * len(self.pending) + 64:
+            # Most entries are of settled txs (included long before their deadline):
+            # rebuild the heap from the pending ones, so it stays within max_pending.
+            self._deadlines = [(r.deadline, r.tx_id) for r in self.pending.values()]
+            heapq.heapify(self._deadlines)
+        if status != EXPIRED or not self.resubmit:
+            # Nothing more to do with the body and keys
+            record.tx_body = record.wallet = record.gas_payer = None
+        self.settled[record.tx_id] = record
+        while len(self.settled) > self.max_settled:
+            self.settled.popitem(last=False)
+
+    def _resubmit(self, record: TrackedTx, block: dict) -> Union[TrackedTx, None]:
+        '''Rebuild an expired tx on top of the given block and post it again'''
+        if not record.tx_body or record.resubmits >= self.max_resubmits:
+            record.tx_body = record.wallet = record.gas_payer = None
+            return None
+
+        tx_body = dict(record.tx_body)
+        tx_body["blockRef"] = calc_blockRef(block["id"])
+        tx_body["nonce"] = calc_nonce()
+        if record.gas_payer:
+            encoded_raw = calc_tx_signed_with_fee_delegation(
+                record.wallet, record.gas_payer, tx_body, True)
+        else:
+            encoded_raw = calc_tx_signed(record.wallet, tx_body, True)
+        try:
+            tx_id = self.connector.post_tx(encoded_raw)["id"]
+        except Exception:
+            # Node refused it (eg. balance drained), leave it expired.
+            record.tx_body = record.wallet = record.gas_payer = None
+            return None
+
+        new_record = self.track(tx_id, tx_body, record.wallet, record.gas_payer)
+        new_record.resubmits = record.resubmits + 1
+        record.replaced_by = new_record.tx_id
+        record.tx_body = record.wallet = record.gas_payer = None
+        return new_record
@@ -0,0 +1,240 @@
+'''
+    Transports carry the HTTP exchanges of Connect.
+
+    HttpTransport:      talks to a real node (default).
+    RecordingTransport: wraps another transport, writes every exchange to a file.
+    ReplayTransport:    answers from a recorded file, with zero or synthetic latency.
+
+    Recording once and replaying later makes profiling of Connect reproducible
+    and free of node latency: only the library's own CPU cost remains.
+'''
+
+import gzip
+import json
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Iterator, Tuple, Union
+from urllib.parse import urlsplit
+
+from .lazy import lazy_import
+
+requests = lazy_import("requests")
+
+
+class Response:
+    '''Minimal HTTP response, what Connect needs from a transport'''
+
+    __slots__ = ("status_code", "content", "headers", "wire_bytes")
+
+    def __init__(self, status_code: int, content: bytes, headers: dict = None, wire_bytes: int = None):
+        self.status_code = status_code
+        self.content = content  # decompressed
+        self.headers = headers or {}
+        # Body size as received, before decompression
+        self.wire_bytes = len(content) if wire_bytes is None else wire_bytes
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Transport:
+    def request(self, verb: str, url: str, params: dict = None, data: bytes = None, headers: dict = None, timeout: float = None) -> Response:
+        '''
+        Send a request, return the response.
+
+        Parameters
+        ----------
+        verb : str
+            "GET" or "POST"
+        url : str
+            Full url, may carry a query already
+        params : dict, optional
+            URL query params
+        data : bytes, optional
+            Encoded body
+        headers : dict, optional
+            HTTP headers
+        timeout : float, optional
+            Seconds
+        '''
+        raise NotImplementedError
+
+    def stream(self, verb: str, url: str, params: dict = None, data: bytes = None, headers: dict = None, timeout: float = None, chunk_size: int = 65536) -> Tuple[int, Iterator[bytes]]:
+        '''
+        Send a request, return the status code and the body in chunks, as they arrive.
+        Same parameters as request(). By default the whole body is read first, then cut.
+        '''
+        r = self.request(verb, url, params=params, data=data, headers=headers, timeout=timeout)
+        content = r.content
+        return r.status_code, (content[i:i + chunk_size] for i in range(0, max(len(content), 1), chunk_size))
+
+
+class HttpTransport(Transport):
+    def __init__(self, session: "requests.Session" = None, pool_maxsize: int = 10):
+        '''
+        Talk to a node over HTTP, connections are kept alive and reused
+
+        Parameters
+        ----------
+        session : requests.Session, optional
+            Session to send with, used as is, by default a new one
+        pool_maxsize : int, optional
+            Connections kept open per host by the new session, by default 10.
+            Size it to the threads sending at the same time, the connections
+            beyond it are closed after each request.
+        '''
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=pool_maxsize)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def request(self, verb, url, params=None, data=None, headers=None, timeout=None) -> Response:
+        r = self.session.request(verb, url, params=params, data=data, headers=headers, timeout=timeout)
+        content = r.content
+        try:
+            wire_bytes = r.raw.tell()  # bytes read from the socket, compressed
+        except Exception:
+            wire_bytes = None
+        return Response(r.status_code, content, r.headers, wire_bytes or None)
+
+    def stream(self, verb, url, params=None, data=None, headers=None, timeout=None, chunk_size=65536):
+        r = self.session.request(verb, url, params=params, data=data, headers=headers, timeout=timeout, stream=True)
+
+        def _chunks():
+            try:
+                for chunk in r.iter_content(chunk_size):  # decompressed
+                    yield chunk
+            finally:
+                r.close()
+
+        return r.status_code, _chunks()
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _key(verb: str, url: str, params: dict, data: Union[bytes, str, None], ignore_body_for: Iterable[str]) -> tuple:
+    '''Normalized lookup key of an exchange, the node address is left out'''
+    parts = urlsplit(url)
+    path = parts.path + ("?" + parts.query if parts.query else "")
+    query = tuple(sorted((params or {}).items()))
+    if data is None or any(parts.path.endswith(p) for p in ignore_body_for):
+        body = None
+    else:
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        try:
+            body = json.dumps(json.loads(data), sort_keys=True, separators=(",", ":"))
+        except ValueError:
+            body = data
+    return (verb, path, query, body)
+
+
+class RecordingTransport(Transport):
+    def __init__(self, path: str, inner: Transport = None):
+        '''
+        Record every exchange to a JSON-lines file (gzip if path ends with .gz).
+
+        Parameters
+        ----------
+        path : str
+            File to write, it is overwritten.
+        inner : Transport, optional
+            The transport doing the real work, by default HttpTransport()
+        '''
+        self.inner = inner or HttpTransport()
+        self.path = path
+        self._file = _open(path, "w")
+        self._lock = threading.Lock()
+
+    def request(self, verb, url, params=None, data=None, headers=None, timeout=None) -> Response:
+        started = time.perf_counter()
+        r = self.inner.request(verb, url, params=params, data=data, headers=headers, timeout=timeout)
+        record = {
+            "verb": verb,
+            "url": url,
+            "params": params,
+            "body": data.decode("utf-8") if isinstance(data, bytes) else data,
+            "status": r.status_code,
+            "content": r.content.decode("utf-8"),
+            "elapsed": time.perf_counter() - started,
+        }
+        line = json.dumps(record, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+        return r
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class ReplayTransport(Transport):
+    def __init__(
+        self,
+        path: str,
+        latency: Union[float, Callable, None] = 0.0,
+        ignore_body_for: Iterable[str] = ("/transactions",),
+    ):
+        '''
+        Answer requests from a recorded file.
+
+        Requests are matched by verb, path, query and body; not by node address.
+        The same request recorded several times is answered in the recorded order,
+        the last answer repeats once they are used up.
+
+        Parameters
+        ----------
+        path : str
+            File written by RecordingTransport
+        latency : Union[float, Callable, None], optional
+            Seconds to sleep per request, by default 0.0.
+            A callable gets the record and returns seconds.
+            None replays the recorded latency.
+        ignore_body_for : Iterable[str], optional
+            Paths (suffix) matched without their body, by default ("/transactions",)
+            as signed txs carry a random nonce.
+
+        Raises
+        ------
+        Exception
+            On request, if it was never recorded
+        '''
+        self.latency = latency
+        self.ignore_body_for = tuple(ignore_body_for)
+        self.answers: Dict[tuple, deque] = {}
+        self._lock = threading.Lock()
+        with _open(path, "r") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = _key(record["verb"], record["url"], record["params"], record["body"], self.ignore_body_for)
+                self.answers.setdefault(key, deque()).append(record)
+
+    def request(self, verb, url, params=None, data=None, headers=None, timeout=None) -> Response:
+        key = _key(verb, url, params, data, self.ignore_body_for)
+        with self._lock:
+            answers = self.answers.get(key)
+            if not answers:
+                raise Exception(f"Not recorded: {verb} {url} {params}")
+            record = answers.popleft() if len(answers) > 1 else answers[0]
+
+        if self.latency is None:
+            time.sleep(record["elapsed"])
+        elif callable(self.latency):
+            time.sleep(self.latency(record))
+        elif self.latency:
+            time.sleep(self.latency)
+        return Response(record["status"], record["content"].encode("utf-8"))
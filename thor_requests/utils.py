@@ -11,12 +11,16 @@ is: boolean functions.
 import secrets
 from typing import Callable, List, Union
 
-from thor_devkit import abi, cry, transaction
-from thor_devkit.cry import address, secp256k1
-
 from .contract import Contract
+from .lazy import lazy_import
 from .wallet import Wallet
 
+abi = lazy_import("thor_devkit.abi")
+cry = lazy_import("thor_devkit.cry")
+transaction = lazy_import("thor_devkit.transaction")
+address = lazy_import("thor_devkit.cry.address")
+secp256k1 = lazy_import("thor_devkit.cry.secp256k1")
+
 
 def build_url(base: str, tail: str) -> str:
     """Build a proper URL, base + tail"""
@@ -48,6 +52,18 @@ def calc_blockRef(block_id: str) -> str:
     return block_id[0:18]
 
 
+def is_block_id(revision) -> bool:
+    """Check if a revision is a block id ('0x' + 64 hex chars), rather than a number or "best" """
+    return isinstance(revision, str) and len(revision) == 66 and revision.startswith("0x")
+
+
+def read_blockRef_number(blockRef: str) -> int:
+    """Read the block number encoded in the first 4 bytes of a blockRef (or block id)"""
+    if not blockRef.startswith("0x"):
+        raise Exception("blockRef should start with 0x")
+    return int(blockRef[2:10], 16)
+
+
 def calc_chaintag(hex_str: str) -> int:
     """hex_str can be both like '0x4a' or just '4a'"""
     return int(hex_str, 16)
@@ -158,7 +174,7 @@ def calc_emulate_tx_body(caller: str, tx_body: dict, gaspayer: str=None) -> dict
 
 def calc_tx_unsigned(
     tx_body: dict, encode=False
-) -> Union[transaction.Transaction, str]:
+) -> Union["transaction.Transaction", str]:
     """Build unsigned transaction from tx body"""
     tx = transaction.Transaction(tx_body)
     if encode:
@@ -169,7 +185,7 @@ def calc_tx_unsigned(
 
 def calc_tx_signed(
     wallet: Wallet, tx_body: dict, encode=False
-) -> Union[transaction.Transaction, str]:
+) -> Union["transaction.Transaction", str]:
     """Build signed transaction from tx body"""
     tx = calc_tx_unsigned(tx_body, encode=False)
     message_hash = tx.get_signing_hash()
@@ -183,7 +199,7 @@ def calc_tx_signed(
 
 def calc_tx_signed_with_fee_delegation(
     caller: Wallet, payer: Wallet, tx_body: dict, encode=False
-) -> Union[transaction.Transaction, str]:
+) -> Union["transaction.Transaction", str]:
     '''
     Build a Transaction with fee delegation feature
 
@@ -222,6 +238,15 @@ def calc_tx_signed_with_fee_delegation(
         return tx
 
 
+def calc_tx_id(tx_body: dict, origin: str) -> str:
+    """Calculate the id of a tx locally, it is known before the tx is signed or posted"""
+    if not address.is_address(origin):
+        raise Exception(f"{origin} is not an address")
+    signing_hash = calc_tx_unsigned(tx_body).get_signing_hash()
+    h, _ = cry.blake2b256([signing_hash, bytes.fromhex(origin[2:])])
+    return "0x" + h.hex()
+
+
 def is_readonly(abi_dict: dict):
     """Check the abi, see if the function is read-only"""
     # Check the shape of input data
@@ -1,5 +1,9 @@
-from thor_devkit import cry
-from thor_devkit.cry import mnemonic, keystore, secp256k1
+from .lazy import lazy_import
+
+cry = lazy_import("thor_devkit.cry")
+mnemonic = lazy_import("thor_devkit.cry.mnemonic")
+keystore = lazy_import("thor_devkit.cry.keystore")
+secp256k1 = lazy_import("thor_devkit.cry.secp256k1")
 
 
 def check(priv: bytes):
@@ -22,11 +26,11 @@ class Wallet:
         return cls(priv)
 
     @classmethod
-    def fromMnemonic(cls, words: list):
-        """Get a wallet from words"""
+    def fromMnemonic(cls, words: list, index: int = 0):
+        """Get a wallet from words, at m/44'/818'/0'/0/<index>"""
         if not mnemonic.validate(words):
             raise Exception("Words validation failed, check spelling?")
-        priv = mnemonic.derive_private_key(words)
+        priv = mnemonic.derive_private_key(words, index)
         return cls(priv)
 
     @classmethod